@@ -0,0 +1,138 @@
+import asyncio
+import logging
+from dataclasses import dataclass, field
+from datetime import datetime, timezone
+from typing import Any, Callable, Dict, List, Optional
+
+import discord
+
+from outbound import OutboundScheduler, PRIORITY_ADMIN_LOG
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_WINDOW = 5.0  # sekundy zbierania wpisów przed wysłaniem
+DEFAULT_DIGEST_THRESHOLD = 20  # powyżej tylu wpisów w oknie wysyłany jest skrót
+MAX_EMBEDS_PER_MESSAGE = 10  # limit Discorda
+MAX_MESSAGE_EMBED_CHARS = 6000  # limit Discorda na łączną długość embedów w wiadomości
+DIGEST_LINES_PER_EMBED = 20
+
+
+@dataclass(frozen=True)
+class AdminLogEntry:
+    """Pojedyncza akcja administracyjna do zalogowania"""
+    action: str
+    target: str
+    admin: str
+    reason: Optional[str] = None
+    success: bool = True
+    at: datetime = field(default_factory=lambda: datetime.now(timezone.utc))
+
+    def to_embed(self) -> discord.Embed:
+        embed = discord.Embed(
+            title=f"{'✅' if self.success else '❌'} Akcja Administracyjna: {self.action.title()}",
+            color=discord.Color.green() if self.success else discord.Color.red(),
+            timestamp=self.at
+        )
+        embed.add_field(name="Administrator", value=self.admin)
+        embed.add_field(name="Cel", value=self.target)
+        if self.reason:
+            embed.add_field(name="Powód", value=self.reason, inline=False)
+        return embed
+
+    def to_line(self) -> str:
+        line = f"`{self.at.astimezone().strftime('%H:%M:%S')}` {'✅' if self.success else '❌'} **{self.action.title()}** • {self.target} • {self.admin}"
+        if self.reason:
+            line += f" • _{self.reason}_"
+        return line[:150]
+
+
+class AdminLogAggregator:
+    """
+    Zbiera wpisy kanału logów przez krótkie okno i wysyła je zbiorczo.
+
+    Do `digest_threshold` wpisów każdy dostaje własny embed, wysyłane po
+    MAX_EMBEDS_PER_MESSAGE w jednej wiadomości. Przy większym zalewie wpisy
+    są skracane do jednej linii i łączone w embedy-zestawienia. Kolejność
+    wpisów jest zachowana; `flush()` wysyła wszystko od razu (np. przy zamknięciu).
+    """
+
+    def __init__(self, scheduler: OutboundScheduler, get_channel: Callable[[], Any],
+                 window: float = DEFAULT_WINDOW, digest_threshold: int = DEFAULT_DIGEST_THRESHOLD):
+        self.scheduler = scheduler
+        self.get_channel = get_channel
+        self.window = window
+        self.digest_threshold = digest_threshold
+        self._buffer: List[AdminLogEntry] = []
+        self._timer: Optional[asyncio.TimerHandle] = None
+        self.entries_logged = 0
+        self.messages_sent = 0
+
+    @classmethod
+    def from_config(cls, config: Dict[str, Any], scheduler: OutboundScheduler, get_channel: Callable[[], Any]) -> "AdminLogAggregator":
+        return cls(
+            scheduler,
+            get_channel,
+            window=float(config.get("ADMIN_LOG_WINDOW", DEFAULT_WINDOW)),
+            digest_threshold=int(config.get("ADMIN_LOG_DIGEST_THRESHOLD", DEFAULT_DIGEST_THRESHOLD)),
+        )
+
+    def add(self, entry: AdminLogEntry) -> None:
+        """Dodaje wpis; pierwszy wpis w oknie planuje wysyłkę za `window` sekund"""
+        self._buffer.append(entry)
+        self.entries_logged += 1
+        if self.window <= 0:
+            self.flush()
+        elif self._timer is None:
+            self._timer = asyncio.get_running_loop().call_later(self.window, self.flush)
+
+    def flush(self) -> List[asyncio.Future]:
+        """Kolejkuje wysyłkę wszystkich zebranych wpisów (w kolejności dodania)"""
+        if self._timer is not None:
+            self._timer.cancel()
+            self._timer = None
+        entries, self._buffer = self._buffer, []
+        if not entries:
+            return []
+        channel = self.get_channel()
+        if channel is None:
+            logger.warning(f"Brak kanału logów - pominięto {len(entries)} wpisów")
+            return []
+
+        futures = []
+        for chunk in self._chunks(self._render(entries)):
+            # Ta sama trasa i priorytet - dyspozytor wysyła wiadomości w kolejności kolejkowania
+            futures.append(self.scheduler.send(channel, PRIORITY_ADMIN_LOG, embeds=chunk))
+            self.messages_sent += 1
+        return futures
+
+    @staticmethod
+    def _chunks(embeds: List[discord.Embed]) -> List[List[discord.Embed]]:
+        """Dzieli embedy na wiadomości: max 10 embedów i 6000 znaków na wiadomość"""
+        chunks: List[List[discord.Embed]] = []
+        current: List[discord.Embed] = []
+        size = 0
+        for embed in embeds:
+            if current and (len(current) >= MAX_EMBEDS_PER_MESSAGE or size + len(embed) > MAX_MESSAGE_EMBED_CHARS):
+                chunks.append(current)
+                current, size = [], 0
+            current.append(embed)
+            size += len(embed)
+        if current:
+            chunks.append(current)
+        return chunks
+
+    def _render(self, entries: List[AdminLogEntry]) -> List[discord.Embed]:
+        if len(entries) <= self.digest_threshold:
+            return [entry.to_embed() for entry in entries]
+        embeds = []
+        for start in range(0, len(entries), DIGEST_LINES_PER_EMBED):
+            part = entries[start:start + DIGEST_LINES_PER_EMBED]
+            failed = sum(1 for entry in part if not entry.success)
+            embed = discord.Embed(
+                title=f"📋 Zestawienie akcji administracyjnych ({start + 1}-{start + len(part)} z {len(entries)})",
+                description="\n".join(entry.to_line() for entry in part),
+                color=discord.Color.orange() if failed else discord.Color.green(),
+                timestamp=part[-1].at
+            )
+            embeds.append(embed)
+        return embeds
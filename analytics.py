@@ -0,0 +1,287 @@
+import os
+import threading
+import time
+from datetime import datetime, timezone
+from typing import Any, Dict, Iterable, Optional, Sequence, Tuple
+
+import numpy as np
+
+from sessions import DEFAULT_SESSION_FILE, player_key
+from timeseries import DAY, HOUR, local_to_utc, local_utc_offset
+
+# Ten sam układ co sessions.SESSION_RECORD ("<qdd")
+SESSION_DTYPE = np.dtype([("player", "<i8"), ("joined", "<f8"), ("left", "<f8")])
+
+DEFAULT_ANALYTICS_DAYS = 30
+MAX_ANALYTICS_DAYS = 365
+RETENTION_DAYS = (1, 7, 30)
+WEEKDAYS = ("Pn", "Wt", "Śr", "Cz", "Pt", "So", "Nd")
+
+
+def load_sessions(path: Optional[str] = DEFAULT_SESSION_FILE) -> np.ndarray:
+    """Wczytuje cały dziennik sesji jako tablicę strukturalną (bez urwanego ostatniego rekordu)"""
+    if not path or not os.path.exists(path):
+        return np.empty(0, dtype=SESSION_DTYPE)
+    count = os.path.getsize(path) // SESSION_DTYPE.itemsize
+    return np.fromfile(path, dtype=SESSION_DTYPE, count=count)
+
+
+def open_sessions_array(open_sessions: Iterable[Tuple[str, float]], now: float) -> np.ndarray:
+    """Trwające sesje [(unique_id, wejście)] jako rekordy z wyjściem w chwili `now`"""
+    pairs = list(open_sessions or ())
+    result = np.empty(len(pairs), dtype=SESSION_DTYPE)
+    if pairs:
+        result["player"] = [player_key(unique_id) for unique_id, _ in pairs]
+        result["joined"] = [float(joined) for _, joined in pairs]
+        result["left"] = now
+    return result
+
+
+def local_offsets(timestamps: np.ndarray) -> np.ndarray:
+    """
+    Przesunięcie strefy czasowej (z czasem letnim) w chwili każdego znacznika.
+    Zmiany czasu przypadają na pełne godziny, więc `localtime` jest wołane
+    raz na każdą odrębną godzinę, a nie raz na znacznik.
+    """
+    hours, inverse = np.unique(np.floor(np.asarray(timestamps, dtype=np.float64) / HOUR).astype(np.int64), return_inverse=True)
+    offsets = np.fromiter((local_utc_offset(int(hour) * HOUR) for hour in hours), dtype=np.float64, count=len(hours))
+    return offsets[inverse.reshape(-1)]
+
+
+def sorted_unique(values: np.ndarray) -> np.ndarray:
+    """Posortowane unikalne wartości (dla int64 szybsze od `np.unique`)"""
+    values = np.sort(values)
+    if len(values):
+        values = values[np.r_[True, values[1:] != values[:-1]]]
+    return values
+
+
+def day_label(day: int) -> str:
+    """Data (RRRR-MM-DD) lokalnego dnia o numerze `day` (dni od epoki)"""
+    return datetime.fromtimestamp(int(day) * DAY, tz=timezone.utc).strftime("%Y-%m-%d")
+
+
+def concurrency_heatmap(joined: np.ndarray, left: np.ndarray, start: float, end: float, utc_offset: int = 0) -> np.ndarray:
+    """
+    Średnia liczba graczy online w macierzy 7 dni tygodnia x 24 godziny.
+    Czasy mogą być już lokalnym czasem zegarowym (wtedy `utc_offset=0`).
+
+    Wejścia (+1) i wyjścia (-1) są sortowane raz; skumulowana liczba graczy
+    daje pole pod wykresem (graczo-sekundy) w chwili każdego zdarzenia,
+    a wartości na granicach godzin są interpolowane przez `searchsorted`.
+    Koszt to O(n log n) dla n sesji, niezależnie od długości okresu.
+    """
+    first_hour = int((start + utc_offset) // HOUR)
+    last_hour = int(-(-(end + utc_offset) // HOUR))
+    heat = np.zeros((7, 24))
+    if last_hour <= first_hour:
+        return heat
+    edges = np.arange(first_hour, last_hour + 1, dtype=np.float64) * HOUR - utc_offset
+    if len(joined):
+        times = np.concatenate((joined, left))
+        deltas = np.concatenate((np.ones(len(joined)), -np.ones(len(left))))
+        order = np.argsort(times, kind="stable")
+        times = times[order]
+        online = np.cumsum(deltas[order])
+        area = np.concatenate(([0.0], np.cumsum(online[:-1] * np.diff(times))))
+        index = np.searchsorted(times, edges, side="right") - 1
+        before = index < 0
+        index[before] = 0
+        integral = area[index] + online[index] * (edges - times[index])
+        integral[before] = 0.0
+        per_hour = np.diff(integral) / HOUR
+    else:
+        per_hour = np.zeros(len(edges) - 1)
+    hours = np.arange(first_hour, last_hour, dtype=np.int64)
+    cells = ((hours // 24 + 3) % 7) * 24 + hours % 24  # 1970-01-01 to czwartek
+    sums = np.bincount(cells, weights=per_hour, minlength=7 * 24)
+    counts = np.bincount(cells, minlength=7 * 24)
+    return (sums / np.maximum(counts, 1)).reshape(7, 24)
+
+
+def active_days(codes: np.ndarray, joined: np.ndarray, left: np.ndarray, players: int, utc_offset: int = 0) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Unikalne pary (dzień, gracz) aktywności. Sesja trwająca przez północ
+    liczy się do każdego dnia, którego dotyka. Czasy mogą być już lokalnym
+    czasem zegarowym (wtedy `utc_offset=0`). Zwraca (dni, kody graczy)
+    posortowane po dniu.
+    """
+    first = ((joined + utc_offset) // DAY).astype(np.int64)
+    last = ((left + utc_offset) // DAY).astype(np.int64)
+    spans = last - first + 1
+    offsets = np.arange(int(spans.sum()), dtype=np.int64) - np.repeat(np.cumsum(spans) - spans, spans)
+    days = np.repeat(first, spans) + offsets
+    keys = sorted_unique(days * players + np.repeat(codes, spans))
+    return keys // players, keys % players
+
+
+def first_days(days: np.ndarray, codes: np.ndarray, players: int) -> np.ndarray:
+    """Pierwszy dzień aktywności każdego gracza (indeks = kod gracza)"""
+    order = np.lexsort((days, codes))
+    sorted_codes = codes[order]
+    starts = np.flatnonzero(np.r_[True, sorted_codes[1:] != sorted_codes[:-1]])
+    first = np.empty(players, dtype=np.int64)
+    first[sorted_codes[starts]] = days[order][starts]
+    return first
+
+
+def retention(days: np.ndarray, codes: np.ndarray, first: np.ndarray, players: int, offsets: Sequence[int],
+              cohort_from: int, today: int) -> Dict[int, Dict[str, Any]]:
+    """
+    Retencja dnia N: odsetek graczy, którzy wrócili dokładnie N dni po
+    pierwszej wizycie. Kohorta to gracze, których pierwszy dzień przypada
+    od `cohort_from`, a dzień N już minął.
+    """
+    keys = days * players + codes  # posortowane, bo pary pochodzą z `active_days`
+    player_codes = np.arange(players, dtype=np.int64)
+    result = {}
+    for offset in offsets:
+        eligible = (first >= cohort_from) & (first + offset < today)
+        cohort = int(eligible.sum())
+        if not cohort:
+            result[offset] = {"rate": None, "cohort": 0, "retained": 0}
+            continue
+        targets = (first[eligible] + offset) * players + player_codes[eligible]
+        position = np.minimum(np.searchsorted(keys, targets), len(keys) - 1)
+        retained = int(np.count_nonzero(keys[position] == targets))
+        result[offset] = {"rate": round(retained / cohort, 4), "cohort": cohort, "retained": retained}
+    return result
+
+
+def summarize(sessions: np.ndarray, days: int = DEFAULT_ANALYTICS_DAYS, now: Optional[float] = None,
+              utc_offset: Optional[int] = None, open_sessions: Iterable[Tuple[str, float]] = ()) -> Dict[str, Any]:
+    """
+    Pełne podsumowanie aktywności graczy z ostatnich `days` dni.
+
+    Trwające sesje (`open_sessions`, od wejścia do teraz) liczą się do
+    aktywności, nowych graczy, retencji i heatmapy - gracze online są więc
+    widoczni w DAU od razu, a nie dopiero po wyjściu. Długość sesji i ich
+    liczba dotyczą wyłącznie sesji zakończonych.
+
+    Dni i godziny są liczone w czasie lokalnym z przesunięciem obowiązującym
+    w chwili każdego znacznika (czas letni/zimowy). Stałe `utc_offset`
+    zastępuje strefę lokalną jednym przesunięciem.
+    """
+    started = time.perf_counter()
+    now = time.time() if now is None else now
+
+    def to_local(timestamps):
+        return timestamps + (local_offsets(timestamps) if utc_offset is None else utc_offset)
+
+    days = max(1, int(days))
+    now_local = now + (local_utc_offset(now) if utc_offset is None else utc_offset)
+    today = int(now_local // DAY)
+    first_day = today - days + 1
+    window_start_local = first_day * DAY
+    window_start = local_to_utc(window_start_local) if utc_offset is None else window_start_local - utc_offset
+
+    closed = sessions[sessions["left"] > sessions["joined"]]
+    ongoing = open_sessions_array(open_sessions, now)
+    ongoing = ongoing[ongoing["left"] > ongoing["joined"]]
+    valid = np.concatenate((closed, ongoing))
+    is_open = np.r_[np.zeros(len(closed), dtype=bool), np.ones(len(ongoing), dtype=bool)]
+    keys, codes = np.unique(valid["player"], return_inverse=True)
+    players = max(1, len(keys))
+    codes = codes.astype(np.int64)
+    joined, left = valid["joined"], valid["left"]
+    local_joined, local_left = to_local(joined), to_local(left)
+    all_days, all_codes = active_days(codes, local_joined, local_left, players)
+    first = first_days(all_days, all_codes, players) if len(valid) else np.empty(0, dtype=np.int64)
+
+    in_window = left > window_start
+    window_joined = np.maximum(joined[in_window], window_start)
+    window_left = np.minimum(left[in_window], now)
+    heat = concurrency_heatmap(
+        np.maximum(local_joined[in_window], window_start_local),
+        np.minimum(local_left[in_window], now_local),
+        window_start_local, now_local,
+    )
+
+    window_pairs = (all_days >= first_day) & (all_days <= today)
+    pair_days = all_days[window_pairs] - first_day
+    pair_codes = all_codes[window_pairs]
+    active = np.bincount(pair_days, minlength=days)[:days]
+    new_mask = (first >= first_day) & (first <= today)
+    new = np.bincount(first[new_mask] - first_day, minlength=days)[:days]
+    daily = [
+        {"date": day_label(first_day + i), "active": int(active[i]), "new": int(new[i]), "returning": int(active[i] - new[i])}
+        for i in range(days)
+    ]
+
+    # Tygodnie od poniedziałku: dzień 0 epoki to czwartek
+    weeks = (all_days[window_pairs] + 3) // 7
+    week_keys = sorted_unique(weeks * players + pair_codes)
+    week_numbers, week_active = np.unique(week_keys // players, return_counts=True)
+    weekly = [{"week": day_label(week * 7 - 3), "active": int(count)} for week, count in zip(week_numbers, week_active)]
+
+    window_players = int(len(sorted_unique(pair_codes)))
+    new_players = int(new_mask.sum())
+    durations = (window_left - window_joined)[~is_open[in_window]]
+    if len(durations):
+        p25, median, p75, p90 = np.percentile(durations, [25, 50, 75, 90])
+        session_length = {"median": float(median), "p25": float(p25), "p75": float(p75), "p90": float(p90),
+                          "mean": float(durations.mean())}
+    else:
+        session_length = {"median": None, "p25": None, "p75": None, "p90": None, "mean": None}
+
+    dau = float(active.mean())
+    # WAU: aktywni w ostatnich 7 dniach (ruchome okno, nie tydzień kalendarzowy)
+    wau = int(len(sorted_unique(pair_codes[pair_days >= days - 7])))
+    return {
+        "as_of": now,
+        "days": days,
+        "sessions": int(len(durations)),
+        "open_sessions": int(len(ongoing)),
+        "players": window_players,
+        "total_players": int(len(keys)),
+        "dau": round(dau, 2),
+        "dau_today": int(active[-1]),
+        "wau": wau,
+        "stickiness": round(dau / wau, 4) if wau else None,
+        "new_players": new_players,
+        "returning_players": window_players - new_players,
+        "new_ratio": round(new_players / window_players, 4) if window_players else None,
+        "session_length": session_length,
+        "retention": retention(all_days, all_codes, first, players, RETENTION_DAYS, first_day - max(RETENTION_DAYS), today),
+        "heatmap": np.round(heat, 2).tolist(),
+        "weekdays": list(WEEKDAYS),
+        "daily": daily,
+        "weekly": weekly,
+        "computed_ms": round((time.perf_counter() - started) * 1000, 1),
+    }
+
+
+class SessionAnalytics:
+    """
+    Podsumowanie dziennika sesji z pamięcią podręczną.
+
+    Wynik jest przeliczany tylko po zmianie pliku (rozmiar, mtime), zmianie
+    okresu, zmianie listy trwających sesji (wejście lub wyjście gracza) lub
+    po `max_age` sekundach - panel i komenda `!stats` mogą więc pytać o niego
+    często.
+    """
+
+    def __init__(self, path: Optional[str] = DEFAULT_SESSION_FILE, max_age: float = 300):
+        self.path = path
+        self.max_age = max_age
+        self._cache: Dict[int, Tuple[Tuple, float, Dict[str, Any]]] = {}
+        self._lock = threading.Lock()
+
+    def _file_state(self) -> Tuple:
+        try:
+            stat = os.stat(self.path)
+        except (OSError, TypeError):
+            return (0, 0)
+        return (stat.st_size, stat.st_mtime_ns)
+
+    def summary(self, days: int = DEFAULT_ANALYTICS_DAYS, open_sessions: Iterable[Tuple[str, float]] = ()) -> Dict[str, Any]:
+        """Podsumowanie zapisanych sesji i trwających sesji [(unique_id, wejście)] graczy online"""
+        open_sessions = sorted((str(unique_id), float(joined)) for unique_id, joined in open_sessions or ())
+        with self._lock:
+            state = (self._file_state(), tuple(open_sessions))
+            cached = self._cache.get(days)
+            if cached and cached[0] == state and time.monotonic() - cached[1] < self.max_age:
+                return cached[2]
+            result = summarize(load_sessions(self.path), days, open_sessions=open_sessions)
+            self._cache[days] = (state, time.monotonic(), result)
+            return result
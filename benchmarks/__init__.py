@@ -0,0 +1 @@
+"""Benchmarki gorących ścieżek bota i panelu (python -m benchmarks.run)"""
@@ -0,0 +1,365 @@
+"""
+Benchmarki gorących ścieżek bota i panelu na syntetycznych danych.
+
+Uruchomienie (z katalogu głównego projektu):
+    python -m benchmarks.run                         # pełny zestaw: 100 - 100k graczy
+    python -m benchmarks.run --quick                 # szybki przebieg: 100 i 1000 graczy
+    python -m benchmarks.run --only tracker,logs     # wybrane grupy
+    python -m benchmarks.run --compare stare.json nowe.json --threshold 1.25
+
+Wyniki są zapisywane jako JSON (domyślnie benchmarks/results/<commit>.json)
+z kluczami w postaci "nazwa[parametry]", więc pliki z dwóch commitów można
+porównać przez --compare. Porównanie kończy się kodem 1, jeśli mediana
+któregoś przypadku wzrosła ponad próg.
+"""
+import argparse
+import asyncio
+import json
+import logging
+import os
+import platform
+import random
+import statistics
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+from datetime import datetime
+from typing import Any, Callable, Dict, List, Optional
+
+PROJECT_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if PROJECT_DIR not in sys.path:
+    sys.path.insert(0, PROJECT_DIR)
+
+from benchmarks import synthetic  # noqa: E402
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_SIZES = [100, 1_000, 10_000, 100_000]
+QUICK_SIZES = [100, 1_000]
+DEFAULT_LOG_SIZES_MB = [1, 5, 20]
+QUICK_LOG_SIZES_MB = [1]
+DEFAULT_ONLINE = 100  # typowa liczba graczy online na serwerze
+DEFAULT_CHURN = 0.1  # odsetek graczy online wymienianych w jednym odpytaniu
+DEFAULT_MIN_TIME = 0.2  # sekundy pomiarów na przypadek
+DEFAULT_MAX_ROUNDS = 50
+MIN_ROUNDS = 3
+DEFAULT_THRESHOLD = 1.25
+GROUPS = ("tracker", "embed", "logs", "api")
+
+
+class BenchmarkRunner:
+    """Mierzy przypadki i zbiera wyniki do jednego słownika"""
+
+    def __init__(self, min_time: float = DEFAULT_MIN_TIME, max_rounds: int = DEFAULT_MAX_ROUNDS):
+        self.min_time = min_time
+        self.max_rounds = max_rounds
+        self.results: Dict[str, Dict[str, Any]] = {}
+
+    @staticmethod
+    def key(name: str, params: Dict[str, Any]) -> str:
+        return f"{name}[{','.join(f'{k}={v}' for k, v in params.items())}]"
+
+    def measure(self, name: str, params: Dict[str, Any], func: Callable[[], Any],
+                setup: Optional[Callable[[], Any]] = None) -> Dict[str, Any]:
+        """
+        Wykonuje `func` wielokrotnie (min. MIN_ROUNDS razy, do `min_time` sekund
+        lub `max_rounds` powtórzeń). `setup` jest wołane przed każdym
+        powtórzeniem i nie wlicza się do czasu.
+        """
+        if setup is not None:
+            setup()
+        func()  # rozgrzewka
+        timings: List[float] = []
+        started = time.perf_counter()
+        while len(timings) < MIN_ROUNDS or (len(timings) < self.max_rounds and time.perf_counter() - started < self.min_time):
+            if setup is not None:
+                setup()
+            start = time.perf_counter()
+            func()
+            timings.append(time.perf_counter() - start)
+        result = {
+            "name": name,
+            "params": params,
+            "rounds": len(timings),
+            "min": min(timings),
+            "median": statistics.median(timings),
+            "mean": statistics.fmean(timings),
+            "max": max(timings),
+            "stdev": statistics.stdev(timings) if len(timings) > 1 else 0.0,
+        }
+        key = self.key(name, params)
+        self.results[key] = result
+        print(f"  {key:<55} median {_format_seconds(result['median']):>10}  ({result['rounds']} rund)")
+        return result
+
+
+def _format_seconds(seconds: float) -> str:
+    if seconds < 1e-3:
+        return f"{seconds * 1e6:.1f} µs"
+    if seconds < 1:
+        return f"{seconds * 1e3:.2f} ms"
+    return f"{seconds:.2f} s"
+
+
+def bench_tracker(runner: BenchmarkRunner, sizes: List[int], online: int, churn: float, workdir: str) -> None:
+    """PlayerTracker: wczytanie, aktualizacja statusu online (z rotacją graczy), odczyty i zapis"""
+    from webpanel.playerlist import PlayerTracker
+    from webpanel.storage import SqlitePlayerStorage
+
+    for size in sizes:
+        print(f"tracker: {size} graczy")
+        db_path = os.path.join(workdir, f"players_{size}.db")
+        storage = SqlitePlayerStorage(db_path)
+        storage.save_players(synthetic.player_records(size))
+        storage.close()
+
+        def load():
+            tracker = PlayerTracker(storage=SqlitePlayerStorage(db_path), flush_interval=3600, flush_threshold=10**9)
+            tracker.storage.close()
+        runner.measure("tracker_load", {"players": size}, load)
+
+        tracker = PlayerTracker(storage=SqlitePlayerStorage(db_path), flush_interval=3600, flush_threshold=10**9)
+        rng = random.Random(size)
+        state = {"roster": synthetic.online_roster(tracker.players, online, seed=size)}
+        tracker.update_online_status(state["roster"])
+
+        def next_roster():
+            state["roster"] = synthetic.churn(state["roster"], tracker.players, churn, rng)
+
+        params = {"players": size, "online": min(online, size), "churn": churn}
+        runner.measure("update_online_status", params, lambda: tracker.update_online_status(state["roster"]), setup=next_roster)
+        runner.measure("flush", params, tracker.flush, setup=lambda: (next_roster(), tracker.update_online_status(state["roster"])))
+        runner.measure("get_all_players", {"players": size}, tracker.get_all_players)
+        runner.measure("query_players", {"players": size, "sort": "last_seen"}, lambda: tracker.query_players(sort="last_seen", offset=size // 2, limit=25))
+        runner.measure("query_players", {"players": size, "sort": "name", "online_only": True}, lambda: tracker.query_players(sort="name", online_only=True))
+        runner.measure("search_players", {"players": size}, lambda: tracker.search_players("kowal"))
+        runner.measure("get_stats", {"players": size}, tracker.get_stats)
+        runner.measure("recompute_stats", {"players": size}, tracker.recompute_stats)
+        tracker.close()
+
+
+def bench_embed(runner: BenchmarkRunner, sizes: List[int]) -> None:
+    """Generowanie embeda statusu dla list online różnej długości"""
+    from cogs.status import Status
+    from snapshot import ServerSnapshot
+
+    status = Status.__new__(Status)  # embed nie korzysta ze stanu coga
+    for size in sizes:
+        print(f"embed: {size} graczy online")
+        players = synthetic.player_records(size)
+        snapshot = ServerSnapshot(
+            taken_at=time.time(),
+            online=True,
+            player_count=size,
+            players=tuple(synthetic.online_roster(players, size)),
+            players_ok=True,
+            latency_ms=42,
+        )
+        runner.measure("generate_status_embed", {"online": size}, lambda: status._generate_status_embed(snapshot))
+
+
+def bench_logs(runner: BenchmarkRunner, log_sizes_mb: List[int], workdir: str) -> None:
+    """read_bot_logs na wielomegabajtowych plikach logów: pierwszy odczyt i odczyt po dopisaniu linii"""
+    from webpanel.logtail import LogTail
+    from webpanel.routes import read_bot_logs
+
+    for size_mb in log_sizes_mb:
+        path = os.path.join(workdir, f"bot_{size_mb}mb.log")
+        lines = synthetic.write_log_file(path, size_mb * 1024 * 1024)
+        print(f"logs: {size_mb} MB ({lines} linii)")
+        runner.measure("log_tail_cold", {"size_mb": size_mb}, lambda: LogTail(path).entries())
+
+        def append_and_read():
+            with open(path, "a", encoding="utf-8") as f:
+                f.write("2024-06-08 12:34:56,789 [INFO] Snapshot: 10 graczy online\n")
+            read_bot_logs(path)
+        runner.measure("read_bot_logs", {"size_mb": size_mb}, append_and_read)
+
+
+def bench_api(runner: BenchmarkRunner, workdir: str) -> None:
+    """
+    /api/stats przez klienta testowego Flaska. W tle działa mock serwer gry
+    odpytywany przez prawdziwy SnapshotPoller bota, a panel czyta snapshot
+    przez TrackerIpcServer - mierzona jest ta sama droga co w produkcji.
+    """
+    from aiohttp import web
+    from game_api import GameApiClient
+    from mockserver import MockGameServer, MockSettings
+    from snapshot import PollSchedule, SnapshotPoller
+    from timeseries import PlayerTimeSeries
+    from tracker_ipc import TrackerClient, TrackerIpcServer
+
+    try:
+        from config import CONFIG
+        from webpanel import create_app, limiter, routes
+    except Exception as e:
+        print(f"api: pominięto ({e})")
+        return
+
+    password = CONFIG.get("GAME_SERVER_RCON_PASSWORD") or "mock"
+    server = MockGameServer(MockSettings(players=50, churn=0, latency_ms=0, jitter_ms=0, seed=0), password=password)
+    ipc_config = {"TRACKER_IPC_SOCKET": os.path.join(workdir, "tracker.sock")}
+    loop = asyncio.new_event_loop()
+    ready = threading.Event()
+    holder: Dict[str, Any] = {}
+
+    async def serve():
+        runner_ = web.AppRunner(server.create_app(), access_log=None)
+        await runner_.setup()
+        site = web.TCPSite(runner_, "127.0.0.1", 0)
+        await site.start()
+        holder["runner"] = runner_
+        # Strona bota: klient API, poller i serwer IPC z tymi samymi metodami co w bot.py
+        api = GameApiClient.from_config(CONFIG, f"http://127.0.0.1:{runner_.addresses[0][1]}", password)
+        await api.start()
+        holder["api"] = api
+        poller = SnapshotPoller(api.request, PollSchedule())
+        series = PlayerTimeSeries(None)
+        snapshot = await poller.poll_once()
+        series.add(snapshot.player_count, snapshot.taken_at)
+        ipc = TrackerIpcServer({
+            "snapshot": lambda: poller.latest.to_dict(),
+            "poll_cadence": poller.cadence,
+            "api_health": api.health,
+            "player_history": series.window,
+        }, ipc_config)
+        await ipc.start()
+        holder["ipc"] = ipc
+        ready.set()
+
+    thread = threading.Thread(target=lambda: (loop.run_until_complete(serve()), loop.run_forever()), daemon=True)
+    thread.start()
+    ready.wait(10)
+
+    old_cwd = os.getcwd()
+    old_tracker = routes.player_tracker
+    try:
+        # Panel używa ścieżek względnych (config/secret_key)
+        os.makedirs(os.path.join(workdir, "config"), exist_ok=True)
+        os.chdir(workdir)
+        routes.player_tracker = TrackerClient(ipc_config)
+        app = create_app()
+        app.config.update(LOGIN_DISABLED=True, TESTING=True)
+        limiter.enabled = False
+        client = app.test_client()
+        print("api: /api/stats")
+
+        def get_stats():
+            response = client.get("/api/stats")
+            if response.status_code != 200 or response.get_json().get("server_online") is not True:
+                raise RuntimeError(f"/api/stats zwróciło {response.status_code}: {response.get_data(as_text=True)[:200]}")
+        runner.measure("api_stats", {"online": len(server.online)}, get_stats)
+    finally:
+        os.chdir(old_cwd)
+        routes.player_tracker = old_tracker
+
+        async def shutdown():
+            for key, method in (("ipc", "stop"), ("api", "close"), ("runner", "cleanup")):
+                if key in holder:
+                    await getattr(holder[key], method)()
+        asyncio.run_coroutine_threadsafe(shutdown(), loop).result(10)
+        loop.call_soon_threadsafe(loop.stop)
+
+
+def git_commit() -> Optional[str]:
+    try:
+        return subprocess.run(["git", "rev-parse", "--short", "HEAD"], cwd=PROJECT_DIR, capture_output=True, text=True, check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def compare(old_path: str, new_path: str, threshold: float) -> int:
+    """Porównuje mediany dwóch plików wyników; zwraca 1, gdy jest regresja ponad próg"""
+    with open(old_path, encoding="utf-8") as f:
+        old = json.load(f)["results"]
+    with open(new_path, encoding="utf-8") as f:
+        new = json.load(f)["results"]
+    regressions = 0
+    for key in sorted(set(old) & set(new)):
+        ratio = new[key]["median"] / old[key]["median"] if old[key]["median"] else float("inf")
+        marker = ""
+        if ratio > threshold:
+            marker = "  <-- REGRESJA"
+            regressions += 1
+        elif ratio < 1 / threshold:
+            marker = "  (szybciej)"
+        print(f"{key:<55} {_format_seconds(old[key]['median']):>10} -> {_format_seconds(new[key]['median']):>10}  x{ratio:.2f}{marker}")
+    for key in sorted(set(old) ^ set(new)):
+        print(f"{key:<55} tylko w {'starym' if key in old else 'nowym'} pliku")
+    print(f"\nRegresje powyżej x{threshold}: {regressions}")
+    return 1 if regressions else 0
+
+
+def parse_args(argv: Optional[List[str]] = None) -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description="Benchmarki MotorTownBot")
+    parser.add_argument("--quick", action="store_true", help="tylko małe rozmiary danych")
+    parser.add_argument("--sizes", help="liczby graczy po przecinku (domyślnie 100,1000,10000,100000)")
+    parser.add_argument("--log-sizes", help="rozmiary logów w MB po przecinku (domyślnie 1,5,20)")
+    parser.add_argument("--online", type=int, default=DEFAULT_ONLINE, help="liczba graczy online w scenariuszu rotacji")
+    parser.add_argument("--churn", type=float, default=DEFAULT_CHURN, help="odsetek graczy online wymienianych na odpytanie")
+    parser.add_argument("--only", help=f"grupy po przecinku: {','.join(GROUPS)}")
+    parser.add_argument("--min-time", type=float, default=DEFAULT_MIN_TIME, help="sekundy pomiarów na przypadek")
+    parser.add_argument("--max-rounds", type=int, default=DEFAULT_MAX_ROUNDS)
+    parser.add_argument("--out", help="plik wynikowy JSON (domyślnie benchmarks/results/<commit>.json)")
+    parser.add_argument("--compare", nargs=2, metavar=("STARY", "NOWY"), help="porównaj dwa pliki wyników")
+    parser.add_argument("--threshold", type=float, default=DEFAULT_THRESHOLD, help="próg regresji dla --compare")
+    return parser.parse_args(argv)
+
+
+def _int_list(value: Optional[str], default: List[int]) -> List[int]:
+    return [int(part) for part in value.split(",") if part.strip()] if value else default
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    args = parse_args(argv)
+    if args.compare:
+        return compare(args.compare[0], args.compare[1], args.threshold)
+
+    logging.basicConfig(level=logging.WARNING, format='%(asctime)s [%(levelname)s] %(message)s')
+    sizes = _int_list(args.sizes, QUICK_SIZES if args.quick else DEFAULT_SIZES)
+    log_sizes = _int_list(args.log_sizes, QUICK_LOG_SIZES_MB if args.quick else DEFAULT_LOG_SIZES_MB)
+    groups = set(args.only.split(",")) if args.only else set(GROUPS)
+    unknown = groups - set(GROUPS)
+    if unknown:
+        print(f"Nieznane grupy: {', '.join(sorted(unknown))}")
+        return 2
+
+    runner = BenchmarkRunner(min_time=args.min_time, max_rounds=args.max_rounds)
+    started = time.time()
+    with tempfile.TemporaryDirectory(prefix="mtbench_") as workdir:
+        if "tracker" in groups:
+            bench_tracker(runner, sizes, args.online, args.churn, workdir)
+        if "embed" in groups:
+            bench_embed(runner, sizes)
+        if "logs" in groups:
+            bench_logs(runner, log_sizes, workdir)
+        if "api" in groups:
+            bench_api(runner, workdir)
+
+    commit = git_commit()
+    output = {
+        "meta": {
+            "commit": commit,
+            "created_at": datetime.now().isoformat(),
+            "duration": round(time.time() - started, 2),
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "sizes": sizes,
+            "log_sizes_mb": log_sizes,
+            "online": args.online,
+            "churn": args.churn,
+        },
+        "results": runner.results,
+    }
+    out_path = args.out or os.path.join(PROJECT_DIR, "benchmarks", "results", f"{commit or 'local'}.json")
+    os.makedirs(os.path.dirname(os.path.abspath(out_path)), exist_ok=True)
+    with open(out_path, "w", encoding="utf-8") as f:
+        json.dump(output, f, indent=2, ensure_ascii=False)
+    print(f"\nZapisano {len(runner.results)} wyników do {out_path}")
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
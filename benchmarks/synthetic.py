@@ -0,0 +1,86 @@
+"""Generatory syntetycznych danych do benchmarków: gracze, listy online, logi"""
+import random
+import time
+from datetime import datetime, timedelta
+from typing import Dict, List
+
+from webpanel.storage import PlayerRecord
+
+NAME_WORDS = [
+    "Kowalski", "Nowak", "Trucker", "Zbyszek", "Ciężarówka", "Łukasz", "Speedy",
+    "Driver", "Tir", "Mirek", "Bus", "Kurier", "Taxi", "Wiśnia", "Rally", "Diesel",
+]
+LOG_MESSAGES = [
+    ("INFO", "Gracz {name} dołączył do serwera"),
+    ("INFO", "Gracz {name} opuścił serwer"),
+    ("INFO", "Zaktualizowano embed statusu"),
+    ("WARNING", "Przekroczono limit czasu (5.0s)"),
+    ("ERROR", "Błąd połączenia: Cannot connect to host"),
+    ("DEBUG", "Snapshot: {count} graczy online"),
+]
+
+
+def player_id(index: int) -> str:
+    return str(76561198000000000 + index)
+
+
+def player_name(rng: random.Random, index: int) -> str:
+    return f"{rng.choice(NAME_WORDS)} {rng.choice(NAME_WORDS)}{index}"
+
+
+def player_records(count: int, seed: int = 0) -> Dict[str, PlayerRecord]:
+    """`count` graczy z historią z ostatnich 90 dni"""
+    rng = random.Random(seed)
+    now = time.time()
+    players = {}
+    for index in range(count):
+        first_seen = now - rng.uniform(0, 90 * 86400)
+        players[player_id(index)] = PlayerRecord(
+            name=player_name(rng, index),
+            first_seen=first_seen,
+            last_seen=rng.uniform(first_seen, now),
+            join_count=rng.randint(1, 500),
+            total_time=rng.uniform(0, 500 * 3600),
+        )
+    return players
+
+
+def online_roster(players: Dict[str, PlayerRecord], size: int, seed: int = 0) -> List[Dict]:
+    """Lista graczy online w formacie /player/list"""
+    rng = random.Random(seed)
+    ids = rng.sample(list(players), min(size, len(players)))
+    return [{"unique_id": unique_id, "name": players[unique_id].name} for unique_id in ids]
+
+
+def churn(roster: List[Dict], players: Dict[str, PlayerRecord], fraction: float, rng: random.Random) -> List[Dict]:
+    """Kolejna lista online: `fraction` graczy wychodzi i tyle samo nowych dołącza"""
+    changes = max(1, int(len(roster) * fraction))
+    staying = roster[changes:] if len(roster) > changes else []
+    online = {player["unique_id"] for player in staying}
+    candidates = [unique_id for unique_id in rng.sample(list(players), min(len(players), changes * 4)) if unique_id not in online]
+    joining = [{"unique_id": unique_id, "name": players[unique_id].name} for unique_id in candidates[:changes]]
+    return staying + joining
+
+
+def write_log_file(path: str, size_bytes: int, sessions: int = 3, seed: int = 0) -> int:
+    """Zapisuje plik logu bota w formacie RotatingFileHandler; zwraca liczbę linii"""
+    rng = random.Random(seed)
+    at = datetime.now() - timedelta(days=7)
+    lines = 0
+    written = 0
+    session_every = max(1, size_bytes // max(1, sessions))
+    next_session = 0
+    with open(path, "w", encoding="utf-8") as f:
+        while written < size_bytes:
+            at += timedelta(milliseconds=rng.randint(10, 5000))
+            stamp = at.strftime("%Y-%m-%d %H:%M:%S,") + f"{at.microsecond // 1000:03d}"
+            if written >= next_session:
+                line = f"{stamp} [INFO] Zalogowano jako MotorTownBot#0001\n"
+                next_session += session_every
+            else:
+                level, template = rng.choice(LOG_MESSAGES)
+                line = f"{stamp} [{level}] {template.format(name=player_name(rng, rng.randint(0, 10_000)), count=rng.randint(0, 50))}\n"
+            f.write(line)
+            written += len(line.encode("utf-8"))
+            lines += 1
+    return lines
@@ -12,8 +12,17 @@ from discord import TextChannel, ForumChannel, CategoryChannel
 from discord.abc import Messageable
 import sys
 import asyncio
-from datetime import datetime
 from config import CONFIG, get_config
+from game_api import GameApiClient
+from snapshot import DEFAULT_ROSTER_DEADLINE, SnapshotPoller, PollSchedule
+from player_events import PlayerEventStream
+from tracker_ipc import TrackerIpcServer
+from outbound import OutboundScheduler, PRIORITY_MODERATION
+from admin_log import AdminLogAggregator, AdminLogEntry
+from timeseries import PlayerTimeSeries
+from sessions import SessionLog
+from analytics import SessionAnalytics
+from webpanel.playerlist import PlayerTracker
 
 # Konfiguracja logowania z rotacją
 log_handler = logging.handlers.RotatingFileHandler(
@@ -140,7 +149,8 @@ class MyHelpCommand(commands.HelpCommand):
                 ("!chat <wiadomość>", "Wyślij wiadomość na czat w grze"),
                 ("!ban <id>", "Zbanuj gracza"),
                 ("!unban <id>", "Odbanuj gracza"),
-                ("!banlist", "Lista zbanowanych graczy")
+                ("!banlist", "Lista zbanowanych graczy"),
+                ("!bulk <kick|ban|unban> <id...|all|name:fragment> [--yes]", "Akcja zbiorcza na wielu graczach (`all` wymaga potwierdzenia)")
             ]
             
             embed.add_field(
@@ -163,7 +173,44 @@ class MotorTownBot(commands.Bot):
         # Pobieraj hasło z .env jeśli istnieje
         self.password = quote_plus(os.getenv('GAME_SERVER_RCON_PASSWORD') or self.config.get("GAME_SERVER_RCON_PASSWORD", ""))
         self.base_url = f"http://{self.server_ip}:{self.web_port}"
-        self.timeout = aiohttp.ClientTimeout(total=10)
+        # Klient HTTP z pulą połączeń - sesja otwierana w setup_hook, zamykana w close
+        self.api = GameApiClient.from_config(self.config, self.base_url, self.password)
+        # Jeden wspólny poller stanu serwera - cogi subskrybują jego snapshoty,
+        # a interwał dostosowuje się do stanu serwera (offline, pusty, szczyt)
+        self.poller = SnapshotPoller(
+            self.api_request,
+            PollSchedule.from_config(self.config),
+            roster_deadline=float(self.config.get('ROSTER_DEADLINE', DEFAULT_ROSTER_DEADLINE)),
+        )
+        # Zdarzenia dołączenia/wyjścia graczy wyliczane z kolejnych snapshotów
+        self.player_events = PlayerEventStream()
+        # Wszystkie wiadomości wychodzące przechodzą przez kolejkę priorytetową
+        self.outbound = OutboundScheduler.from_config(config)
+        # Wpisy kanału logów są zbierane i wysyłane zbiorczo
+        self.admin_log = AdminLogAggregator.from_config(config, self.outbound, self._log_channel_or_none)
+        # Liczba graczy w czasie: minuty zwijane do godzin i dni
+        self.player_series = PlayerTimeSeries.from_config(config)
+        # Zakończone sesje graczy (kto, od kiedy, do kiedy) dla analityki aktywności
+        self.session_log = SessionLog()
+        self.session_analytics = SessionAnalytics(self.session_log.path)
+        # Bot jest jedynym właścicielem stanu graczy - panel odpytuje go przez IPC
+        self.player_tracker = PlayerTracker(session_log=self.session_log)
+        self.ipc = TrackerIpcServer({
+            'get_all_players': self.player_tracker.get_all_players,
+            'query_players': self.player_tracker.query_players,
+            'search_players': self.player_tracker.search_players,
+            'get_player': self.player_tracker.get_player,
+            'get_stats': self.player_tracker.get_stats,
+            'get_banned_players': self.player_tracker.get_banned_players,
+            'open_sessions': self.player_tracker.open_sessions,
+            'reset_join_counts': self.player_tracker.reset_join_counts,
+            'snapshot': self.snapshot_dict,
+            'refresh': self.refresh_snapshot,
+            'api_stats': self.api.cache_stats,
+            'poll_cadence': self.poller.cadence,
+            'api_health': self.api.health,
+            'player_history': self.player_series.window,
+        }, self.config)
         
         # Konfiguracja kanałów
         self.public_channel = int(self.config.get("DISCORD_CHANNEL_ID", "0"))
@@ -174,64 +221,40 @@ class MotorTownBot(commands.Bot):
         self.admin_role = int(self.config.get("DISCORD_ADMIN_ROLE_ID", "0"))
         self.moderator_role = int(self.config.get("DISCORD_MOD_ROLE_ID", "0"))
         
-        # Inicjalizacja historii graczy
-        self.player_history = [0] * 24
-        self.last_player_count = 0
-        self.player_data_file = "webpanel/player_data.json"
-        self.load_player_history()
+    def update_player_history(self, snapshot, previous=None):
+        """Dopisuje liczbę graczy ze snapshotu do szeregu czasowego"""
+        if not snapshot.online:
+            logger.warning(f"Nie udało się pobrać liczby graczy: {snapshot.message}")
+            return
+        self.player_series.add(snapshot.player_count, snapshot.taken_at)
 
-    def load_player_history(self):
-        """Ładuje historię graczy z pliku"""
-        try:
-            if os.path.exists(self.player_data_file):
-                with open(self.player_data_file, 'r') as f:
-                    data = json.load(f)
-                    self.player_history = data.get('history', [0] * 24)
-                    self.last_player_count = data.get('current', 0)
-        except Exception as e:
-            logger.error(f"Błąd podczas ładowania historii graczy: {e}")
-            self.player_history = [0] * 24
-            self.last_player_count = 0
+    def feed_player_events(self, snapshot, previous=None):
+        """Przekazuje listę graczy ze snapshotu do strumienia zdarzeń"""
+        if snapshot.online and snapshot.players_ok:
+            self.player_events.feed(snapshot.players, snapshot.taken_at)
 
-    def save_player_data(self):
-        """Zapisuje dane o graczach do pliku"""
-        try:
-            os.makedirs(os.path.dirname(self.player_data_file), exist_ok=True)
-            with open(self.player_data_file, 'w') as f:
-                json.dump({
-                    'history': self.player_history,
-                    'current': self.last_player_count,
-                    'last_update': datetime.now().isoformat()
-                }, f)
-        except Exception as e:
-            logger.error(f"Błąd podczas zapisywania danych o graczach: {e}")
+    def update_banned_players(self, snapshot, previous=None):
+        """Aktualizuje listę zbanowanych w trackerze na podstawie snapshotu"""
+        if snapshot.online and snapshot.banlist_ok:
+            self.player_tracker.update_banned_players(list(snapshot.banned_players))
 
-    async def update_player_count(self):
-        """Aktualizuje liczbę graczy i historię"""
-        while not self.is_closed():
-            try:
-                response = await self.api_request('GET', '/player/count')
-                if response['succeeded']:
-                    current_count = response['data'].get('num_players', 0)
-                    
-                    # Aktualizuj historię
-                    current_hour = datetime.now().hour
-                    self.player_history[current_hour] = current_count
-                    self.last_player_count = current_count
-                    
-                    # Zapisz dane
-                    self.save_player_data()
-                    
-                else:
-                    logger.warning(f"Nie udało się pobrać liczby graczy: {response['message']}")
-            except Exception as e:
-                logger.error(f"Błąd podczas aktualizacji liczby graczy: {e}")
-            
-            await asyncio.sleep(60)  # Aktualizuj co minutę
+    def session_summary(self, days):
+        """Analityka sesji z uwzględnieniem sesji czekających na zapis i trwających (gracze online)"""
+        self.session_log.flush()
+        return self.session_analytics.summary(days, self.player_tracker.open_sessions())
+
+    def snapshot_dict(self):
+        """Ostatni snapshot serwera w postaci słownika (dla IPC)"""
+        return self.poller.latest.to_dict() if self.poller.latest else None
+
+    async def refresh_snapshot(self):
+        """Wymusza odpytanie serwera i zwraca nowy snapshot (dla IPC)"""
+        return (await self.poller.poll_once()).to_dict()
 
     async def api_request(self, method, endpoint, payload=None):
         """
         Wspólna funkcja do komunikacji z API serwera gry.
+        Wszystkie zapytania idą przez współdzielonego klienta z pulą połączeń.
         
         Args:
             method (str): Metoda HTTP ('GET' lub 'POST')
@@ -241,73 +264,35 @@ class MotorTownBot(commands.Bot):
         Returns:
             dict: Odpowiedź z API zawierająca status i dane
         """
-        try:
-            if method.upper() not in ['GET', 'POST']:
-                raise ValueError(f"Nieobsługiwana metoda HTTP: {method}")
-                
-            # Walidacja URL
-            if not endpoint.startswith('/'):
-                endpoint = f"/{endpoint}"
-                
-            # Dodaj password do endpointu
-            endpoint = f"{endpoint}{'&' if '?' in endpoint else '?'}password={self.password}"
-            url = f"{self.base_url}{endpoint}"
-            headers = {"Authorization": f"Bearer {self.password}"}
-            
-            async with aiohttp.ClientSession(timeout=self.timeout) as session:
-                async with session.request(method, url, json=payload, headers=headers) as response:
-                    try:
-                        data = await response.json()
-                    except aiohttp.ContentTypeError:
-                        data = {}
-                        
-                    return {
-                        "succeeded": 200 <= response.status < 300,
-                        "status_code": response.status,
-                        "data": data.get('data', {}),
-                        "message": data.get('message', f"HTTP {response.status}")
-                    }
-                    
-        except aiohttp.ClientError as e:
-            return {
-                "succeeded": False,
-                "status_code": None,
-                "data": {},
-                "message": f"Błąd połączenia: {str(e)}",
-                "error_type": "connection"
-            }
-        except Exception as e:
-            return {
-                "succeeded": False,
-                "status_code": None,
-                "data": {},
-                "message": f"Błąd krytyczny: {str(e)}",
-                "error_type": "critical"
-            }
+        return await self.api.request(method, endpoint, payload)
+
+    def _log_channel_or_none(self):
+        channel = self.get_channel(self.log_channel)
+        if not isinstance(channel, Messageable):
+            print(f"Nie znaleziono kanału logów lub kanał nie jest tekstowy {self.log_channel}")
+            return None
+        return channel
 
     async def log_admin_action(self, ctx, action, target, reason=None, success=True):
-        """Loguje akcję administracyjną na kanale logów"""
+        """Loguje akcję administracyjną na kanale logów (zbiorczo, co ADMIN_LOG_WINDOW sekund)"""
         try:
-            channel = self.get_channel(self.log_channel)
-            if not isinstance(channel, Messageable):
-                print(f"Nie znaleziono kanału logów lub kanał nie jest tekstowy {self.log_channel}")
-                return
-                
-            embed = discord.Embed(
-                title=f"{'✅' if success else '❌'} Akcja Administracyjna: {action.title()}",
-                color=discord.Color.green() if success else discord.Color.red(),
-                timestamp=discord.utils.utcnow()
-            )
-            
-            embed.add_field(name="Administrator", value=ctx.author.mention)
-            embed.add_field(name="Cel", value=target)
-            if reason:
-                embed.add_field(name="Powód", value=reason, inline=False)
-                
-            await channel.send(embed=embed)
+            self.admin_log.add(AdminLogEntry(
+                action=action,
+                target=str(target),
+                # ctx może być kontekstem komendy albo interakcją (przyciski panelu)
+                admin=(getattr(ctx, 'author', None) or getattr(ctx, 'user', None)).mention if ctx else "System",
+                reason=reason,
+                success=success,
+            ))
         except Exception as e:
             print(f"Błąd logowania akcji: {str(e)}")
 
+    async def reply(self, ctx, *args, **kwargs):
+        """Odpowiedź na komendę moderacyjną - wysyłana przed powiadomieniami i statusem"""
+        # Odpowiedzi na interakcje idą webhookiem interakcji, nie limitem kanału
+        bucket = None if ctx.interaction else ("channel", ctx.channel.id)
+        return await self.outbound.submit(lambda: ctx.send(*args, **kwargs), PRIORITY_MODERATION, bucket)
+
     def has_role(self, member, role_id):
         """Sprawdza czy użytkownik ma określoną rolę"""
         return role_id in [role.id for role in member.roles]
@@ -335,17 +320,53 @@ class MotorTownBot(commands.Bot):
 
     async def setup_hook(self):
         """Uruchamia zadania w tle przy starcie bota"""
+        # Otwórz pulę połączeń do API serwera gry
+        await self.api.start()
+        self.outbound.start()
+        # Udostępnij dane graczy panelowi webowemu
+        try:
+            await self.ipc.start()
+        except Exception as e:
+            logger.error(f"Nie można uruchomić serwera IPC trackera: {e}")
+
         try:
             # Ładowanie cogów
             await self.load_extension('cogs.status')
             await self.load_extension('cogs.playersmg')
             print("✅ Wszystkie cogi załadowane pomyślnie")
             
-            # Uruchomienie zadania aktualizacji liczby graczy
-            self.loop.create_task(self.update_player_count())
+            # Historia liczby graczy jest aktualizowana z tego samego snapshotu co cogi
+            self.poller.subscribe(self.update_player_history)
+            self.poller.subscribe(self.feed_player_events)
+            self.poller.subscribe(self.update_banned_players)
         except Exception as e:
             print(f"❌ Błąd ładowania cogów: {e}")
 
+    async def close(self):
+        """Zamyka bota i zwalnia połączenia do API serwera gry"""
+        # Każdy krok osobno - błąd jednego nie może pominąć zapisu danych w kolejnych.
+        # Najpierw zatrzymaj poller, potem zapisz dane, na końcu zamknij połączenia.
+        steps = [
+            ("poller", self.poller.stop),
+            ("dane graczy", self.player_tracker.flush),
+            ("szereg czasowy graczy", self.player_series.flush),
+            # Wyślij zaległe wpisy logów i wiadomości, póki połączenie z Discordem jest otwarte
+            ("log administracyjny", self.admin_log.flush),
+            ("kolejka wiadomości", self.outbound.stop),
+            ("serwer IPC", self.ipc.stop),
+            ("API serwera gry", self.api.close),
+        ]
+        try:
+            for name, step in steps:
+                try:
+                    result = step()
+                    if asyncio.iscoroutine(result):
+                        await result
+                except Exception as e:
+                    logger.error(f"Błąd zamykania ({name}): {str(e)}")
+        finally:
+            await super().close()
+
     async def on_ready(self):
         logger.info(f"--- BOT IS READY ---")
         if self.user:
@@ -359,8 +380,8 @@ class MotorTownBot(commands.Bot):
         logger.info(f'Admin Role: {self.admin_role}')
         logger.info("--------------------")
         
-        # Start background tasks
-        self.update_player_count_task = self.loop.create_task(self.update_player_count())
+        # Start background tasks (start() jest idempotentne - reconnect nie dubluje pollera)
+        self.poller.start()
         
         logger.info("Cogs loaded:")
         for cog in self.cogs:
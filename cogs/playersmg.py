@@ -2,15 +2,28 @@ import discord
 import asyncio
 from discord.ext import commands
 from discord.ui import View, Button, Select
-from discord import Interaction, ui
-from typing import List, Dict, Optional, Union, TYPE_CHECKING
+from discord import Interaction, ui, app_commands
+from typing import List, Dict, Optional, Tuple, Union, TYPE_CHECKING
 from urllib.parse import quote
 from urllib.parse import urlencode
 import logging
+from webpanel.player_index import normalize_name
+from snapshot import fetch_roster
 
 if TYPE_CHECKING:
     from .playersmg import Playersmg
 
+# Akcje moderacyjne i ich endpointy API serwera gry
+MODERATION_ENDPOINTS = {
+    'kick': '/player/kick',
+    'ban': '/player/ban',
+    'unban': '/player/unban',
+}
+DEFAULT_BULK_CONCURRENCY = 5
+MAX_BULK_TARGETS = 100
+BULK_CONFIRM_TIMEOUT = 30  # sekundy na potwierdzenie akcji zbiorczej na `all`
+BULK_CONFIRM_FLAG = '--yes'
+
 class PlayersMGMenu(View):
     def __init__(self, cog, players_data: List[Dict], banned_players: Optional[List[Dict]] = None):
         super().__init__(timeout=180)
@@ -43,6 +56,14 @@ class PlayersMGMenu(View):
         embed = self.create_embed()
         await interaction.response.edit_message(embed=embed, view=self)
 
+    async def refresh_lists(self):
+        """Odświeża raz (po zakończeniu akcji) listę graczy i banlistę - oba zapytania równolegle"""
+        roster = await self.cog.fetch_roster()
+        if roster.players_ok:
+            self.players = list(roster.players)
+        if roster.banlist_ok:
+            self.banned_players = list(roster.banned_players)
+
     def create_embed(self):
         if self.current_page == "main":
             return self.create_main_embed()
@@ -221,14 +242,7 @@ class ActionButton(Button):
                 return
             
             # Wykonaj akcję
-            if self.action == 'kick':
-                data = await self.cog.bot.api_request('POST', '/player/kick', {'unique_id': player_id})
-            elif self.action == 'ban':
-                data = await self.cog.bot.api_request('POST', '/player/ban', {'unique_id': player_id})
-            elif self.action == 'unban':
-                data = await self.cog.bot.api_request('POST', '/player/unban', {'unique_id': player_id})
-            else:
-                raise ValueError(f"Nieznana akcja: {self.action}")
+            data = await self.cog.moderate(self.action, player_id)
                 
             # Przygotuj wiadomość o wyniku
             if data.get('succeeded'):
@@ -246,21 +260,8 @@ class ActionButton(Button):
                     success=True
                 )
                 
-                # Odśwież listę graczy po akcji
-                if self.action in ['kick', 'ban']:
-                    players_data = await self.cog.bot.api_request('GET', '/player/list')
-                    if players_data.get('succeeded'):
-                        players_raw = players_data.get('data', {})
-                        if isinstance(players_raw, dict):
-                            view.players = list(players_raw.values())
-                        elif isinstance(players_raw, list):
-                            view.players = players_raw
-                            
-                # Odśwież listę zbanowanych po akcji
-                if self.action in ['ban', 'unban']:
-                    banned_data = await self.cog.bot.api_request('GET', '/player/banlist')
-                    if banned_data.get('succeeded'):
-                        view.banned_players = banned_data.get('data', [])
+                # Odśwież listy po akcji
+                await view.refresh_lists()
                 
                 # Wróć do głównego menu
                 view.current_page = "main"
@@ -348,12 +349,149 @@ class CancelButton(Button):
                 ephemeral=True
             )
 
+class BulkConfirmView(View):
+    """Potwierdzenie akcji zbiorczej na `all` - kliknąć może tylko autor komendy"""
+
+    def __init__(self, author_id: int):
+        super().__init__(timeout=BULK_CONFIRM_TIMEOUT)
+        self.author_id = author_id
+        self.confirmed = False
+
+    async def interaction_check(self, interaction: Interaction) -> bool:
+        if interaction.user.id != self.author_id:
+            await interaction.response.send_message("❌ Tylko autor komendy może potwierdzić akcję.", ephemeral=True)
+            return False
+        return True
+
+    @ui.button(label="Potwierdź", style=discord.ButtonStyle.danger)
+    async def confirm_button(self, interaction: Interaction, button: Button):
+        self.confirmed = True
+        await interaction.response.edit_message(view=None)
+        self.stop()
+
+    @ui.button(label="Anuluj", style=discord.ButtonStyle.grey)
+    async def cancel_button(self, interaction: Interaction, button: Button):
+        await interaction.response.edit_message(view=None)
+        self.stop()
+
 class Playersmg(commands.Cog):
     def __init__(self, bot):
         self.bot = bot
         
         # Używamy konfiguracji z głównego bota
         # Usuwamy duplikację kodu API
+        self.bulk_concurrency = int(bot.config.get('BULK_MODERATION_CONCURRENCY', DEFAULT_BULK_CONCURRENCY))
+        self.roster_deadline = float(bot.config.get('ROSTER_DEADLINE', 8))
+
+    @staticmethod
+    async def defer_interaction(ctx):
+        """Potwierdza komendę slash od razu - odpowiedź z kolejki może przyjść po limicie 3 s interakcji"""
+        if ctx.interaction is not None and not ctx.interaction.response.is_done():
+            await ctx.defer()
+
+    async def fetch_roster(self):
+        """Lista graczy i banlista pobrane równolegle ze wspólnym limitem czasu"""
+        return await fetch_roster(self.bot.api_request, self.roster_deadline)
+
+    async def moderate(self, action: str, player_id) -> Dict:
+        """Wykonuje pojedynczą akcję moderacyjną (kick/ban/unban) przez API serwera gry"""
+        endpoint = MODERATION_ENDPOINTS.get(action)
+        if endpoint is None:
+            raise ValueError(f"Nieznana akcja: {action}")
+        return await self.bot.api_request('POST', endpoint, {'unique_id': player_id})
+
+    async def moderate_many(self, action: str, player_ids: List[int]) -> List[Tuple[int, Dict]]:
+        """
+        Wykonuje akcję na wielu graczach równolegle, maksymalnie
+        `bulk_concurrency` zapytań naraz. Wyniki są w kolejności `player_ids`.
+        """
+        semaphore = asyncio.Semaphore(max(1, self.bulk_concurrency))
+
+        async def run(player_id):
+            async with semaphore:
+                try:
+                    return player_id, await self.moderate(action, player_id)
+                except Exception as e:
+                    return player_id, {'succeeded': False, 'message': str(e)}
+
+        return list(await asyncio.gather(*(run(player_id) for player_id in player_ids)))
+
+    def bulk_targets(self, action: str, selectors: List[str]) -> Tuple[List[int], List[str]]:
+        """
+        Zamienia argumenty komendy zbiorczej na ID graczy. Obsługuje ID, nazwy,
+        `all` (wszyscy online, a dla unban wszyscy zbanowani) oraz `name:<fragment>`
+        (gracze, których nazwa zawiera fragment). Zwraca (ID, nierozpoznane argumenty).
+        """
+        if action == 'unban':
+            pool = [p for p in self.bot.player_tracker.get_banned_players() if isinstance(p, dict)]
+        else:
+            snapshot = self.bot.poller.latest
+            pool = list(snapshot.players) if snapshot and snapshot.players_ok else []
+
+        ids: List[int] = []
+        unknown: List[str] = []
+        for selector in selectors:
+            if selector.lower() == 'all':
+                matched = pool
+            elif selector.lower().startswith('name:'):
+                fragment = normalize_name(selector[5:])
+                matched = [p for p in pool if fragment and fragment in normalize_name(p.get('name', ''))]
+            else:
+                player_id = self.resolve_player_id(selector, pool if action == 'unban' else None)
+                if player_id is None:
+                    unknown.append(selector)
+                else:
+                    ids.append(player_id)
+                continue
+            ids.extend(int(p['unique_id']) for p in matched if str(p.get('unique_id', '')).isdigit())
+        # Bez duplikatów, z zachowaniem kolejności
+        return list(dict.fromkeys(ids)), unknown
+
+    def resolve_player_id(self, value: str, candidates: Optional[List[Dict]] = None) -> Optional[int]:
+        """
+        Zamienia argument komendy na ID gracza: liczba jest traktowana jako ID,
+        a nazwa musi jednoznacznie pasować do gracza (z `candidates` lub z indeksu nazw).
+        """
+        value = str(value).strip()
+        if value.isdigit():
+            return int(value)
+        normalized = normalize_name(value)
+        if candidates is None:
+            candidates = self.bot.player_tracker.search_players(value, limit=25)
+        matches = {str(p.get('unique_id')) for p in candidates if normalize_name(p.get('name', '')) == normalized}
+        if len(matches) == 1:
+            unique_id = matches.pop()
+            return int(unique_id) if unique_id.isdigit() else None
+        return None
+
+    @staticmethod
+    def _choice(player: Dict) -> app_commands.Choice[str]:
+        label = f"{player.get('name', 'Nieznany')} ({player.get('unique_id')})"
+        return app_commands.Choice(name=label[:100], value=str(player.get('unique_id')))
+
+    async def player_autocomplete(self, interaction: Interaction, current: str) -> List[app_commands.Choice[str]]:
+        """Podpowiedzi graczy dla /kick i /ban - z indeksu nazw trackera"""
+        tracker = self.bot.player_tracker
+        if current.strip():
+            players = tracker.search_players(current, limit=25)
+        else:
+            # Bez wpisanego tekstu podpowiadaj graczy online
+            players = tracker.query_players(online_only=True, limit=25)['players']
+        return [self._choice(p) for p in players]
+
+    async def banned_autocomplete(self, interaction: Interaction, current: str) -> List[app_commands.Choice[str]]:
+        """Podpowiedzi zbanowanych graczy dla /unban"""
+        query = normalize_name(current)
+        choices = []
+        for player in self.bot.player_tracker.get_banned_players():
+            if not isinstance(player, dict):
+                continue
+            if query and query not in normalize_name(player.get('name', '')) and not str(player.get('unique_id', '')).startswith(current.strip()):
+                continue
+            choices.append(self._choice(player))
+            if len(choices) >= 25:
+                break
+        return choices
 
     @commands.command(name='chat')
     async def post_chat(self, ctx, *, message: str):
@@ -361,7 +499,7 @@ class Playersmg(commands.Cog):
         author = ctx.author.display_name
 
         if ctx.channel.id != self.bot.private_channel:
-            await ctx.send("❌ Tej komendy można używać tylko na kanale prywatnym!", delete_after=10)
+            await self.bot.reply(ctx, "❌ Tej komendy można używać tylko na kanale prywatnym!", delete_after=10)
             return
 
         try:
@@ -382,7 +520,7 @@ class Playersmg(commands.Cog):
                 )
             else:
                 await ctx.message.add_reaction('❌')
-                await ctx.send(f"Błąd: {data.get('message', 'Unknown error')}", delete_after=10)
+                await self.bot.reply(ctx, f"Błąd: {data.get('message', 'Unknown error')}", delete_after=10)
                 # Loguj błąd
                 await self.bot.log_admin_action(
                     ctx,
@@ -394,7 +532,7 @@ class Playersmg(commands.Cog):
                 
         except Exception as e:
             await ctx.message.add_reaction('❌')
-            await ctx.send(f"Błąd: {str(e)}", delete_after=10)
+            await self.bot.reply(ctx, f"Błąd: {str(e)}", delete_after=10)
             # Loguj błąd
             await self.bot.log_admin_action(
                 ctx,
@@ -404,18 +542,27 @@ class Playersmg(commands.Cog):
                 success=False
             )
     
-    @commands.command(name='kick')
-    async def kick_player(self, ctx, player_id: int):
+    @commands.hybrid_command(name='kick', description="Wyrzuca gracza z serwera")
+    @app_commands.describe(player_id="ID lub nazwa gracza")
+    @app_commands.autocomplete(player_id=player_autocomplete)
+    async def kick_player(self, ctx, player_id: str):
         """Wyrzuca gracza z serwera"""
+        await self.defer_interaction(ctx)
         if not self.bot.has_role(ctx.author, self.bot.moderator_role) and not self.bot.has_role(ctx.author, self.bot.admin_role):
-            await ctx.send("❌ Nie masz uprawnień do tej komendy!", delete_after=10)
+            await self.bot.reply(ctx, "❌ Nie masz uprawnień do tej komendy!", delete_after=10)
             return
+
+        resolved = self.resolve_player_id(player_id)
+        if resolved is None:
+            await self.bot.reply(ctx, f"❌ Nie znaleziono jednoznacznie gracza: {player_id}", delete_after=10)
+            return
+        player_id = resolved
             
         try:
-            data = await self.bot.api_request('POST', '/player/kick', {'unique_id': player_id})
+            data = await self.moderate('kick', player_id)
             
             if data.get('succeeded'):
-                await ctx.send(f"✅ Pomyślnie wyrzucono gracza o ID: {player_id}")
+                await self.bot.reply(ctx, f"✅ Pomyślnie wyrzucono gracza o ID: {player_id}")
                 # Loguj akcję
                 await self.bot.log_admin_action(
                     ctx,
@@ -424,7 +571,7 @@ class Playersmg(commands.Cog):
                     success=True
                 )
             else:
-                await ctx.send(f"❌ Błąd: {data.get('message', 'Unknown error')}")
+                await self.bot.reply(ctx, f"❌ Błąd: {data.get('message', 'Unknown error')}")
                 # Loguj błąd
                 await self.bot.log_admin_action(
                     ctx,
@@ -435,7 +582,7 @@ class Playersmg(commands.Cog):
                 )
                 
         except Exception as e:
-            await ctx.send(f"⚠️ Błąd: {str(e)}")
+            await self.bot.reply(ctx, f"⚠️ Błąd: {str(e)}")
             # Loguj błąd
             await self.bot.log_admin_action(
                 ctx,
@@ -445,18 +592,27 @@ class Playersmg(commands.Cog):
                 success=False
             )
 
-    @commands.command(name='ban')
-    async def ban_player(self, ctx, player_id: int):
+    @commands.hybrid_command(name='ban', description="Banuje gracza na serwerze")
+    @app_commands.describe(player_id="ID lub nazwa gracza")
+    @app_commands.autocomplete(player_id=player_autocomplete)
+    async def ban_player(self, ctx, player_id: str):
         """Banuje gracza na serwerze"""
+        await self.defer_interaction(ctx)
         if not self.bot.has_role(ctx.author, self.bot.moderator_role) and not self.bot.has_role(ctx.author, self.bot.admin_role):
-            await ctx.send("❌ Nie masz uprawnień do tej komendy!", delete_after=10)
+            await self.bot.reply(ctx, "❌ Nie masz uprawnień do tej komendy!", delete_after=10)
+            return
+
+        resolved = self.resolve_player_id(player_id)
+        if resolved is None:
+            await self.bot.reply(ctx, f"❌ Nie znaleziono jednoznacznie gracza: {player_id}", delete_after=10)
             return
+        player_id = resolved
             
         try:
-            data = await self.bot.api_request('POST', '/player/ban', {'unique_id': player_id})
+            data = await self.moderate('ban', player_id)
             
             if data.get('succeeded'):
-                await ctx.send(f"✅ Pomyślnie zbanowano gracza o ID: {player_id}")
+                await self.bot.reply(ctx, f"✅ Pomyślnie zbanowano gracza o ID: {player_id}")
                 # Loguj akcję
                 await self.bot.log_admin_action(
                     ctx,
@@ -465,7 +621,7 @@ class Playersmg(commands.Cog):
                     success=True
                 )
             else:
-                await ctx.send(f"❌ Błąd: {data.get('message', 'Unknown error')}")
+                await self.bot.reply(ctx, f"❌ Błąd: {data.get('message', 'Unknown error')}")
                 # Loguj błąd
                 await self.bot.log_admin_action(
                     ctx,
@@ -476,7 +632,7 @@ class Playersmg(commands.Cog):
                 )
                 
         except Exception as e:
-            await ctx.send(f"⚠️ Błąd: {str(e)}")
+            await self.bot.reply(ctx, f"⚠️ Błąd: {str(e)}")
             # Loguj błąd
             await self.bot.log_admin_action(
                 ctx,
@@ -486,18 +642,27 @@ class Playersmg(commands.Cog):
                 success=False
             )
 
-    @commands.command(name='unban')
-    async def unban_player(self, ctx, player_id: int):
+    @commands.hybrid_command(name='unban', description="Odbanowuje gracza na serwerze")
+    @app_commands.describe(player_id="ID lub nazwa gracza")
+    @app_commands.autocomplete(player_id=banned_autocomplete)
+    async def unban_player(self, ctx, player_id: str):
         """Odbanowuje gracza na serwerze"""
+        await self.defer_interaction(ctx)
         if not self.bot.has_role(ctx.author, self.bot.moderator_role) and not self.bot.has_role(ctx.author, self.bot.admin_role):
-            await ctx.send("❌ Nie masz uprawnień do tej komendy!", delete_after=10)
+            await self.bot.reply(ctx, "❌ Nie masz uprawnień do tej komendy!", delete_after=10)
+            return
+
+        resolved = self.resolve_player_id(player_id, self.bot.player_tracker.get_banned_players())
+        if resolved is None:
+            await self.bot.reply(ctx, f"❌ Nie znaleziono jednoznacznie gracza: {player_id}", delete_after=10)
             return
+        player_id = resolved
             
         try:
-            data = await self.bot.api_request('POST', '/player/unban', {'unique_id': player_id})
+            data = await self.moderate('unban', player_id)
             
             if data.get('succeeded'):
-                await ctx.send(f"✅ Pomyślnie odbanowano gracza o ID: {player_id}")
+                await self.bot.reply(ctx, f"✅ Pomyślnie odbanowano gracza o ID: {player_id}")
                 # Loguj akcję
                 await self.bot.log_admin_action(
                     ctx,
@@ -506,7 +671,7 @@ class Playersmg(commands.Cog):
                     success=True
                 )
             else:
-                await ctx.send(f"❌ Błąd: {data.get('message', 'Unknown error')}")
+                await self.bot.reply(ctx, f"❌ Błąd: {data.get('message', 'Unknown error')}")
                 # Loguj błąd
                 await self.bot.log_admin_action(
                     ctx,
@@ -517,7 +682,7 @@ class Playersmg(commands.Cog):
                 )
                 
         except Exception as e:
-            await ctx.send(f"⚠️ Błąd: {str(e)}")
+            await self.bot.reply(ctx, f"⚠️ Błąd: {str(e)}")
             # Loguj błąd
             await self.bot.log_admin_action(
                 ctx,
@@ -527,18 +692,94 @@ class Playersmg(commands.Cog):
                 success=False
             )
 
+    @commands.command(name='bulk')
+    async def bulk_moderation(self, ctx, action: str, *selectors: str):
+        """Akcja zbiorcza: !bulk <kick|ban|unban> <ID/nazwy...|all|name:fragment> [--yes]"""
+        await self.defer_interaction(ctx)
+        if not self.bot.has_role(ctx.author, self.bot.moderator_role) and not self.bot.has_role(ctx.author, self.bot.admin_role):
+            await self.bot.reply(ctx, "❌ Nie masz uprawnień do tej komendy!", delete_after=10)
+            return
+
+        action = action.lower()
+        confirmed = BULK_CONFIRM_FLAG in selectors
+        selectors = [selector for selector in selectors if selector != BULK_CONFIRM_FLAG]
+        if action not in MODERATION_ENDPOINTS or not selectors:
+            await self.bot.reply(ctx, "❌ Użycie: `!bulk <kick|ban|unban> <ID/nazwy...|all|name:fragment> [--yes]`", delete_after=10)
+            return
+
+        player_ids, unknown = self.bulk_targets(action, selectors)
+        if not player_ids:
+            await self.bot.reply(ctx, "❌ Nie znaleziono żadnych graczy pasujących do podanych argumentów.", delete_after=10)
+            return
+        if len(player_ids) > MAX_BULK_TARGETS:
+            await self.bot.reply(ctx, f"❌ Za dużo graczy ({len(player_ids)}). Maksymalnie {MAX_BULK_TARGETS} na jedną komendę.", delete_after=10)
+            return
+        if not confirmed and any(selector.lower() == 'all' for selector in selectors):
+            # `all` obejmuje wszystkich graczy - wymagaj potwierdzenia (albo flagi --yes)
+            view = BulkConfirmView(ctx.author.id)
+            prompt = await self.bot.reply(
+                ctx,
+                f"⚠️ `{action}` obejmie **{len(player_ids)}** graczy (`all`). Potwierdzić? (pomiń pytanie flagą `{BULK_CONFIRM_FLAG}`)",
+                view=view
+            )
+            await view.wait()
+            if not view.confirmed:
+                try:
+                    await prompt.edit(content="❎ Anulowano akcję zbiorczą.", view=None)
+                except discord.HTTPException:
+                    pass
+                return
+
+        results = await self.moderate_many(action, player_ids)
+        succeeded = [player_id for player_id, data in results if data.get('succeeded')]
+        failed = [(player_id, data.get('message', 'Unknown error')) for player_id, data in results if not data.get('succeeded')]
+
+        # Jedno odświeżenie stanu serwera po wszystkich akcjach
+        try:
+            await self.bot.poller.poll_once()
+        except Exception as e:
+            logging.error(f"Błąd odświeżania po akcji zbiorczej: {str(e)}")
+
+        embed = self.bot.create_embed(
+            ctx,
+            success=not failed,
+            title=f"📋 Akcja zbiorcza: {action.title()}",
+            description=f"Powodzenie: **{len(succeeded)}** • Błędy: **{len(failed)}**"
+        )
+        if succeeded:
+            embed.add_field(name="✅ Wykonano", value=self._id_list(succeeded), inline=False)
+        if failed:
+            embed.add_field(name="❌ Błędy", value=self._id_list([f"{player_id}: {message}" for player_id, message in failed]), inline=False)
+        if unknown:
+            embed.add_field(name="❔ Nierozpoznane", value=self._id_list(unknown), inline=False)
+        await self.bot.reply(ctx, embed=embed)
+
+        await self.bot.log_admin_action(
+            ctx,
+            f"Bulk {action.title()}",
+            f"{len(player_ids)} graczy: {', '.join(str(player_id) for player_id in player_ids)}"[:1024],
+            reason="; ".join(f"{player_id}: {message}" for player_id, message in failed)[:1024] or None,
+            success=not failed
+        )
+
+    @staticmethod
+    def _id_list(items: List) -> str:
+        """Lista do pola embeda, przycięta do limitu 1024 znaków"""
+        text = "\n".join(f"`{item}`" for item in items)
+        return text if len(text) <= 1024 else text[:1000].rsplit("\n", 1)[0] + "\n…"
+
     @commands.command(name='banlist')
     async def banlist(self, ctx):
         """Wyświetla listę zbanowanych graczy"""
         if not self.bot.has_role(ctx.author, self.bot.moderator_role) and not self.bot.has_role(ctx.author, self.bot.admin_role):
-            await ctx.send("❌ Nie masz uprawnień do tej komendy!", delete_after=10)
+            await self.bot.reply(ctx, "❌ Nie masz uprawnień do tej komendy!", delete_after=10)
             return
             
         try:
             data = await self.bot.api_request('GET', '/player/banlist')
             
             if not data.get('succeeded'):
-                await ctx.send(f"❌ Błąd: {data.get('message', 'Unknown error')}")
+                await self.bot.reply(ctx, f"❌ Błąd: {data.get('message', 'Unknown error')}")
                 return
                 
             banned_players = data.get('data', [])
@@ -549,7 +790,7 @@ class Playersmg(commands.Cog):
                     title="📋 Lista Zbanowanych Graczy",
                     description="```diff\n- Brak zbanowanych graczy\n```"
                 )
-                await ctx.send(embed=embed)
+                await self.bot.reply(ctx, embed=embed)
                 return
                 
             # Utwórz embed z listą zbanowanych graczy
@@ -566,44 +807,33 @@ class Playersmg(commands.Cog):
                     inline=False
                 )
                 
-            await ctx.send(embed=embed)
+            await self.bot.reply(ctx, embed=embed)
             
         except Exception as e:
-            await ctx.send(f"⚠️ Błąd: {str(e)}")
+            await self.bot.reply(ctx, f"⚠️ Błąd: {str(e)}")
 
     @commands.command(name='playersmg')
     async def players_management(self, ctx):
         """Panel zarządzania graczami"""
         if not self.bot.has_role(ctx.author, self.bot.moderator_role) and not self.bot.has_role(ctx.author, self.bot.admin_role):
-            await ctx.send("❌ Nie masz uprawnień do tej komendy!", delete_after=10)
+            await self.bot.reply(ctx, "❌ Nie masz uprawnień do tej komendy!", delete_after=10)
             return
             
         try:
-            # Pobierz listę graczy
-            players_data = await self.bot.api_request('GET', '/player/list')
-            banned_data = await self.bot.api_request('GET', '/player/banlist')
+            # Pobierz listę graczy i banlistę (równolegle)
+            roster = await self.fetch_roster()
             
-            if not players_data.get('succeeded'):
-                await ctx.send(f"❌ Błąd pobierania listy graczy: {players_data.get('message', 'Unknown error')}")
+            if not roster.players_ok:
+                await self.bot.reply(ctx, f"❌ Błąd pobierania listy graczy: {roster.players_message or 'Unknown error'}")
                 return
-                
-            players = []
-            players_raw = players_data.get('data', {})
-            
-            if isinstance(players_raw, dict):
-                players = list(players_raw.values())
-            elif isinstance(players_raw, list):
-                players = players_raw
-                
-            banned_players = banned_data.get('data', []) if banned_data.get('succeeded') else []
             
-            view = PlayersMGMenu(self, players, banned_players)
+            view = PlayersMGMenu(self, list(roster.players), list(roster.banned_players))
             embed = view.create_embed()
             
-            await ctx.send(embed=embed, view=view)
+            await self.bot.reply(ctx, embed=embed, view=view)
             
         except Exception as e:
-            await ctx.send(f"⚠️ Błąd: {str(e)}")
+            await self.bot.reply(ctx, f"⚠️ Błąd: {str(e)}")
 
 async def setup(bot):
     await bot.add_cog(Playersmg(bot))
@@ -1,39 +1,227 @@
 import discord
-from discord.ext import commands, tasks
+from discord.ext import commands
 import time
 from datetime import datetime
-from webpanel.playerlist import PlayerTracker
+from player_events import PlayerJoined, PlayerLeft, PlayerRenamed
+from outbound import PRIORITY_MODERATION, PRIORITY_NOTIFICATION, PRIORITY_PLAYER_EVENT, PRIORITY_STATUS
+from analytics import DEFAULT_ANALYTICS_DAYS, MAX_ANALYTICS_DAYS
+from webpanel.playerlist import format_duration
 import logging
 import json
 import os
 import asyncio
+import hashlib
 
 logger = logging.getLogger(__name__)
 
+# ID wiadomości statusu - plik należy tylko do bota; panel zapisuje podgląd embeda w dc_status.json
+STATUS_STATE_FILE = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'webpanel', 'dc_status_message.json')
+# Starsze wersje trzymały message_id we wspólnym pliku z panelem
+LEGACY_STATUS_STATE_FILE = os.path.join(os.path.dirname(STATUS_STATE_FILE), 'dc_status.json')
+STATUS_EMBED_TITLE = "📊 Status Serwera"
+
+
+def embed_content_hash(embed: discord.Embed) -> str:
+    """Skrót treści embeda z pominięciem stopki i znacznika czasu (zmieniają się co aktualizację)"""
+    data = embed.to_dict()
+    data.pop('footer', None)
+    data.pop('timestamp', None)
+    return hashlib.sha256(json.dumps(data, sort_keys=True, ensure_ascii=False).encode('utf-8')).hexdigest()
+
+class PlayersPageView(discord.ui.View):
+    """
+    Stronicowana lista graczy dla komendy !players.
+
+    Każda strona jest pobierana z trackera osobno (`query_players`),
+    więc przełączenie strony kosztuje tyle, ile graczy jest na stronie.
+    """
+
+    PAGE_SIZE = 10
+    SORTS = [
+        ("last_seen", "Ostatnio widziani"),
+        ("total_time", "Czas gry"),
+        ("join_count", "Liczba dołączeń"),
+        ("name", "Nick"),
+    ]
+
+    def __init__(self, player_tracker, author_id: int):
+        super().__init__(timeout=300)
+        self.player_tracker = player_tracker
+        self.author_id = author_id
+        self.page = 0
+        self.sort = "last_seen"
+        self.online_only = False
+        self.message = None
+        self.sort_select.options = [
+            discord.SelectOption(label=label, value=value, default=value == self.sort)
+            for value, label in self.SORTS
+        ]
+
+    def build_embed(self):
+        result = self.player_tracker.query_players(
+            sort=self.sort,
+            offset=self.page * self.PAGE_SIZE,
+            limit=self.PAGE_SIZE,
+            online_only=self.online_only,
+        )
+        total = result['total']
+        pages = max(1, (total + self.PAGE_SIZE - 1) // self.PAGE_SIZE)
+        if total == 0 and not self.online_only:
+            return None
+
+        embed = discord.Embed(
+            title="📋 Lista Wszystkich Graczy" if not self.online_only else "📋 Gracze Online",
+            description=f"Strona {self.page + 1}/{pages} • Graczy: {total}",
+            color=discord.Color.blue()
+        )
+        for player in result['players']:
+            last_seen = datetime.fromtimestamp(player['last_seen_ts']).strftime('%Y-%m-%d %H:%M:%S')
+            status = "🟢 Online" if player['is_online'] else "⚫ Offline"
+            embed.add_field(
+                name=f"👤 {player['name']} ({status})",
+                value=f"ID: `{player['unique_id']}`\n"
+                      f"Dołączeń: `{player['join_count']}`\n"
+                      f"Czas gry: `{player['formatted_time']}`\n"
+                      f"Ostatnio: `{last_seen}`",
+                inline=False
+            )
+
+        self.previous_button.disabled = self.page <= 0
+        self.next_button.disabled = self.page >= pages - 1
+        self.online_button.style = discord.ButtonStyle.success if self.online_only else discord.ButtonStyle.secondary
+        return embed
+
+    async def interaction_check(self, interaction: discord.Interaction) -> bool:
+        if interaction.user.id != self.author_id:
+            await interaction.response.send_message("❌ Tylko autor komendy może przełączać strony.", ephemeral=True)
+            return False
+        return True
+
+    async def _refresh(self, interaction: discord.Interaction):
+        embed = self.build_embed() or discord.Embed(title="📋 Lista Wszystkich Graczy", description="Brak danych o graczach.")
+        await interaction.response.edit_message(embed=embed, view=self)
+
+    async def on_timeout(self):
+        if self.message:
+            try:
+                await self.message.edit(view=None)
+            except discord.HTTPException:
+                pass
+
+    @discord.ui.button(label="◀", style=discord.ButtonStyle.primary)
+    async def previous_button(self, interaction: discord.Interaction, button: discord.ui.Button):
+        self.page = max(0, self.page - 1)
+        await self._refresh(interaction)
+
+    @discord.ui.button(label="▶", style=discord.ButtonStyle.primary)
+    async def next_button(self, interaction: discord.Interaction, button: discord.ui.Button):
+        self.page += 1
+        await self._refresh(interaction)
+
+    @discord.ui.button(label="Tylko online", style=discord.ButtonStyle.secondary)
+    async def online_button(self, interaction: discord.Interaction, button: discord.ui.Button):
+        self.online_only = not self.online_only
+        self.page = 0
+        await self._refresh(interaction)
+
+    @discord.ui.select(placeholder="Sortuj według...", row=1)
+    async def sort_select(self, interaction: discord.Interaction, select: discord.ui.Select):
+        self.sort = select.values[0]
+        self.page = 0
+        for option in select.options:
+            option.default = option.value == self.sort
+        await self._refresh(interaction)
+
+
 class Status(commands.Cog):
     def __init__(self, bot):
         self.bot = bot
         self.last_status = None
         self.last_players = set()  # Zbiór ID graczy z ostatniego sprawdzenia
-        self.player_tracker = PlayerTracker()
+        self.player_tracker = bot.player_tracker  # Wspólny tracker należący do bota
         self.status_message = None  # Przechowuje ostatnią wiadomość statusu
         self.status_channel = None  # Przechowuje kanał statusu
         self.auto_update_enabled = True  # Flaga kontrolująca automatyczne aktualizacje
+        self.last_presence = None  # Ostatnio ustawiony tekst obecności bota
+        self.last_embed_update = 0.0  # time.monotonic() ostatniej aktualizacji embeda
+        self.embed_interval = float(self.bot.config.get('STATUS_EMBED_INTERVAL', 60))
+        # Nawet bez zmian treści odśwież stopkę co jakiś czas, żeby było widać, że bot działa
+        self.embed_max_age = float(self.bot.config.get('STATUS_EMBED_MAX_AGE', 600))
+        self.last_embed_hash = None
+        self.last_embed_edit = 0.0  # time.monotonic() ostatniej faktycznej edycji
+        self.status_message_id = self._load_status_message_id()
+        
+        self.notify_players = str(self.bot.config.get('PLAYER_NOTIFICATIONS', 'False')).lower() == 'true'
+        self._event_tasks = []
         
-        # Startuj taski
-        self.update_status.start()
-        self.check_status.start()
-        self.update_status_embed.start()
+        # Wszystkie dane o serwerze przychodzą ze wspólnego pollera bota
+        self.bot.poller.subscribe(self.on_snapshot)
+        # Zdarzenia graczy liczone względem graczy online zapamiętanych przez tracker
+        self.bot.player_events.seed(self.player_tracker.online_roster())
+
+    async def cog_load(self):
+        queue = self.bot.player_events.subscribe()
+        self._event_tasks.append((queue, asyncio.create_task(self._track_player_events(queue))))
+        if self.notify_players:
+            queue = self.bot.player_events.subscribe()
+            self._event_tasks.append((queue, asyncio.create_task(self._notify_player_events(queue))))
 
     def cog_unload(self):
-        self.update_status.cancel()
-        self.check_status.cancel()
-        self.update_status_embed.cancel()
+        self.bot.poller.unsubscribe(self.on_snapshot)
+        for queue, task in self._event_tasks:
+            self.bot.player_events.unsubscribe(queue)
+            task.cancel()
+        self._event_tasks.clear()
+        # Zapisz zaległe zmiany graczy (write-behind) przed wyłączeniem
+        self.player_tracker.flush()
+
+    async def _track_player_events(self, queue):
+        """Konsument zdarzeń: aktualizuje status online i czas gry w trackerze"""
+        while True:
+            event = await queue.get()
+            try:
+                self.player_tracker.apply_event(event)
+            except Exception as e:
+                logger.error(f"Błąd aktualizacji trackera graczy: {str(e)}")
 
-    @tasks.loop(seconds=30)
-    async def check_status(self):
+    async def _notify_player_events(self, queue):
+        """Konsument zdarzeń: powiadomienia o dołączeniu/wyjściu graczy na kanale publicznym"""
+        await self.bot.wait_until_ready()
+        while True:
+            event = await queue.get()
+            channel = self.bot.get_channel(self.bot.public_channel)
+            if not channel:
+                continue
+            if isinstance(event, PlayerJoined):
+                description = f"➡️ **{event.name}** dołączył do serwera"
+            elif isinstance(event, PlayerLeft):
+                description = f"⬅️ **{event.name}** opuścił serwer"
+            elif isinstance(event, PlayerRenamed):
+                description = f"✏️ **{event.old_name}** zmienił nazwę na **{event.new_name}**"
+            else:
+                continue
+            # Nie czekaj na wysyłkę - przy zatorze te powiadomienia są odrzucane jako pierwsze
+            self.bot.outbound.send(
+                channel, PRIORITY_PLAYER_EVENT, droppable=True,
+                embed=discord.Embed(description=description, color=discord.Color.light_grey())
+            )
+
+    async def on_snapshot(self, snapshot, previous):
+        """Obsługuje nowy snapshot serwera: obecność, gracze, powiadomienia i embed"""
+        logger.info(
+            f"Snapshot: {'ONLINE' if snapshot.online else 'OFFLINE'}, graczy: {snapshot.player_count}, "
+            f"API cache: {self.bot.api.cache_stats()}"
+        )
+        await self._update_presence(snapshot)
+        await self.check_status(snapshot)
+        await self.update_status_embed(snapshot)
+
+    async def check_status(self, snapshot):
         """Sprawdza zmiany statusu serwera i wysyła powiadomienia"""
         try:
+            current_status = snapshot.online
+            previous_status = self.last_status
+            self.last_status = current_status
             if not self.bot.public_channel:
                 return
                 
@@ -41,63 +229,25 @@ class Status(commands.Cog):
             if not channel:
                 print(f"Nie znaleziono kanału {self.bot.public_channel}")
                 return
-                
-            previous_status = self.last_status
-            current_status = await self._update_presence()
-            
-            # Sprawdź nowych graczy
-            if current_status:
-                await self._check_new_players()
             
             # Wyślij powiadomienie tylko przy zmianie statusu
             if previous_status is not None and previous_status != current_status:
-                await self._send_status_notification(channel, current_status)
+                self._send_status_notification(channel, current_status)
                 # Loguj zmianę statusu
                 await self._log_status_change(current_status)
-            
-            self.last_status = current_status
 
         except Exception as e:
             logger.error(f"Błąd sprawdzania statusu: {str(e)}")
 
-    @check_status.before_loop
-    async def before_check_status(self):
-        await self.bot.wait_until_ready()
-
-    async def _check_new_players(self):
-        """Sprawdza i śledzi nowych graczy"""
-        try:
-            list_data = await self.bot.api_request('GET', '/player/list')
-            if not list_data.get('succeeded'):
-                return
-                
-            players_raw = list_data.get('data', {})
-            
-            # Konwertuj dane graczy do listy
-            players = []
-            if isinstance(players_raw, dict):
-                players = list(players_raw.values())
-            elif isinstance(players_raw, list):
-                players = players_raw
-            
-            # Aktualizuj status online i czas gry
-            self.player_tracker.update_online_status(players)
-            
-        except Exception as e:
-            logger.error(f"Błąd sprawdzania nowych graczy: {str(e)}")
-
-    async def _send_status_notification(self, channel, status):
-        """Wysyła powiadomienie o zmianie statusu"""
+    def _send_status_notification(self, channel, status):
+        """Kolejkuje powiadomienie o zmianie statusu (bez czekania na wysyłkę - błędy loguje kolejka)"""
         status_msg = "🟢 **Serwer uruchomiony!**" if status else "🔴 **Serwer wyłączony!**"
         embed = discord.Embed(
             description=status_msg,
             color=discord.Color.green() if status else discord.Color.red()
         )
         embed.set_footer(text=datetime.now().strftime('%Y-%m-%d %H:%M:%S'))
-        try:
-            await channel.send(embed=embed)
-        except discord.HTTPException as e:
-            logger.error(f"Nie można wysłać powiadomienia: {str(e)}")
+        self.bot.outbound.send(channel, PRIORITY_NOTIFICATION, embed=embed)
 
     async def _log_status_change(self, new_status):
         """Loguje zmianę statusu serwera"""
@@ -112,50 +262,29 @@ class Status(commands.Cog):
         except Exception as e:
             logger.error(f"Błąd logowania zmiany statusu: {str(e)}")
 
-    @tasks.loop(minutes=1)
-    async def update_status(self):
-        """Aktualizuje status bota co minutę"""
-        logger.info("Status Update Task: Running...")
+    async def _update_presence(self, snapshot):
+        """Aktualizuje obecność bota na podstawie snapshotu i zwraca status serwera"""
         try:
-            status_text = await self._update_presence()
-            logger.info(f"Status Update Task: Presence updated successfully. Status: {status_text}")
-        except Exception as e:
-            logger.error(f"Status update error: {str(e)}", exc_info=True)
-
-    @update_status.before_loop
-    async def before_update_status(self):
-        await self.bot.wait_until_ready()
-
-    async def _update_presence(self):
-        """Aktualizuje obecność bota i zwraca status serwera"""
-        try:
-            # Używaj API z głównego bota
-            status_check = await self.bot.api_request('GET', '/player/count')
-            
-            if status_check.get('succeeded'):
-                count = status_check['data'].get('num_players', 0)
-                status_text = f"{count}/{self.bot.game_slots} 🚗"
+            if snapshot.online:
+                status_text = f"{snapshot.player_count}/{self.bot.game_slots} 🚗"
                 activity_type = discord.ActivityType.playing
-                server_online = True
             else:
                 status_text = "Serwer OFFLINE 🔴"
                 activity_type = discord.ActivityType.watching
-                server_online = False
 
-            activity = discord.Activity(
-                type=activity_type,
-                name=status_text
-            )
-            await self.bot.change_presence(activity=activity)
+            # Nie wysyłaj do Discorda identycznej obecności
+            if status_text != self.last_presence:
+                activity = discord.Activity(
+                    type=activity_type,
+                    name=status_text
+                )
+                await self.bot.change_presence(activity=activity)
+                self.last_presence = status_text
             
-            return server_online
+            return snapshot.online
             
         except Exception as e:
             logger.error(f"Błąd aktualizacji statusu: {str(e)}")
-            await self.bot.change_presence(activity=discord.Activity(
-                name="Serwer OFFLINE 🔴",
-                type=discord.ActivityType.watching
-            ))
             return False
     
     @commands.command(name='status')
@@ -174,29 +303,15 @@ class Status(commands.Cog):
                 if not self.status_channel:
                     return
             
-            # Usuń wszystkie wiadomości na kanale statusu
-            try:
-                messages = []
-                async for message in self.status_channel.history(limit=None):
-                    messages.append(message)
-                if messages:
-                    await self.status_channel.delete_messages(messages)
-            except discord.errors.HTTPException:
-                # Jeśli bulk delete się nie powiedzie, usuń pojedynczo
-                for message in messages:
-                    try:
-                        await message.delete()
-                    except discord.errors.NotFound:
-                        continue
-            
-            # Wygeneruj i wyślij nowy embed
-            embed = await self._generate_status_embed()
+            # Wygeneruj embed i wymuś edycję istniejącej wiadomości statusu
+            snapshot = self.bot.poller.latest or await self.bot.poller.poll_once()
+            embed = self._generate_status_embed(snapshot)
             if embed:
-                await self.status_channel.send(embed=embed)
+                await self._publish_status_embed(embed, force=True)
                 
         except Exception as e:
             self.bot.logger.error(f"Błąd w komendzie status: {str(e)}")
-            await ctx.send("❌ Wystąpił błąd podczas aktualizacji statusu.", delete_after=5)
+            await self.bot.reply(ctx, "❌ Wystąpił błąd podczas aktualizacji statusu.", delete_after=5)
 
     @commands.command(name='players')
     async def players_command(self, ctx):
@@ -205,55 +320,89 @@ class Status(commands.Cog):
         if not any(role.id in [int(self.bot.config.get('DISCORD_ADMIN_ROLE_ID', 0)), 
                               int(self.bot.config.get('DISCORD_MOD_ROLE_ID', 0))] 
                   for role in ctx.author.roles):
-            await ctx.send("❌ Nie masz uprawnień do użycia tej komendy!", delete_after=5)
+            await self.bot.reply(ctx, "❌ Nie masz uprawnień do użycia tej komendy!", delete_after=5)
             return
 
-        players = self.player_tracker.get_all_players()
-        
-        if not players:
-            await ctx.send("❌ Brak danych o graczach.")
+        view = PlayersPageView(self.player_tracker, ctx.author.id)
+        embed = view.build_embed()
+        if embed is None:
+            await self.bot.reply(ctx, "❌ Brak danych o graczach.")
+            return
+        view.message = await self.bot.reply(ctx, embed=embed, view=view)
+
+    @commands.command(name='stats')
+    async def stats_command(self, ctx, days: int = DEFAULT_ANALYTICS_DAYS):
+        """Statystyki aktywności graczy: DAU/WAU, nowi gracze, długość sesji, retencja"""
+        # Sprawdź uprawnienia
+        if not any(role.id in [int(self.bot.config.get('DISCORD_ADMIN_ROLE_ID', 0)), 
+                              int(self.bot.config.get('DISCORD_MOD_ROLE_ID', 0))] 
+                  for role in ctx.author.roles):
+            await self.bot.reply(ctx, "❌ Nie masz uprawnień do użycia tej komendy!", delete_after=5)
             return
-        
-        # Sortuj graczy po statusie (online pierwsi) i dacie ostatniego widzenia
-        players.sort(key=lambda x: (-x['is_online'], x['last_seen']), reverse=True)
-        
-        # Utwórz embed z paginacją
-        pages = []
-        items_per_page = 10
-        
-        for i in range(0, len(players), items_per_page):
-            page_players = players[i:i + items_per_page]
-            embed = discord.Embed(
-                title="📋 Lista Wszystkich Graczy",
-                description=f"Strona {len(pages) + 1}/{(len(players) + items_per_page - 1) // items_per_page}",
-                color=discord.Color.blue()
-            )
-            
-            for player in page_players:
-                last_seen = datetime.fromisoformat(player['last_seen']).strftime('%Y-%m-%d %H:%M:%S')
-                status = "🟢 Online" if player['is_online'] else "⚫ Offline"
-                embed.add_field(
-                    name=f"👤 {player['name']} ({status})",
-                    value=f"ID: `{player['unique_id']}`\n"
-                          f"Dołączeń: `{player['join_count']}`\n"
-                          f"Czas gry: `{player['formatted_time']}`\n"
-                          f"Ostatnio: `{last_seen}`",
-                    inline=False
-                )
-            
-            pages.append(embed)
-        
-        if pages:
-            await ctx.send(embed=pages[0])  # Na razie wysyłamy tylko pierwszą stronę
-            await ctx.send("Paginacja nie jest jeszcze zaimplementowana.")
 
-    @tasks.loop(minutes=1)
-    async def update_status_embed(self):
-        """Aktualizuje embed statusu co minutę"""
+        days = max(1, min(days, MAX_ANALYTICS_DAYS))
+        try:
+            # Liczenie na tablicach numpy trwa do ~1 s dla milionów sesji - poza pętlą zdarzeń
+            summary = await asyncio.to_thread(self.bot.session_summary, days)
+        except Exception as e:
+            logger.error(f"Błąd liczenia statystyk graczy: {e}")
+            await self.bot.reply(ctx, "❌ Nie udało się policzyć statystyk.", delete_after=5)
+            return
+        await self.bot.reply(ctx, embed=self._generate_stats_embed(summary))
+
+    def _generate_stats_embed(self, summary):
+        """Generuje embed z podsumowaniem analityki sesji"""
+        embed = discord.Embed(
+            title=f"📈 Aktywność graczy - ostatnie {summary['days']} dni",
+            color=discord.Color.blurple()
+        )
+        if not summary['sessions'] and not summary['open_sessions']:
+            embed.description = "Brak zapisanych sesji w tym okresie."
+            return embed
+
+        stickiness = f" ({summary['stickiness'] * 100:.0f}% DAU/WAU)" if summary['stickiness'] is not None else ""
+        embed.add_field(
+            name="Aktywni gracze",
+            value=f"Dziś: **{summary['dau_today']}**\nŚrednio dziennie: **{summary['dau']:.1f}**\nOstatnie 7 dni: **{summary['wau']}**{stickiness}",
+            inline=True
+        )
+        new_ratio = f" ({summary['new_ratio'] * 100:.0f}%)" if summary['new_ratio'] is not None else ""
+        embed.add_field(
+            name="Nowi / powracający",
+            value=f"Nowi: **{summary['new_players']}**{new_ratio}\nPowracający: **{summary['returning_players']}**\nSesje: **{summary['sessions']}** (+{summary['open_sessions']} trwa)",
+            inline=True
+        )
+        length = summary['session_length']
+        embed.add_field(
+            name="Długość sesji",
+            value=f"Mediana: **{format_duration(length['median'])}**\nP90: **{format_duration(length['p90'])}**",
+            inline=True
+        )
+        retention = "\n".join(
+            f"Dzień {day}: **{data['rate'] * 100:.0f}%** ({data['retained']}/{data['cohort']})" if data['rate'] is not None
+            else f"Dzień {day}: brak danych"
+            for day, data in summary['retention'].items()
+        )
+        embed.add_field(name="Retencja", value=retention, inline=True)
+
+        # Trzy godziny z największą średnią liczbą graczy
+        cells = sorted(
+            ((value, weekday, hour) for weekday, row in enumerate(summary['heatmap']) for hour, value in enumerate(row)),
+            reverse=True
+        )[:3]
+        peak = "\n".join(f"{summary['weekdays'][weekday]} {hour:02d}:00 - śr. **{value:.1f}**" for value, weekday, hour in cells if value > 0)
+        embed.add_field(name="Szczyt aktywności", value=peak or "Brak danych", inline=True)
+        embed.set_footer(text=f"Policzono w {summary['computed_ms']:.0f} ms • {datetime.fromtimestamp(summary['as_of']).strftime('%d.%m.%Y, %H:%M:%S')}")
+        return embed
+
+    async def update_status_embed(self, snapshot):
+        """Aktualizuje embed statusu (nie częściej niż co embed_interval sekund)"""
         try:
             # Jeśli auto-update jest wyłączony, nie rób nic
             if not self.auto_update_enabled:
                 return
+            if time.monotonic() - self.last_embed_update < self.embed_interval:
+                return
                 
             if not self.status_channel:
                 config = self.bot.config
@@ -264,66 +413,121 @@ class Status(commands.Cog):
                 if not self.status_channel:
                     return
 
-            # Usuń wszystkie wiadomości na kanale
-            try:
-                messages = []
-                async for message in self.status_channel.history(limit=None):
-                    messages.append(message)
-                if messages:
-                    await self.status_channel.delete_messages(messages)
-            except discord.HTTPException as e:
-                # Jeśli bulk delete się nie powiedzie, spróbuj usuwać pojedynczo
-                try:
-                    for message in messages:
-                        try:
-                            await message.delete()
-                        except discord.HTTPException:
-                            continue
-                except Exception as e:
-                    logger.error(f"Błąd podczas usuwania wiadomości: {str(e)}")
-
-            # Wyślij nowy embed
-            embed = await self._generate_status_embed()
+            embed = self._generate_status_embed(snapshot)
             if embed:
-                self.status_message = await self.status_channel.send(embed=embed)
+                # Nie czekaj na Discorda - snapshot poller trzyma blokadę do końca on_snapshot
+                self._publish_status_embed(embed)
+                self.last_embed_update = time.monotonic()
 
         except Exception as e:
             logger.error(f"Błąd aktualizacji embeda statusu: {str(e)}")
 
-    @update_status_embed.before_loop
-    async def before_update_status_embed(self):
-        await self.bot.wait_until_ready()
+    def _load_status_message_id(self):
+        path = STATUS_STATE_FILE if os.path.exists(STATUS_STATE_FILE) else LEGACY_STATUS_STATE_FILE
+        try:
+            with open(path, 'r', encoding='utf-8') as f:
+                message_id = json.load(f).get('message_id')
+            return int(message_id) if message_id else None
+        except (OSError, ValueError, TypeError, AttributeError):
+            return None
 
-    async def _generate_status_embed(self):
-        """Generuje embed statusu"""
+    def _save_status_message_id(self, message_id):
+        """Zapisuje ID wiadomości statusu do własnego pliku bota (atomowo)"""
+        self.status_message_id = message_id
+        try:
+            tmp_path = f"{STATUS_STATE_FILE}.tmp"
+            with open(tmp_path, 'w', encoding='utf-8') as f:
+                json.dump({'message_id': message_id}, f, indent=2, ensure_ascii=False)
+            os.replace(tmp_path, STATUS_STATE_FILE)
+        except OSError as e:
+            logger.error(f"Nie można zapisać ID wiadomości statusu: {str(e)}")
+
+    async def _find_status_message(self):
+        """Zwraca istniejącą wiadomość statusu (z pamięci, po zapisanym ID lub z ostatnich wiadomości kanału)"""
+        if self.status_message is not None:
+            return self.status_message
+        if self.status_message_id:
+            try:
+                self.status_message = await self.status_channel.fetch_message(self.status_message_id)
+                return self.status_message
+            except discord.NotFound:
+                self._save_status_message_id(None)
+        # Brak zapisanego ID (np. pierwsze uruchomienie) - poszukaj naszego embeda wśród ostatnich wiadomości
+        async for message in self.status_channel.history(limit=10):
+            if message.author == self.bot.user and message.embeds and message.embeds[0].title == STATUS_EMBED_TITLE:
+                self.status_message = message
+                self._save_status_message_id(message.id)
+                return message
+        return None
+
+    def _publish_status_embed(self, embed, force=False):
+        """
+        Kolejkuje aktualizację statusu; czekająca aktualizacja jest zastępowana
+        nowszą. Zwraca future zadania - wiadomość i skrót treści zapisuje
+        callback po wysyłce, więc wywołujący nie musi na nią czekać.
+        """
+        priority = PRIORITY_MODERATION if force else PRIORITY_STATUS
+        future = self.bot.outbound.submit(
+            lambda: self._write_status_embed(embed, force),
+            priority,
+            bucket=("channel", self.status_channel.id),
+            supersede_key="status_embed",
+            droppable=not force,
+        )
+        future.add_done_callback(self._on_status_written)
+        return future
+
+    def _on_status_written(self, future):
+        """Zapamiętuje wiadomość statusu i skrót jej treści po udanej wysyłce"""
+        if future.cancelled() or future.exception() is not None or future.result() is None:
+            # Zadanie odrzucone, pominięte (bez zmian) albo nieudane - błąd zalogowała kolejka
+            return
+        message, content_hash = future.result()
+        if self.status_message_id != message.id:
+            self._save_status_message_id(message.id)
+        self.status_message = message
+        self.last_embed_hash = content_hash
+        self.last_embed_edit = time.monotonic()
+
+    async def _write_status_embed(self, embed, force=False):
+        """
+        Edytuje wiadomość statusu w miejscu. Edycja jest pomijana, gdy treść
+        (bez stopki) się nie zmieniła, a nowa wiadomość jest wysyłana tylko
+        wtedy, gdy poprzedniej już nie ma. Zwraca (wiadomość, skrót treści)
+        albo None, gdy nic nie wysłano.
+        """
+        content_hash = embed_content_hash(embed)
+        fresh = time.monotonic() - self.last_embed_edit < self.embed_max_age
+        if not force and content_hash == self.last_embed_hash and fresh:
+            return None
+
+        message = await self._find_status_message()
+        if message is not None:
+            try:
+                await message.edit(embed=embed)
+                return message, content_hash
+            except discord.NotFound:
+                self.status_message = None
+
+        message = await self.status_channel.send(embed=embed)
+        return message, content_hash
+
+    def _generate_status_embed(self, snapshot):
+        """Generuje embed statusu ze snapshotu serwera"""
         try:
-            start_time = time.monotonic()
-            count_data = await self.bot.api_request('GET', '/player/count')
-            is_online = count_data.get('succeeded', False)
-            
             # Jeśli serwer jest offline
-            if not is_online:
+            if not snapshot.online:
                 embed = discord.Embed(
-                    title="📊 Status Serwera",
+                    title=STATUS_EMBED_TITLE,
                     description="```diff\n- Serwer jest aktualnie niedostępny```",
                     color=discord.Color.dark_red()
                 )
                 embed.set_footer(text=f"Ostatnia aktualizacja • {datetime.now().strftime('%d.%m.%Y, %H:%M:%S')}")
                 return embed
 
-            # Pobierz ping i listę graczy
-            ping = int((time.monotonic() - start_time) * 1000)
-            list_data = await self.bot.api_request('GET', '/player/list')
-            count = count_data['data'].get('num_players', 0)
-            
-            # Przetwórz listę graczy
-            players = []
-            if list_data.get('succeeded'):
-                players_raw = list_data.get('data', {})
-                if isinstance(players_raw, dict):
-                    players = list(players_raw.values())
-                elif isinstance(players_raw, list):
-                    players = players_raw
+            # Ping i lista graczy z tego samego cyklu odpytywania
+            ping = snapshot.latency_ms or 0
+            players = list(snapshot.players)
             
             # Generuj listę graczy
             if players:
@@ -336,7 +540,7 @@ class Status(commands.Cog):
             
             # Stwórz embed
             embed = discord.Embed(
-                title="📊 Status Serwera",
+                title=STATUS_EMBED_TITLE,
                 description=f"**Gracze online ({len(players)}):**\n{player_list}\n\n**Ping:**\n{ping_icon} {ping}ms\n\n**Status:**\n✅ Online ({len(players)})",
                 color=discord.Color.blurple()
             )
@@ -355,7 +559,7 @@ class Status(commands.Cog):
         if not any(role.id in [int(self.bot.config.get('DISCORD_ADMIN_ROLE_ID', 0)), 
                               int(self.bot.config.get('DISCORD_MOD_ROLE_ID', 0))] 
                   for role in ctx.author.roles):
-            await ctx.send("❌ Nie masz uprawnień do użycia tej komendy!", delete_after=5)
+            await self.bot.reply(ctx, "❌ Nie masz uprawnień do użycia tej komendy!", delete_after=5)
             return
             
         self.auto_update_enabled = not self.auto_update_enabled
@@ -365,7 +569,7 @@ class Status(commands.Cog):
             description=f"✅ Automatyczne aktualizacje statusu zostały {status}!",
             color=discord.Color.green()
         )
-        await ctx.send(embed=embed)
+        await self.bot.reply(ctx, embed=embed)
 
 async def setup(bot):
     await bot.add_cog(Status(bot))
@@ -0,0 +1,441 @@
+import asyncio
+import logging
+import random
+import time
+from datetime import datetime
+from typing import Any, Dict, Optional, Tuple
+
+import aiohttp
+
+logger = logging.getLogger(__name__)
+
+# Domyślne parametry puli połączeń z API serwera gry
+DEFAULT_TIMEOUT = 10  # sekundy
+DEFAULT_POOL_LIMIT = 20
+DEFAULT_POOL_LIMIT_PER_HOST = 10
+DEFAULT_KEEPALIVE_TIMEOUT = 30  # sekundy
+DEFAULT_DNS_CACHE_TTL = 300  # sekundy
+
+# Domyślny czas życia (w sekundach) odpowiedzi GET w cache, per endpoint
+DEFAULT_CACHE_TTL = 5.0
+DEFAULT_ENDPOINT_CACHE_TTL = {
+    "/player/count": 5.0,
+    "/player/list": 5.0,
+    "/player/banlist": 15.0,
+}
+
+# Limity czasu (w sekundach) per endpoint - krótsze niż ogólny DEFAULT_TIMEOUT
+DEFAULT_ENDPOINT_TIMEOUTS = {
+    "/player/count": 3.0,
+    "/player/list": 5.0,
+    "/player/banlist": 8.0,
+}
+
+# Ponawianie zapytań GET (tylko idempotentnych) z losowym opóźnieniem
+DEFAULT_GET_RETRIES = 2
+DEFAULT_RETRY_BACKOFF = 0.5  # sekundy, podwajane przy kolejnych próbach
+
+# Bezpiecznik (circuit breaker)
+DEFAULT_BREAKER_THRESHOLD = 5  # kolejne porażki otwierające bezpiecznik
+DEFAULT_BREAKER_RESET = 30.0  # sekundy do próby półotwartej
+
+BREAKER_CLOSED = "closed"
+BREAKER_OPEN = "open"
+BREAKER_HALF_OPEN = "half_open"
+
+
+class CircuitBreaker:
+    """
+    Bezpiecznik dla API serwera gry (closed -> open -> half_open -> closed).
+
+    Po `threshold` kolejnych porażkach (brak połączenia, timeout, HTTP 5xx)
+    bezpiecznik się otwiera i zapytania kończą się od razu, bez czekania
+    na timeout. Po `reset_timeout` sekundach przepuszczane jest jedno
+    zapytanie próbne - sukces zamyka bezpiecznik, porażka otwiera go ponownie.
+    """
+
+    def __init__(self, threshold: int = DEFAULT_BREAKER_THRESHOLD, reset_timeout: float = DEFAULT_BREAKER_RESET):
+        self.threshold = threshold
+        self.reset_timeout = reset_timeout
+        self.state = BREAKER_CLOSED
+        self.failures = 0
+        self.opened_at: Optional[float] = None
+        self.opened_at_wall: Optional[float] = None
+        self.rejected = 0
+        self.last_error = ""
+        self._probe_inflight = False
+
+    def allow(self) -> bool:
+        """Czy zapytanie może trafić do serwera"""
+        if self.state == BREAKER_OPEN:
+            if time.monotonic() - self.opened_at < self.reset_timeout:
+                self.rejected += 1
+                return False
+            self.state = BREAKER_HALF_OPEN
+            logger.info("Bezpiecznik API: próba półotwarta")
+        if self.state == BREAKER_HALF_OPEN:
+            if self._probe_inflight:
+                self.rejected += 1
+                return False
+            self._probe_inflight = True
+        return True
+
+    def record_success(self) -> None:
+        if self.state != BREAKER_CLOSED:
+            logger.info("Bezpiecznik API zamknięty - serwer gry odpowiada")
+        self.state = BREAKER_CLOSED
+        self.failures = 0
+        self.opened_at = None
+        self.opened_at_wall = None
+        self._probe_inflight = False
+
+    def record_failure(self, error: str = "") -> None:
+        self.failures += 1
+        self.last_error = error
+        if self.state == BREAKER_HALF_OPEN or self.failures >= self.threshold:
+            if self.state != BREAKER_OPEN:
+                logger.warning(f"Bezpiecznik API otwarty po {self.failures} porażkach: {error}")
+            self.state = BREAKER_OPEN
+            self.opened_at = time.monotonic()
+            self.opened_at_wall = time.time()
+        self._probe_inflight = False
+
+    def release_probe(self) -> None:
+        """Zwalnia miejsce próby półotwartej, gdy zapytanie próbne nie dało wyniku (np. zostało anulowane)"""
+        self._probe_inflight = False
+
+    def retry_in(self) -> float:
+        """Sekundy do najbliższej próby półotwartej (0, gdy bezpiecznik nie jest otwarty)"""
+        if self.state != BREAKER_OPEN:
+            return 0.0
+        return max(0.0, self.reset_timeout - (time.monotonic() - self.opened_at))
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "state": self.state,
+            "failures": self.failures,
+            "threshold": self.threshold,
+            "rejected": self.rejected,
+            "opened_at": datetime.fromtimestamp(self.opened_at_wall).isoformat() if self.opened_at_wall else None,
+            "retry_in": round(self.retry_in(), 1),
+            "last_error": self.last_error,
+        }
+
+
+def _is_failure(response: Dict[str, Any]) -> bool:
+    """Czy odpowiedź świadczy o niedostępności serwera (a nie np. o błędnym zapytaniu)"""
+    if response.get('error_type') in ('connection', 'timeout'):
+        return True
+    status = response.get('status_code')
+    return status is not None and status >= 500
+
+
+class GameApiClient:
+    """
+    Długożyjący klient HTTP do API serwera gry.
+
+    Utrzymuje jedną sesję `aiohttp` z pulą połączeń keep-alive, dzięki czemu
+    kolejne zapytania nie otwierają nowego połączenia TCP ani nie powtarzają
+    zapytania DNS. Sesja jest otwierana przez `start()` i zamykana przez `close()`.
+
+    Identyczne zapytania GET są scalane (single-flight): równoległe wywołania
+    czekają na jedno zapytanie do serwera, a udane odpowiedzi są trzymane
+    w krótkim cache z czasem życia ustawianym per endpoint.
+
+    Wszystkie zapytania przechodzą przez wspólny `CircuitBreaker`. Każdy
+    endpoint ma własny limit czasu, a nieudane GET-y są ponawiane z losowym
+    opóźnieniem. Przy otwartym bezpieczniku GET zwraca od razu błąd
+    z ostatnią znaną odpowiedzią (`last_known`).
+    """
+
+    def __init__(
+        self,
+        base_url: str,
+        password: str,
+        timeout: float = DEFAULT_TIMEOUT,
+        pool_limit: int = DEFAULT_POOL_LIMIT,
+        pool_limit_per_host: int = DEFAULT_POOL_LIMIT_PER_HOST,
+        keepalive_timeout: float = DEFAULT_KEEPALIVE_TIMEOUT,
+        cache_ttl: Optional[Dict[str, float]] = None,
+        default_cache_ttl: float = DEFAULT_CACHE_TTL,
+        endpoint_timeouts: Optional[Dict[str, float]] = None,
+        get_retries: int = DEFAULT_GET_RETRIES,
+        retry_backoff: float = DEFAULT_RETRY_BACKOFF,
+        breaker: Optional[CircuitBreaker] = None,
+    ):
+        self.base_url = base_url
+        self.password = password
+        self.timeout = aiohttp.ClientTimeout(total=timeout)
+        self.pool_limit = pool_limit
+        self.pool_limit_per_host = pool_limit_per_host
+        self.keepalive_timeout = keepalive_timeout
+        self._session: Optional[aiohttp.ClientSession] = None
+
+        # Cache i scalanie zapytań GET
+        self.cache_ttl: Dict[str, float] = dict(DEFAULT_ENDPOINT_CACHE_TTL)
+        if cache_ttl:
+            self.cache_ttl.update({self._normalize(k): float(v) for k, v in cache_ttl.items()})
+        self.default_cache_ttl = default_cache_ttl
+        self._cache: Dict[str, Tuple[float, Dict[str, Any]]] = {}
+        self._inflight: Dict[str, asyncio.Task] = {}
+        # Zwiększane przy każdym zapisie - odpowiedzi pobrane przed zapisem nie trafiają do cache
+        self._generation = 0
+        self.cache_hits = 0
+        self.cache_misses = 0
+        self.coalesced = 0
+
+        # Odporność na zawieszony serwer
+        self.default_timeout = timeout
+        self.endpoint_timeouts: Dict[str, float] = dict(DEFAULT_ENDPOINT_TIMEOUTS)
+        if endpoint_timeouts:
+            self.endpoint_timeouts.update({self._normalize(k): float(v) for k, v in endpoint_timeouts.items()})
+        self.get_retries = get_retries
+        self.retry_backoff = retry_backoff
+        self.breaker = breaker or CircuitBreaker()
+        # Ostatnia udana odpowiedź każdego GET-a - zwracana przy otwartym bezpieczniku
+        self._last_known: Dict[str, Tuple[float, Dict[str, Any]]] = {}
+        self.retries = 0
+
+    @classmethod
+    def from_config(cls, config: Dict[str, Any], base_url: str, password: str) -> "GameApiClient":
+        """Tworzy klienta na podstawie konfiguracji bota"""
+        return cls(
+            base_url,
+            password,
+            timeout=float(config.get("GAME_API_TIMEOUT", DEFAULT_TIMEOUT)),
+            pool_limit=int(config.get("GAME_API_POOL_LIMIT", DEFAULT_POOL_LIMIT)),
+            pool_limit_per_host=int(config.get("GAME_API_POOL_LIMIT_PER_HOST", DEFAULT_POOL_LIMIT_PER_HOST)),
+            keepalive_timeout=float(config.get("GAME_API_KEEPALIVE_TIMEOUT", DEFAULT_KEEPALIVE_TIMEOUT)),
+            cache_ttl=config.get("GAME_API_CACHE_TTL") or None,
+            default_cache_ttl=float(config.get("GAME_API_DEFAULT_CACHE_TTL", DEFAULT_CACHE_TTL)),
+            endpoint_timeouts=config.get("GAME_API_ENDPOINT_TIMEOUTS") or None,
+            get_retries=int(config.get("GAME_API_GET_RETRIES", DEFAULT_GET_RETRIES)),
+            retry_backoff=float(config.get("GAME_API_RETRY_BACKOFF", DEFAULT_RETRY_BACKOFF)),
+            breaker=CircuitBreaker(
+                threshold=int(config.get("GAME_API_BREAKER_THRESHOLD", DEFAULT_BREAKER_THRESHOLD)),
+                reset_timeout=float(config.get("GAME_API_BREAKER_RESET", DEFAULT_BREAKER_RESET)),
+            ),
+        )
+
+    @staticmethod
+    def _normalize(endpoint: str) -> str:
+        return endpoint if endpoint.startswith('/') else f"/{endpoint}"
+
+    def ttl_for(self, endpoint: str) -> float:
+        """Zwraca czas życia cache dla endpointu (bez parametrów zapytania)"""
+        path = self._normalize(endpoint).split('?', 1)[0]
+        return self.cache_ttl.get(path, self.default_cache_ttl)
+
+    def timeout_for(self, endpoint: str) -> float:
+        """Zwraca limit czasu dla endpointu (bez parametrów zapytania)"""
+        path = self._normalize(endpoint).split('?', 1)[0]
+        return self.endpoint_timeouts.get(path, self.default_timeout)
+
+    def health(self) -> Dict[str, Any]:
+        """Stan bezpiecznika i liczniki ponowień (dla panelu)"""
+        return dict(self.breaker.to_dict(), retries=self.retries)
+
+    def invalidate(self) -> None:
+        """Czyści cache odpowiedzi GET (np. po kick/ban/unban)"""
+        self._generation += 1
+        self._cache.clear()
+        self._inflight.clear()
+
+    def cache_stats(self) -> Dict[str, Any]:
+        """Zwraca liczniki cache: trafienia, chybienia i scalone zapytania"""
+        served = self.cache_hits + self.coalesced
+        total = served + self.cache_misses
+        return {
+            "hits": self.cache_hits,
+            "misses": self.cache_misses,
+            "coalesced": self.coalesced,
+            "upstream_requests": self.cache_misses,
+            "saved_ratio": round(served / total, 3) if total else 0.0,
+        }
+
+    @property
+    def closed(self) -> bool:
+        return self._session is None or self._session.closed
+
+    async def start(self) -> None:
+        """Otwiera sesję HTTP z pulą połączeń (jeśli nie jest już otwarta)"""
+        if not self.closed:
+            return
+        connector = aiohttp.TCPConnector(
+            limit=self.pool_limit,
+            limit_per_host=self.pool_limit_per_host,
+            keepalive_timeout=self.keepalive_timeout,
+            ttl_dns_cache=DEFAULT_DNS_CACHE_TTL,
+        )
+        self._session = aiohttp.ClientSession(
+            connector=connector,
+            timeout=self.timeout,
+            headers={"Authorization": f"Bearer {self.password}"},
+        )
+        logger.info(
+            f"Klient API serwera gry uruchomiony (pula: {self.pool_limit}, na host: {self.pool_limit_per_host})"
+        )
+
+    async def close(self) -> None:
+        """Zamyka sesję HTTP i wszystkie połączenia z puli"""
+        if self._session is not None and not self._session.closed:
+            await self._session.close()
+            logger.info("Klient API serwera gry zamknięty")
+        self._session = None
+
+    async def request(self, method: str, endpoint: str, payload: Optional[Dict] = None) -> Dict[str, Any]:
+        """
+        Wykonuje zapytanie do API serwera gry przez współdzieloną sesję.
+        Zapytania GET są obsługiwane z cache lub scalane z trwającym zapytaniem.
+
+        Args:
+            method (str): Metoda HTTP ('GET' lub 'POST')
+            endpoint (str): Endpoint API
+            payload (dict, optional): Dane dla żądania POST
+
+        Returns:
+            dict: Odpowiedź z API zawierająca status i dane
+        """
+        if method.upper() != 'GET' or payload is not None:
+            response = await self._send(method, endpoint, payload)
+            # Zapis mógł zmienić stan serwera - nie serwuj starych list graczy
+            self.invalidate()
+            return response
+
+        key = self._normalize(endpoint)
+        cached = self._cache.get(key)
+        if cached is not None and cached[0] > time.monotonic():
+            self.cache_hits += 1
+            return dict(cached[1])
+
+        task = self._inflight.get(key)
+        if task is not None:
+            self.coalesced += 1
+        else:
+            self.cache_misses += 1
+            task = asyncio.ensure_future(self._fetch(key, self._generation))
+            self._inflight[key] = task
+            task.add_done_callback(lambda t, key=key: self._forget(key, t))
+
+        # shield - anulowanie jednego z oczekujących nie przerywa zapytania pozostałym
+        return dict(await asyncio.shield(task))
+
+    def _forget(self, key: str, task: asyncio.Task) -> None:
+        if self._inflight.get(key) is task:
+            del self._inflight[key]
+
+    async def _fetch(self, key: str, generation: int) -> Dict[str, Any]:
+        """Pobiera odpowiedź GET z serwera (z ponowieniami) i zapisuje ją w cache"""
+        for attempt in range(self.get_retries + 1):
+            if attempt:
+                # Pełny jitter - równoległe ponowienia nie uderzają w serwer jednocześnie
+                self.retries += 1
+                await asyncio.sleep(random.uniform(0, self.retry_backoff * 2 ** (attempt - 1)))
+            response = await self._send('GET', key)
+            if not _is_failure(response):
+                break
+        if response.get('succeeded'):
+            self._last_known[key] = (time.time(), response)
+            ttl = self.ttl_for(key)
+            if ttl > 0 and generation == self._generation:
+                self._cache[key] = (time.monotonic() + ttl, response)
+        return response
+
+    def _circuit_open_response(self, endpoint: str) -> Dict[str, Any]:
+        response = {
+            "succeeded": False,
+            "status_code": None,
+            "data": {},
+            "message": f"Serwer gry niedostępny - ponowna próba za {self.breaker.retry_in():.0f}s",
+            "error_type": "circuit_open",
+        }
+        last_known = self._last_known.get(self._normalize(endpoint))
+        if last_known is not None:
+            fetched_at, cached = last_known
+            response["last_known"] = cached.get('data', {})
+            response["last_known_at"] = datetime.fromtimestamp(fetched_at).isoformat()
+        return response
+
+    async def _send(self, method: str, endpoint: str, payload: Optional[Dict] = None) -> Dict[str, Any]:
+        """Wysyła zapytanie przez bezpiecznik - przy otwartym kończy się od razu"""
+        if not self.breaker.allow():
+            return self._circuit_open_response(endpoint)
+        probe = self.breaker.state == BREAKER_HALF_OPEN
+        try:
+            response = await self._send_once(method, endpoint, payload)
+            if _is_failure(response):
+                self.breaker.record_failure(response.get('message', ''))
+            else:
+                self.breaker.record_success()
+            return response
+        finally:
+            if probe:
+                # Anulowana próba (CancelledError, np. po ROSTER_DEADLINE) nie może zablokować bezpiecznika
+                self.breaker.release_probe()
+
+    async def _send_once(self, method: str, endpoint: str, payload: Optional[Dict] = None) -> Dict[str, Any]:
+        """
+        Wysyła pojedyncze zapytanie do API serwera gry (bez cache).
+
+        Args:
+            method (str): Metoda HTTP ('GET' lub 'POST')
+            endpoint (str): Endpoint API
+            payload (dict, optional): Dane dla żądania POST
+
+        Returns:
+            dict: Odpowiedź z API zawierająca status i dane
+        """
+        try:
+            if method.upper() not in ['GET', 'POST']:
+                raise ValueError(f"Nieobsługiwana metoda HTTP: {method}")
+
+            # Walidacja URL
+            if not endpoint.startswith('/'):
+                endpoint = f"/{endpoint}"
+
+            # Dodaj password do endpointu
+            endpoint = f"{endpoint}{'&' if '?' in endpoint else '?'}password={self.password}"
+            url = f"{self.base_url}{endpoint}"
+
+            if self.closed:
+                await self.start()
+            assert self._session is not None
+
+            timeout = aiohttp.ClientTimeout(total=self.timeout_for(endpoint))
+            async with self._session.request(method, url, json=payload, timeout=timeout) as response:
+                try:
+                    data = await response.json()
+                except aiohttp.ContentTypeError:
+                    data = {}
+
+                return {
+                    "succeeded": 200 <= response.status < 300,
+                    "status_code": response.status,
+                    "data": data.get('data', {}),
+                    "message": data.get('message', f"HTTP {response.status}")
+                }
+
+        except asyncio.TimeoutError:
+            return {
+                "succeeded": False,
+                "status_code": None,
+                "data": {},
+                "message": f"Przekroczono limit czasu ({self.timeout_for(endpoint)}s)",
+                "error_type": "timeout"
+            }
+        except aiohttp.ClientError as e:
+            return {
+                "succeeded": False,
+                "status_code": None,
+                "data": {},
+                "message": f"Błąd połączenia: {str(e)}",
+                "error_type": "connection"
+            }
+        except Exception as e:
+            return {
+                "succeeded": False,
+                "status_code": None,
+                "data": {},
+                "message": f"Błąd krytyczny: {str(e)}",
+                "error_type": "critical"
+            }
@@ -0,0 +1,314 @@
+"""
+Lokalny serwer udający API serwera dedykowanego MotorTown.
+
+Pozwala uruchomić bota i panel bez prawdziwego serwera gry - np. do testów
+obciążeniowych i sprawdzania zachowania przy opóźnieniach, błędach i awariach.
+
+Uruchomienie:
+    python -m mockserver --port 8080 --players 40 --churn 6 --latency 50 --error-rate 0.02
+
+W config/config.json ustaw GAME_SERVER_HOST=127.0.0.1 i GAME_SERVER_PORT na port
+mock serwera, a GAME_SERVER_RCON_PASSWORD na wartość --password.
+"""
+import argparse
+import asyncio
+import logging
+import random
+import time
+from dataclasses import dataclass
+from typing import Any, Dict, List, Optional
+
+from aiohttp import web
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_HOST = "127.0.0.1"
+DEFAULT_PORT = 8080
+DEFAULT_PASSWORD = "mock"
+
+NAME_PREFIXES = ["", "", "", "[PL] ", "[MT] ", "xX_", "Kierowca "]
+NAME_WORDS = [
+    "Kowalski", "Nowak", "Trucker", "Zbyszek", "Ciężarówka", "Łukasz", "Speedy",
+    "Driver", "Tir", "Mirek", "Bus", "Kurier", "Taxi", "Wiśnia", "Rally", "Diesel",
+]
+
+
+@dataclass
+class MockSettings:
+    """Parametry zachowania mock serwera"""
+    players: int = 20  # początkowa liczba graczy online
+    max_players: int = 50
+    churn: float = 4.0  # średnia liczba dołączeń + wyjść na minutę
+    latency_ms: float = 30.0  # średnie opóźnienie odpowiedzi
+    jitter_ms: float = 20.0  # losowy rozrzut opóźnienia (+/-)
+    error_rate: float = 0.0  # odsetek odpowiedzi HTTP 500
+    hang_rate: float = 0.0  # odsetek zapytań, na które serwer w ogóle nie odpowiada (do timeoutu)
+    outage_every: float = 0.0  # co ile sekund zaczyna się awaria (0 = bez awarii)
+    outage_duration: float = 30.0  # ile sekund trwa awaria
+    banned: int = 5  # początkowa liczba zbanowanych
+    seed: Optional[int] = None
+
+
+class MockGameServer:
+    """
+    Stan i obsługa zapytań mock serwera.
+
+    Lista graczy zmienia się w tle (losowe dołączenia i wyjścia), a każda
+    odpowiedź przechodzi przez wstrzykiwane opóźnienie, błędy i awarie.
+    Endpointy /mock/* pozwalają sterować awarią i odczytać liczniki
+    bez restartu serwera.
+    """
+
+    def __init__(self, settings: MockSettings, password: str = DEFAULT_PASSWORD):
+        self.settings = settings
+        self.password = password
+        self.random = random.Random(settings.seed)
+        self.online: Dict[str, Dict[str, Any]] = {}
+        self.offline_pool: Dict[str, Dict[str, Any]] = {}
+        self.banned: Dict[str, Dict[str, Any]] = {}
+        self.chat: List[Dict[str, Any]] = []
+        self.started_at = time.monotonic()
+        self.forced_outage_until = 0.0
+        self.requests = 0
+        self.errors = 0
+        self.hangs = 0
+        self.outage_rejections = 0
+        self._next_id = 76561198000000000
+        self._churn_task: Optional[asyncio.Task] = None
+
+        for _ in range(settings.max_players * 2):
+            player = self._new_player()
+            self.offline_pool[player["unique_id"]] = player
+        for _ in range(min(settings.players, settings.max_players)):
+            self._join()
+        for _ in range(settings.banned):
+            player = self._new_player()
+            self.banned[player["unique_id"]] = player
+
+    def _new_player(self) -> Dict[str, Any]:
+        self._next_id += self.random.randint(1, 10_000)
+        name = f"{self.random.choice(NAME_PREFIXES)}{self.random.choice(NAME_WORDS)}{self.random.randint(1, 999)}"
+        return {"unique_id": str(self._next_id), "name": name}
+
+    def _join(self) -> None:
+        if len(self.online) >= self.settings.max_players or not self.offline_pool:
+            return
+        unique_id = self.random.choice(list(self.offline_pool))
+        self.online[unique_id] = self.offline_pool.pop(unique_id)
+
+    def _leave(self, unique_id: Optional[str] = None) -> Optional[Dict[str, Any]]:
+        if unique_id is None:
+            if not self.online:
+                return None
+            unique_id = self.random.choice(list(self.online))
+        player = self.online.pop(unique_id, None)
+        if player is not None:
+            self.offline_pool[unique_id] = player
+        return player
+
+    async def _churn(self) -> None:
+        """Losowe dołączenia i wyjścia graczy (proces Poissona o średniej `churn` na minutę)"""
+        while True:
+            if self.settings.churn <= 0:
+                await asyncio.sleep(1)
+                continue
+            await asyncio.sleep(self.random.expovariate(self.settings.churn / 60))
+            # Liczba graczy oscyluje wokół wartości początkowej
+            target = max(1, self.settings.players)
+            if self.random.random() < target / (target + len(self.online)):
+                self._join()
+            else:
+                self._leave()
+
+    def in_outage(self) -> bool:
+        now = time.monotonic()
+        if now < self.forced_outage_until:
+            return True
+        if self.settings.outage_every <= 0:
+            return False
+        return (now - self.started_at) % self.settings.outage_every >= self.settings.outage_every - self.settings.outage_duration
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "requests": self.requests,
+            "errors": self.errors,
+            "hangs": self.hangs,
+            "outage_rejections": self.outage_rejections,
+            "online": len(self.online),
+            "banned": len(self.banned),
+            "chat_messages": len(self.chat),
+            "in_outage": self.in_outage(),
+        }
+
+    @staticmethod
+    def _ok(data: Any = None, message: str = "OK") -> web.Response:
+        return web.json_response({"succeeded": True, "code": 200, "data": data if data is not None else {}, "message": message})
+
+    @staticmethod
+    def _error(status: int, message: str) -> web.Response:
+        return web.json_response({"succeeded": False, "code": status, "data": {}, "message": message}, status=status)
+
+    @web.middleware
+    async def faults(self, request: web.Request, handler):
+        """Wstrzykuje opóźnienie, błędy i awarie przed właściwą obsługą zapytania"""
+        if request.path.startswith("/mock/"):
+            return await handler(request)
+        self.requests += 1
+        if self.in_outage():
+            # Awaria: serwer nie odpowiada, klient czeka do swojego timeoutu
+            self.outage_rejections += 1
+            await asyncio.sleep(3600)
+        if request.query.get("password") != self.password:
+            return self._error(401, "Invalid password")
+
+        delay = self.settings.latency_ms + self.random.uniform(-self.settings.jitter_ms, self.settings.jitter_ms)
+        await asyncio.sleep(max(0.0, delay) / 1000)
+
+        if self.settings.hang_rate and self.random.random() < self.settings.hang_rate:
+            self.hangs += 1
+            await asyncio.sleep(3600)
+        if self.settings.error_rate and self.random.random() < self.settings.error_rate:
+            self.errors += 1
+            return self._error(500, "Internal Server Error (mock)")
+        return await handler(request)
+
+    @staticmethod
+    async def _unique_id(request: web.Request) -> Optional[str]:
+        """ID gracza z ciała JSON lub z parametru zapytania"""
+        if request.can_read_body:
+            try:
+                body = await request.json()
+            except ValueError:
+                body = {}
+            if isinstance(body, dict) and body.get("unique_id"):
+                return str(body["unique_id"])
+        return request.query.get("unique_id")
+
+    async def player_count(self, request: web.Request) -> web.Response:
+        return self._ok({"num_players": len(self.online)})
+
+    async def player_list(self, request: web.Request) -> web.Response:
+        # Prawdziwy serwer zwraca listę graczy jako słownik indeksowany liczbami
+        return self._ok({str(index): dict(player) for index, player in enumerate(self.online.values())})
+
+    async def player_banlist(self, request: web.Request) -> web.Response:
+        return self._ok([dict(player) for player in self.banned.values()])
+
+    async def player_kick(self, request: web.Request) -> web.Response:
+        unique_id = await self._unique_id(request)
+        if self._leave(unique_id) is None:
+            return self._error(404, f"Player {unique_id} not found")
+        return self._ok(message=f"Kicked {unique_id}")
+
+    async def player_ban(self, request: web.Request) -> web.Response:
+        unique_id = await self._unique_id(request)
+        if not unique_id:
+            return self._error(400, "Missing unique_id")
+        player = self._leave(unique_id) or self.offline_pool.pop(unique_id, None) or {"unique_id": unique_id, "name": "Unknown"}
+        self.banned[unique_id] = player
+        return self._ok(message=f"Banned {unique_id}")
+
+    async def player_unban(self, request: web.Request) -> web.Response:
+        unique_id = await self._unique_id(request)
+        player = self.banned.pop(unique_id, None)
+        if player is None:
+            return self._error(404, f"Player {unique_id} is not banned")
+        self.offline_pool[unique_id] = player
+        return self._ok(message=f"Unbanned {unique_id}")
+
+    async def chat_send(self, request: web.Request) -> web.Response:
+        try:
+            body = await request.json()
+        except ValueError:
+            body = {}
+        message = (body.get("message") if isinstance(body, dict) else None) or request.query.get("message")
+        if not message:
+            return self._error(400, "Missing message")
+        self.chat.append({"message": message, "at": time.time()})
+        del self.chat[:-100]
+        return self._ok(message="Message sent")
+
+    async def mock_stats(self, request: web.Request) -> web.Response:
+        return web.json_response(self.stats())
+
+    async def mock_outage(self, request: web.Request) -> web.Response:
+        """POST /mock/outage?seconds=30 - wymusza awarię (0 kończy ją od razu)"""
+        seconds = float(request.query.get("seconds", self.settings.outage_duration))
+        self.forced_outage_until = time.monotonic() + seconds if seconds > 0 else 0.0
+        return web.json_response({"in_outage": self.in_outage(), "seconds": seconds})
+
+    async def _on_startup(self, app: web.Application) -> None:
+        self._churn_task = asyncio.create_task(self._churn())
+
+    async def _on_cleanup(self, app: web.Application) -> None:
+        if self._churn_task is not None:
+            self._churn_task.cancel()
+
+    def create_app(self) -> web.Application:
+        app = web.Application(middlewares=[self.faults])
+        app.router.add_get("/player/count", self.player_count)
+        app.router.add_get("/player/list", self.player_list)
+        app.router.add_get("/player/banlist", self.player_banlist)
+        for action, handler in (("kick", self.player_kick), ("ban", self.player_ban), ("unban", self.player_unban)):
+            app.router.add_post(f"/player/{action}", handler)
+        app.router.add_post("/chat", self.chat_send)
+        app.router.add_post("/chat/send", self.chat_send)
+        app.router.add_get("/mock/stats", self.mock_stats)
+        app.router.add_post("/mock/outage", self.mock_outage)
+        app.on_startup.append(self._on_startup)
+        app.on_cleanup.append(self._on_cleanup)
+        return app
+
+
+def parse_args(argv: Optional[List[str]] = None) -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description="Mock API serwera gry MotorTown")
+    parser.add_argument("--host", default=DEFAULT_HOST)
+    parser.add_argument("--port", type=int, default=DEFAULT_PORT)
+    parser.add_argument("--password", default=DEFAULT_PASSWORD, help="hasło RCON (parametr ?password=)")
+    parser.add_argument("--players", type=int, default=MockSettings.players, help="początkowa liczba graczy online")
+    parser.add_argument("--max-players", type=int, default=MockSettings.max_players)
+    parser.add_argument("--banned", type=int, default=MockSettings.banned, help="początkowa liczba zbanowanych")
+    parser.add_argument("--churn", type=float, default=MockSettings.churn, help="dołączenia + wyjścia na minutę")
+    parser.add_argument("--latency", type=float, default=MockSettings.latency_ms, help="średnie opóźnienie w ms")
+    parser.add_argument("--jitter", type=float, default=MockSettings.jitter_ms, help="rozrzut opóźnienia w ms")
+    parser.add_argument("--error-rate", type=float, default=MockSettings.error_rate, help="odsetek odpowiedzi 500 (0-1)")
+    parser.add_argument("--hang-rate", type=float, default=MockSettings.hang_rate, help="odsetek zapytań bez odpowiedzi (0-1)")
+    parser.add_argument("--outage-every", type=float, default=MockSettings.outage_every, help="co ile sekund awaria (0 = brak)")
+    parser.add_argument("--outage-duration", type=float, default=MockSettings.outage_duration, help="czas trwania awarii w sekundach")
+    parser.add_argument("--seed", type=int, default=None, help="ziarno losowania (powtarzalne scenariusze)")
+    parser.add_argument("--access-log", action="store_true", help="loguj każde zapytanie (spowalnia testy obciążeniowe)")
+    return parser.parse_args(argv)
+
+
+def settings_from_args(args: argparse.Namespace) -> MockSettings:
+    return MockSettings(
+        players=args.players,
+        max_players=args.max_players,
+        churn=args.churn,
+        latency_ms=args.latency,
+        jitter_ms=args.jitter,
+        error_rate=args.error_rate,
+        hang_rate=args.hang_rate,
+        outage_every=args.outage_every,
+        outage_duration=args.outage_duration,
+        banned=args.banned,
+        seed=args.seed,
+    )
+
+
+def main(argv: Optional[List[str]] = None) -> None:
+    logging.basicConfig(level=logging.INFO, format='%(asctime)s [%(levelname)s] %(message)s')
+    args = parse_args(argv)
+    server = MockGameServer(settings_from_args(args), password=args.password)
+    logger.info(f"Mock serwera gry na http://{args.host}:{args.port} ({len(server.online)} graczy online)")
+    web.run_app(
+        server.create_app(),
+        host=args.host,
+        port=args.port,
+        print=None,
+        access_log=logging.getLogger("aiohttp.access") if args.access_log else None,
+    )
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,261 @@
+import asyncio
+import itertools
+import logging
+import time
+from typing import Any, Awaitable, Callable, Dict, Hashable, List, Optional, Set
+
+logger = logging.getLogger(__name__)
+
+# Priorytety wiadomości wychodzących (mniejsza liczba = wysłana wcześniej)
+PRIORITY_MODERATION = 0  # odpowiedzi na komendy moderacyjne
+PRIORITY_ADMIN_LOG = 1  # wpisy na kanale logów
+PRIORITY_NOTIFICATION = 2  # zmiany statusu serwera
+PRIORITY_PLAYER_EVENT = 3  # dołączenia/wyjścia graczy
+PRIORITY_STATUS = 4  # odświeżenia embeda statusu
+
+# Discord pozwala na ok. 5 wiadomości na 5 sekund na kanał
+DEFAULT_RATE = 5
+DEFAULT_PER = 5.0  # sekundy
+DEFAULT_MAX_PENDING = 100
+DEFAULT_DRAIN_TIMEOUT = 10.0  # sekundy
+
+MessageFactory = Callable[[], Awaitable[Any]]
+
+
+class RouteBucket:
+    """Prosty token bucket dla jednej trasy (kanału): `rate` wysłań na `per` sekund"""
+
+    def __init__(self, rate: int, per: float):
+        self.rate = rate
+        self.per = per
+        self.tokens = float(rate)
+        self.updated = time.monotonic()
+
+    def _refill(self, now: float) -> None:
+        self.tokens = min(float(self.rate), self.tokens + (now - self.updated) * self.rate / self.per)
+        self.updated = now
+
+    def delay(self, now: float) -> float:
+        """Ile sekund do dostępności następnego wysłania (0 = można teraz)"""
+        self._refill(now)
+        if self.tokens >= 1:
+            return 0.0
+        return (1 - self.tokens) * self.per / self.rate
+
+    def consume(self, now: float) -> None:
+        self._refill(now)
+        self.tokens -= 1
+
+
+class OutboundJob:
+    __slots__ = ("priority", "seq", "bucket", "factory", "future", "supersede_key", "droppable")
+
+    def __init__(self, priority: int, seq: int, bucket: Optional[Hashable], factory: MessageFactory,
+                 future: asyncio.Future, supersede_key: Optional[Hashable], droppable: bool):
+        self.priority = priority
+        self.seq = seq
+        self.bucket = bucket
+        self.factory = factory
+        self.future = future
+        self.supersede_key = supersede_key
+        self.droppable = droppable
+
+    @property
+    def order(self):
+        return self.priority, self.seq
+
+
+class OutboundScheduler:
+    """
+    Priorytetowa kolejka wiadomości wysyłanych na Discorda.
+
+    Każde zadanie ma priorytet i trasę (zwykle ID kanału). Dyspozytor wybiera
+    zadanie o najwyższym priorytecie, którego trasa ma wolny limit i nie ma
+    już wysyłki w toku - dzięki temu kolejność w obrębie kanału jest zachowana,
+    a odpowiedzi moderacyjne wyprzedzają powiadomienia i odświeżenia statusu.
+
+    Zadania z tym samym `supersede_key` są scalane (czekające zadanie dostaje
+    najnowszą treść), a przy przepełnieniu kolejki odrzucane są najpierw
+    najmniej ważne zadania oznaczone jako `droppable`.
+    """
+
+    def __init__(self, rate: int = DEFAULT_RATE, per: float = DEFAULT_PER, max_pending: int = DEFAULT_MAX_PENDING):
+        self.rate = rate
+        self.per = per
+        self.max_pending = max_pending
+        self._pending: List[OutboundJob] = []
+        self._by_key: Dict[Hashable, OutboundJob] = {}
+        self._buckets: Dict[Hashable, RouteBucket] = {}
+        self._busy: Set[Hashable] = set()
+        self._inflight: Set[asyncio.Task] = set()
+        self._seq = itertools.count()
+        self._wakeup: Optional[asyncio.Event] = None
+        self._task: Optional[asyncio.Task] = None
+        self.sent = 0
+        self.superseded = 0
+        self.dropped = 0
+
+    @classmethod
+    def from_config(cls, config: Dict[str, Any]) -> "OutboundScheduler":
+        return cls(
+            rate=int(config.get("OUTBOUND_RATE", DEFAULT_RATE)),
+            per=float(config.get("OUTBOUND_PER", DEFAULT_PER)),
+            max_pending=int(config.get("OUTBOUND_MAX_PENDING", DEFAULT_MAX_PENDING)),
+        )
+
+    @property
+    def running(self) -> bool:
+        return self._task is not None and not self._task.done()
+
+    def start(self) -> None:
+        if self.running:
+            return
+        self._wakeup = asyncio.Event()
+        self._task = asyncio.get_running_loop().create_task(self._run())
+
+    async def stop(self, timeout: float = DEFAULT_DRAIN_TIMEOUT) -> None:
+        """Wysyła zaległe wiadomości (maksymalnie `timeout` sekund) i zatrzymuje dyspozytor"""
+        if self._task is None:
+            return
+        deadline = time.monotonic() + timeout
+        while (self._pending or self._inflight) and time.monotonic() < deadline:
+            await asyncio.sleep(0.05)
+        self._task.cancel()
+        try:
+            await self._task
+        except asyncio.CancelledError:
+            pass
+        self._task = None
+        for job in self._pending:
+            if not job.future.done():
+                job.future.cancel()
+        if self._pending:
+            logger.warning(f"Nie wysłano {len(self._pending)} wiadomości przed zamknięciem")
+        self._pending.clear()
+        self._by_key.clear()
+
+    def stats(self) -> Dict[str, int]:
+        return {
+            "pending": len(self._pending),
+            "sent": self.sent,
+            "superseded": self.superseded,
+            "dropped": self.dropped,
+        }
+
+    def submit(self, factory: MessageFactory, priority: int, bucket: Optional[Hashable] = None,
+               supersede_key: Optional[Hashable] = None, droppable: bool = False) -> asyncio.Future:
+        """
+        Kolejkuje wysyłkę. `factory` tworzy korutynę wysyłającą (np. lambda: channel.send(...)).
+        Zwraca future z wynikiem wysyłki (None, jeśli zadanie zostało odrzucone).
+        """
+        if supersede_key is not None:
+            waiting = self._by_key.get(supersede_key)
+            if waiting is not None:
+                # Czekające zadanie wyśle najnowszą treść - starsza jest nieaktualna
+                waiting.factory = factory
+                waiting.priority = min(waiting.priority, priority)
+                waiting.droppable = waiting.droppable and droppable
+                self.superseded += 1
+                return waiting.future
+
+        future = asyncio.get_running_loop().create_future()
+        future.add_done_callback(self._log_failure)
+        job = OutboundJob(priority, next(self._seq), bucket, factory, future, supersede_key, droppable)
+
+        if len(self._pending) >= self.max_pending and not self._drop_one(job):
+            # Nie ma nic mniej ważnego do odrzucenia - nowe zadanie i tak trafia do kolejki
+            logger.warning(f"Kolejka wiadomości przepełniona ({len(self._pending)})")
+        if not future.done():
+            self._pending.append(job)
+            if supersede_key is not None:
+                self._by_key[supersede_key] = job
+        if not self.running:
+            self.start()
+        self._wakeup.set()
+        return future
+
+    def send(self, destination, priority: int, supersede_key: Optional[Hashable] = None,
+             droppable: bool = False, **kwargs) -> asyncio.Future:
+        """Kolejkuje `destination.send(**kwargs)` z trasą równą ID kanału"""
+        bucket = ("channel", getattr(destination, "id", id(destination)))
+        return self.submit(lambda: destination.send(**kwargs), priority, bucket, supersede_key, droppable)
+
+    def _drop_one(self, incoming: OutboundJob) -> bool:
+        """Odrzuca najmniej ważne zadanie `droppable` (może to być samo nowe zadanie)"""
+        candidates = [job for job in self._pending if job.droppable]
+        if incoming.droppable:
+            candidates.append(incoming)
+        if not candidates:
+            return False
+        # Najniższy priorytet, a w nim najstarsze zadanie
+        victim = max(candidates, key=lambda job: (job.priority, -job.seq))
+        if victim is not incoming:
+            self._remove(victim)
+        victim.future.set_result(None)
+        self.dropped += 1
+        return True
+
+    def _remove(self, job: OutboundJob) -> None:
+        self._pending.remove(job)
+        if job.supersede_key is not None and self._by_key.get(job.supersede_key) is job:
+            del self._by_key[job.supersede_key]
+
+    @staticmethod
+    def _log_failure(future: asyncio.Future) -> None:
+        if not future.cancelled() and future.exception() is not None:
+            logger.error(f"Błąd wysyłki wiadomości: {future.exception()}")
+
+    def _bucket(self, key: Hashable) -> RouteBucket:
+        bucket = self._buckets.get(key)
+        if bucket is None:
+            bucket = self._buckets[key] = RouteBucket(self.rate, self.per)
+        return bucket
+
+    def _next_job(self):
+        """Zwraca (zadanie gotowe do wysłania, czas oczekiwania na najbliższe zwolnienie limitu)"""
+        now = time.monotonic()
+        best = None
+        wait = None
+        for job in self._pending:
+            if job.bucket is not None:
+                if job.bucket in self._busy:
+                    continue
+                delay = self._bucket(job.bucket).delay(now)
+                if delay > 0:
+                    wait = delay if wait is None else min(wait, delay)
+                    continue
+            if best is None or job.order < best.order:
+                best = job
+        return best, wait
+
+    async def _run(self) -> None:
+        while True:
+            job, wait = self._next_job()
+            if job is None:
+                self._wakeup.clear()
+                try:
+                    await asyncio.wait_for(self._wakeup.wait(), timeout=wait)
+                except asyncio.TimeoutError:
+                    pass
+                continue
+            self._remove(job)
+            if job.bucket is not None:
+                self._bucket(job.bucket).consume(time.monotonic())
+                self._busy.add(job.bucket)
+            task = asyncio.create_task(self._execute(job))
+            self._inflight.add(task)
+            task.add_done_callback(self._inflight.discard)
+
+    async def _execute(self, job: OutboundJob) -> None:
+        try:
+            result = await job.factory()
+            self.sent += 1
+            if not job.future.done():
+                job.future.set_result(result)
+        except Exception as e:
+            if not job.future.done():
+                job.future.set_exception(e)
+        finally:
+            if job.bucket is not None:
+                self._busy.discard(job.bucket)
+            self._wakeup.set()
@@ -0,0 +1,107 @@
+import asyncio
+import logging
+import time
+from dataclasses import dataclass
+from typing import Dict, Iterable, List, Optional, Union
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass(frozen=True)
+class PlayerJoined:
+    """Gracz pojawił się na liście graczy"""
+    unique_id: str
+    name: str
+    at: float  # znacznik czasu (epoch)
+
+
+@dataclass(frozen=True)
+class PlayerLeft:
+    """Gracz zniknął z listy graczy"""
+    unique_id: str
+    name: str
+    at: float
+
+
+@dataclass(frozen=True)
+class PlayerRenamed:
+    """Gracz pozostał online, ale zmienił nazwę"""
+    unique_id: str
+    old_name: str
+    new_name: str
+    at: float
+
+
+PlayerEvent = Union[PlayerJoined, PlayerLeft, PlayerRenamed]
+
+
+def roster_from_players(players: Iterable[Dict]) -> Dict[str, str]:
+    """Zamienia listę graczy z API na słownik {unique_id: nazwa}"""
+    roster = {}
+    for player in players:
+        if not isinstance(player, dict):
+            continue
+        unique_id = player.get('unique_id')
+        if unique_id is None or unique_id == '':
+            continue
+        roster[str(unique_id)] = player.get('name', 'Nieznany')
+    return roster
+
+
+def diff_rosters(previous: Dict[str, str], current: Dict[str, str], at: float) -> List[PlayerEvent]:
+    """
+    Porównuje dwie kolejne listy graczy i zwraca zdarzenia w stałej kolejności:
+    najpierw wyjścia, potem zmiany nazw, na końcu dołączenia.
+    """
+    events: List[PlayerEvent] = []
+    for unique_id, name in previous.items():
+        if unique_id not in current:
+            events.append(PlayerLeft(unique_id, name, at))
+    for unique_id, name in current.items():
+        old_name = previous.get(unique_id)
+        if old_name is not None and old_name != name:
+            events.append(PlayerRenamed(unique_id, old_name, name, at))
+    for unique_id, name in current.items():
+        if unique_id not in previous:
+            events.append(PlayerJoined(unique_id, name, at))
+    return events
+
+
+class PlayerEventStream:
+    """
+    Strumień zdarzeń dołączenia/wyjścia/zmiany nazwy graczy.
+
+    `feed()` porównuje nową listę graczy z poprzednią i rozsyła powstałe
+    zdarzenia do wszystkich subskrybentów - każdy dostaje własną kolejkę
+    `asyncio.Queue`, więc wolny konsument nie blokuje pozostałych.
+    """
+
+    def __init__(self, roster: Optional[Dict[str, str]] = None):
+        self.roster: Dict[str, str] = dict(roster or {})
+        self._queues: List[asyncio.Queue] = []
+
+    def seed(self, roster: Dict[str, str]) -> None:
+        """Ustawia stan początkowy (np. graczy online zapamiętanych przed restartem)"""
+        self.roster = dict(roster)
+
+    def subscribe(self, maxsize: int = 0) -> asyncio.Queue:
+        queue: asyncio.Queue = asyncio.Queue(maxsize=maxsize)
+        self._queues.append(queue)
+        return queue
+
+    def unsubscribe(self, queue: asyncio.Queue) -> None:
+        if queue in self._queues:
+            self._queues.remove(queue)
+
+    def feed(self, players: Iterable[Dict], at: Optional[float] = None) -> List[PlayerEvent]:
+        """Przetwarza nową listę graczy i publikuje zdarzenia różnicowe"""
+        current = roster_from_players(players)
+        events = diff_rosters(self.roster, current, at if at is not None else time.time())
+        self.roster = current
+        for event in events:
+            for queue in list(self._queues):
+                try:
+                    queue.put_nowait(event)
+                except asyncio.QueueFull:
+                    logger.warning(f"Kolejka zdarzeń graczy jest pełna - pominięto {event}")
+        return events
@@ -0,0 +1,72 @@
+import hashlib
+import logging
+import os
+import struct
+import threading
+from typing import List, Optional
+
+logger = logging.getLogger(__name__)
+
+PROJECT_DIR = os.path.dirname(os.path.abspath(__file__))
+DEFAULT_SESSION_FILE = os.path.join(PROJECT_DIR, "webpanel", "sessions.bin")
+
+# Rekord sesji: klucz gracza (int64), wejście i wyjście (epoch, float64)
+SESSION_RECORD = struct.Struct("<qdd")
+_KEY_MASK = (1 << 63) - 1
+
+
+def player_key(unique_id: str) -> int:
+    """
+    Stały 64-bitowy klucz gracza. Numeryczne ID (Steam) są zapisywane
+    wprost, pozostałe jako skrót blake2b ograniczony do 63 bitów.
+    """
+    unique_id = str(unique_id)
+    if unique_id.isdigit() and int(unique_id) <= _KEY_MASK:
+        return int(unique_id)
+    digest = hashlib.blake2b(unique_id.encode("utf-8"), digest_size=8).digest()
+    return int.from_bytes(digest, "little") & _KEY_MASK
+
+
+class SessionLog:
+    """
+    Dziennik zakończonych sesji graczy (kto, od kiedy, do kiedy).
+
+    Rekordy mają stały rozmiar i są tylko dopisywane na koniec pliku, więc
+    analityka może wczytać cały plik jedną operacją (`numpy.fromfile`)
+    bez parsowania. Zapis działa w trybie write-behind razem z trackerem -
+    sesje czekają w buforze do `flush()`.
+    """
+
+    def __init__(self, path: Optional[str] = DEFAULT_SESSION_FILE):
+        self.path = path
+        self._pending: List[bytes] = []
+        self._lock = threading.Lock()
+
+    def append(self, unique_id: str, joined: float, left: float) -> None:
+        if left <= joined:
+            return
+        with self._lock:
+            self._pending.append(SESSION_RECORD.pack(player_key(unique_id), joined, left))
+
+    @property
+    def pending(self) -> int:
+        return len(self._pending)
+
+    def flush(self) -> None:
+        """Dopisuje zbuforowane sesje do pliku"""
+        with self._lock:
+            if not self._pending or not self.path:
+                return
+            pending, self._pending = self._pending, []
+            try:
+                os.makedirs(os.path.dirname(self.path), exist_ok=True)
+                with open(self.path, "ab") as f:
+                    # Urwany rekord po awarii zapisu - wyrównaj do granicy rekordu
+                    misaligned = f.tell() % SESSION_RECORD.size
+                    if misaligned:
+                        f.truncate(f.tell() - misaligned)
+                        f.seek(0, os.SEEK_END)
+                    f.write(b"".join(pending))
+            except OSError as e:
+                logger.error(f"Błąd zapisu dziennika sesji: {e}")
+                self._pending[:0] = pending
@@ -0,0 +1,367 @@
+import asyncio
+import inspect
+import logging
+import time
+from dataclasses import dataclass
+from datetime import datetime
+from typing import Any, Awaitable, Callable, Dict, List, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_POLL_INTERVAL = 30  # sekundy
+DEFAULT_ROSTER_DEADLINE = 8.0  # sekundy na pobranie listy graczy i banlisty
+DEFAULT_IDLE_INTERVAL = 120  # sekundy, gdy nikt nie gra
+DEFAULT_PEAK_INTERVAL = 15  # sekundy w godzinach szczytu
+DEFAULT_CHANGE_INTERVAL = 10  # sekundy tuż po zmianie statusu serwera
+DEFAULT_CHANGE_WINDOW = 120  # jak długo (w sekundach) po zmianie odpytywać szybciej
+DEFAULT_OFFLINE_MAX_INTERVAL = 600  # górny limit wycofywania się, gdy serwer nie odpowiada
+DEFAULT_PEAK_HOURS = "18-23"
+
+# Powody wybrania interwału (widoczne w panelu)
+CADENCE_OFFLINE = "offline"
+CADENCE_CHANGE = "change"
+CADENCE_PEAK = "peak"
+CADENCE_IDLE = "idle"
+CADENCE_NORMAL = "normal"
+
+ApiRequest = Callable[..., Awaitable[Dict[str, Any]]]
+SnapshotCallback = Callable[["ServerSnapshot", Optional["ServerSnapshot"]], Any]
+
+
+def _as_list(data: Any) -> List[Dict]:
+    """API zwraca listy graczy raz jako dict, raz jako listę - ujednolica to"""
+    if isinstance(data, dict):
+        return list(data.values())
+    if isinstance(data, list):
+        return data
+    return []
+
+
+@dataclass(frozen=True)
+class ServerSnapshot:
+    """
+    Niezmienny obraz stanu serwera z jednego cyklu odpytywania.
+
+    Listy graczy są współdzielone przez wszystkich subskrybentów - należy je
+    traktować jako tylko do odczytu.
+    """
+    taken_at: float
+    online: bool
+    player_count: int = 0
+    players: Tuple[Dict, ...] = ()
+    banned_players: Tuple[Dict, ...] = ()
+    players_ok: bool = False
+    banlist_ok: bool = False
+    latency_ms: Optional[int] = None
+    message: str = ""
+
+    @property
+    def as_of(self) -> datetime:
+        return datetime.fromtimestamp(self.taken_at)
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "taken_at": self.taken_at,
+            "as_of": self.as_of.isoformat(),
+            "online": self.online,
+            "player_count": self.player_count,
+            "players": list(self.players),
+            "banned_players": list(self.banned_players),
+            "players_ok": self.players_ok,
+            "banlist_ok": self.banlist_ok,
+            "latency_ms": self.latency_ms,
+            "message": self.message,
+        }
+
+
+@dataclass(frozen=True)
+class Roster:
+    """Lista graczy online i banlista pobrane razem (każda może się nie udać osobno)"""
+    players: Tuple[Dict, ...] = ()
+    banned_players: Tuple[Dict, ...] = ()
+    players_ok: bool = False
+    banlist_ok: bool = False
+    players_message: str = ""
+    banlist_message: str = ""
+    elapsed_ms: int = 0
+
+    @property
+    def ok(self) -> bool:
+        return self.players_ok and self.banlist_ok
+
+
+async def fetch_roster(api_request: ApiRequest, deadline: float = DEFAULT_ROSTER_DEADLINE) -> Roster:
+    """
+    Pobiera /player/list i /player/banlist równolegle ze wspólnym limitem
+    czasu. Zapytanie, które nie zdąży przed `deadline`, jest anulowane
+    i oznaczane jako nieudane - wynik drugiego jest zachowany.
+    """
+    start = time.monotonic()
+    list_task = asyncio.ensure_future(api_request('GET', '/player/list'))
+    banlist_task = asyncio.ensure_future(api_request('GET', '/player/banlist'))
+    _, pending = await asyncio.wait({list_task, banlist_task}, timeout=deadline)
+    for task in pending:
+        task.cancel()
+
+    def result(task: asyncio.Task) -> Dict[str, Any]:
+        if task in pending:
+            return {'succeeded': False, 'message': f"Przekroczono limit czasu ({deadline}s)"}
+        if task.exception() is not None:
+            return {'succeeded': False, 'message': str(task.exception())}
+        return task.result()
+
+    list_data, banned_data = result(list_task), result(banlist_task)
+    players_ok = bool(list_data.get('succeeded'))
+    banlist_ok = bool(banned_data.get('succeeded'))
+    return Roster(
+        players=tuple(_as_list(list_data.get('data'))) if players_ok else (),
+        banned_players=tuple(_as_list(banned_data.get('data'))) if banlist_ok else (),
+        players_ok=players_ok,
+        banlist_ok=banlist_ok,
+        players_message=list_data.get('message', ''),
+        banlist_message=banned_data.get('message', ''),
+        elapsed_ms=int((time.monotonic() - start) * 1000),
+    )
+
+
+def parse_hour_ranges(value: Any) -> Tuple[Tuple[int, int], ...]:
+    """
+    Zamienia zapis godzin szczytu ("18-23", "12-14,20-2") na krotki (od, do).
+    Zakres obejmuje godzinę końcową; "22-2" przechodzi przez północ.
+    """
+    if isinstance(value, (list, tuple)):
+        value = ",".join(str(part) for part in value)
+    ranges = []
+    for part in str(value or "").split(","):
+        part = part.strip()
+        if not part:
+            continue
+        start, _, end = part.partition("-")
+        try:
+            start_hour = int(start) % 24
+            end_hour = int(end) % 24 if end.strip() else start_hour
+        except ValueError:
+            logger.warning(f"Nieprawidłowy zakres godzin szczytu: {part!r}")
+            continue
+        ranges.append((start_hour, end_hour))
+    return tuple(ranges)
+
+
+class PollSchedule:
+    """
+    Adaptacyjny interwał odpytywania serwera.
+
+    Kolejność reguł: serwer nie odpowiada (wykładnicze wycofywanie z limitem),
+    świeża zmiana statusu (szybko przez `change_window` sekund), godziny
+    szczytu, brak graczy (wolno), w pozostałych przypadkach `base`.
+    """
+
+    def __init__(self, base: float = DEFAULT_POLL_INTERVAL, idle: float = DEFAULT_IDLE_INTERVAL,
+                 peak: float = DEFAULT_PEAK_INTERVAL, after_change: float = DEFAULT_CHANGE_INTERVAL,
+                 change_window: float = DEFAULT_CHANGE_WINDOW, offline_max: float = DEFAULT_OFFLINE_MAX_INTERVAL,
+                 peak_hours: Any = DEFAULT_PEAK_HOURS):
+        self.base = base
+        self.idle = idle
+        self.peak = peak
+        self.after_change = after_change
+        self.change_window = change_window
+        self.offline_max = offline_max
+        self.peak_hours = parse_hour_ranges(peak_hours)
+        self.offline_streak = 0
+        self.changed_at: Optional[float] = None
+        self.interval = base
+        self.reason = CADENCE_NORMAL
+
+    @classmethod
+    def from_config(cls, config: Dict[str, Any]) -> "PollSchedule":
+        base = float(config.get("SNAPSHOT_INTERVAL", DEFAULT_POLL_INTERVAL))
+        return cls(
+            base=base,
+            idle=float(config.get("SNAPSHOT_IDLE_INTERVAL", DEFAULT_IDLE_INTERVAL)),
+            peak=float(config.get("SNAPSHOT_PEAK_INTERVAL", DEFAULT_PEAK_INTERVAL)),
+            after_change=float(config.get("SNAPSHOT_CHANGE_INTERVAL", DEFAULT_CHANGE_INTERVAL)),
+            change_window=float(config.get("SNAPSHOT_CHANGE_WINDOW", DEFAULT_CHANGE_WINDOW)),
+            offline_max=float(config.get("SNAPSHOT_OFFLINE_MAX_INTERVAL", DEFAULT_OFFLINE_MAX_INTERVAL)),
+            peak_hours=config.get("SNAPSHOT_PEAK_HOURS", DEFAULT_PEAK_HOURS),
+        )
+
+    def is_peak(self, when: datetime) -> bool:
+        hour = when.hour
+        for start, end in self.peak_hours:
+            if start <= end:
+                if start <= hour <= end:
+                    return True
+            elif hour >= start or hour <= end:
+                return True
+        return False
+
+    def update(self, snapshot: ServerSnapshot, previous: Optional[ServerSnapshot]) -> float:
+        """Wybiera interwał do następnego odpytania na podstawie nowego snapshotu"""
+        now = snapshot.taken_at
+        if previous is not None and previous.online != snapshot.online:
+            self.changed_at = now
+
+        if snapshot.online:
+            self.offline_streak = 0
+        else:
+            self.offline_streak += 1
+
+        if self.offline_streak:
+            # Pierwsza porażka sprawdzana szybko, kolejne coraz rzadziej
+            start = self.after_change if self.offline_streak == 1 else self.base
+            self.interval = min(self.offline_max, start * 2 ** max(0, self.offline_streak - 2))
+            self.reason = CADENCE_OFFLINE
+        elif self.changed_at is not None and now - self.changed_at < self.change_window:
+            self.interval, self.reason = self.after_change, CADENCE_CHANGE
+        elif self.is_peak(datetime.fromtimestamp(now)):
+            self.interval, self.reason = self.peak, CADENCE_PEAK
+        elif snapshot.player_count == 0:
+            self.interval, self.reason = self.idle, CADENCE_IDLE
+        else:
+            self.interval, self.reason = self.base, CADENCE_NORMAL
+        return self.interval
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "interval": self.interval,
+            "reason": self.reason,
+            "offline_streak": self.offline_streak,
+        }
+
+
+class SnapshotPoller:
+    """
+    Jeden wspólny zegar odpytujący API serwera gry.
+
+    Pobiera liczbę graczy, listę graczy i banlistę, buduje `ServerSnapshot`
+    i przekazuje go kolejno wszystkim subskrybentom. Odstęp między
+    odpytaniami wyznacza `PollSchedule` na podstawie stanu serwera, a lista
+    graczy i banlista muszą zdążyć przed `roster_deadline` (ROSTER_DEADLINE).
+    `start()` jest idempotentne, więc ponowne wywołanie (np. po reconnect)
+    nie tworzy drugiego zadania w tle.
+    """
+
+    def __init__(self, api_request: ApiRequest, schedule: Optional[PollSchedule] = None,
+                 roster_deadline: float = DEFAULT_ROSTER_DEADLINE):
+        self.api_request = api_request
+        self.schedule = schedule or PollSchedule()
+        self.roster_deadline = roster_deadline
+        self.next_poll_at: Optional[float] = None
+        self.latest: Optional[ServerSnapshot] = None
+        self._subscribers: List[SnapshotCallback] = []
+        self._task: Optional[asyncio.Task] = None
+        self._lock: Optional[asyncio.Lock] = None
+        self._rescheduled: Optional[asyncio.Event] = None
+
+    @property
+    def running(self) -> bool:
+        return self._task is not None and not self._task.done()
+
+    def subscribe(self, callback: SnapshotCallback) -> None:
+        """Rejestruje callback(snapshot, previous) - synchroniczny lub async"""
+        if callback not in self._subscribers:
+            self._subscribers.append(callback)
+
+    def unsubscribe(self, callback: SnapshotCallback) -> None:
+        if callback in self._subscribers:
+            self._subscribers.remove(callback)
+
+    def start(self) -> None:
+        """Uruchamia pętlę odpytywania, jeśli jeszcze nie działa"""
+        if self.running:
+            return
+        self._rescheduled = asyncio.Event()
+        self._task = asyncio.get_running_loop().create_task(self._run())
+        logger.info(f"Poller snapshotów uruchomiony (bazowo co {self.schedule.base}s)")
+
+    @property
+    def interval(self) -> float:
+        return self.schedule.interval
+
+    def cadence(self) -> Dict[str, Any]:
+        """Aktualny rytm odpytywania (interwał, powód, czas następnego odpytania)"""
+        return dict(self.schedule.to_dict(), next_poll_at=self.next_poll_at)
+
+    async def stop(self) -> None:
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+
+    async def _run(self) -> None:
+        while True:
+            try:
+                await self.poll_once()
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                logger.error(f"Błąd odpytywania serwera: {e}", exc_info=True)
+            await self._sleep_until_next_poll()
+
+    async def _sleep_until_next_poll(self) -> None:
+        """Czeka do `next_poll_at`; odpytanie spoza pętli (np. wymuszone) przesuwa ten termin"""
+        while True:
+            if self.next_poll_at is None:
+                self.next_poll_at = time.time() + self.schedule.interval
+            delay = self.next_poll_at - time.time()
+            if delay <= 0:
+                return
+            self._rescheduled.clear()
+            try:
+                await asyncio.wait_for(self._rescheduled.wait(), timeout=delay)
+            except asyncio.TimeoutError:
+                pass
+
+    async def poll_once(self) -> ServerSnapshot:
+        """Pobiera nowy snapshot i publikuje go subskrybentom"""
+        if self._lock is None:
+            self._lock = asyncio.Lock()
+        async with self._lock:
+            snapshot = await self._fetch()
+            previous, self.latest = self.latest, snapshot
+            old_reason = self.schedule.reason
+            self.schedule.update(snapshot, previous)
+            if self.schedule.reason != old_reason:
+                logger.info(f"Interwał odpytywania: {self.schedule.interval}s ({self.schedule.reason})")
+            self.next_poll_at = snapshot.taken_at + self.schedule.interval
+            if self._rescheduled is not None:
+                self._rescheduled.set()
+            await self._publish(snapshot, previous)
+            return snapshot
+
+    async def _fetch(self) -> ServerSnapshot:
+        start = time.monotonic()
+        count_data = await self.api_request('GET', '/player/count')
+        latency_ms = int((time.monotonic() - start) * 1000)
+        if not count_data.get('succeeded'):
+            return ServerSnapshot(
+                taken_at=time.time(),
+                online=False,
+                message=count_data.get('message', ''),
+            )
+
+        roster = await fetch_roster(self.api_request, self.roster_deadline)
+        return ServerSnapshot(
+            taken_at=time.time(),
+            online=True,
+            player_count=count_data.get('data', {}).get('num_players', 0),
+            players=roster.players,
+            banned_players=roster.banned_players,
+            players_ok=roster.players_ok,
+            banlist_ok=roster.banlist_ok,
+            latency_ms=latency_ms,
+            message=count_data.get('message', ''),
+        )
+
+    async def _publish(self, snapshot: ServerSnapshot, previous: Optional[ServerSnapshot]) -> None:
+        for callback in list(self._subscribers):
+            try:
+                result = callback(snapshot, previous)
+                if inspect.isawaitable(result):
+                    await result
+            except Exception as e:
+                logger.error(f"Błąd subskrybenta snapshotu {getattr(callback, '__qualname__', callback)}: {e}", exc_info=True)
+
@@ -0,0 +1,15 @@
+import time
+
+import pytest
+
+
+@pytest.fixture
+def warsaw(monkeypatch):
+    """Strefa z czasem letnim: CET (+1) zimą, CEST (+2) latem"""
+    if not hasattr(time, "tzset"):
+        pytest.skip("wymaga time.tzset (zmiana strefy w procesie)")
+    monkeypatch.setenv("TZ", "Europe/Warsaw")
+    time.tzset()
+    yield
+    monkeypatch.undo()
+    time.tzset()
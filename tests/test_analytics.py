@@ -0,0 +1,27 @@
+from datetime import datetime
+
+import numpy as np
+
+from analytics import SESSION_DTYPE, local_offsets, summarize
+
+
+def local(*args) -> float:
+    return datetime(*args).timestamp()
+
+
+def test_local_offsets_per_timestamp(warsaw):
+    offsets = local_offsets(np.array([local(2026, 1, 5, 12), local(2026, 7, 5, 12)]))
+    assert offsets.tolist() == [3600.0, 7200.0]
+
+
+def test_summer_and_winter_sessions_land_in_local_hours_and_days(warsaw):
+    sessions = np.array([
+        (1, local(2026, 7, 5, 0, 30), local(2026, 7, 5, 1, 30)),  # niedziela, czas letni
+        (2, local(2026, 1, 5, 23, 30), local(2026, 1, 5, 23, 50)),  # poniedziałek, czas zimowy
+    ], dtype=SESSION_DTYPE)
+    summary = summarize(sessions, 365, now=local(2026, 7, 10, 12))
+
+    active = {day["date"]: day["active"] for day in summary["daily"] if day["active"]}
+    assert active == {"2026-01-05": 1, "2026-07-05": 1}
+    heat = np.array(summary["heatmap"])
+    assert np.argwhere(heat > 0).tolist() == [[0, 23], [6, 0], [6, 1]]
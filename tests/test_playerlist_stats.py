@@ -0,0 +1,98 @@
+import time
+from datetime import datetime, timedelta
+from types import SimpleNamespace
+
+import pytest
+
+from player_events import PlayerJoined, PlayerLeft, PlayerRenamed
+from webpanel import playerlist
+from webpanel.playerlist import PlayerTracker, start_of_day
+from webpanel.storage import JsonPlayerStorage
+
+
+class Clock:
+    """Sterowany zegar trackera (time.time w module playerlist)"""
+
+    def __init__(self, now: float):
+        self.now = now
+
+    def __call__(self) -> float:
+        return self.now
+
+    def advance(self, seconds: float) -> None:
+        self.now += seconds
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    clock = Clock(datetime(2026, 5, 4, 21, 0).timestamp())
+    monkeypatch.setattr(playerlist, "time", SimpleNamespace(time=clock, monotonic=time.monotonic))
+    return clock
+
+
+@pytest.fixture
+def tracker(tmp_path, clock):
+    storage = JsonPlayerStorage(str(tmp_path / "players.json"), str(tmp_path / "banned.json"), str(tmp_path / "online.json"))
+    tracker = PlayerTracker(storage=storage, flush_interval=3600, flush_threshold=10**6)
+    yield tracker
+    tracker.close()
+
+
+def brute_force_stats(tracker: PlayerTracker, now: float) -> dict:
+    """Statystyki policzone od zera z rekordów graczy - niezależnie od liczników trackera"""
+    today = start_of_day(now)
+    total_time = sum(player.total_time for player in tracker.players.values())
+    total_time += sum(max(0.0, now - joined) for joined in tracker.online_players.values())
+    return {
+        "total_players": len(tracker.players),
+        "total_joins": sum(player.join_count for player in tracker.players.values()),
+        "players_online": len(tracker.online_players),
+        "new_players_today": sum(1 for player in tracker.players.values() if player.first_seen >= today),
+        "total_time": total_time,
+    }
+
+
+def assert_stats_match(tracker: PlayerTracker, clock: Clock) -> None:
+    stats = tracker.get_stats()
+    expected = brute_force_stats(tracker, clock.now)
+    for key in ("total_players", "total_joins", "players_online", "new_players_today"):
+        assert stats[key] == expected[key], key
+    assert stats["total_time"] == pytest.approx(expected["total_time"])
+
+
+def test_stats_follow_join_leave_rename_ban_reset_and_day_rollover(tracker, clock):
+    steps = [
+        lambda: tracker.apply_event(PlayerJoined("1", "Anna", clock.now)),
+        lambda: tracker.apply_events([PlayerJoined("2", "Bartek", clock.now), PlayerJoined("3", "Celina", clock.now)]),
+        lambda: tracker.apply_event(PlayerRenamed("2", "Bartek", "Bartosz", clock.now)),
+        lambda: tracker.apply_event(PlayerLeft("1", "Anna", clock.now)),
+        lambda: tracker.apply_event(PlayerJoined("1", "Anna", clock.now)),
+        lambda: tracker.update_banned_players([{"unique_id": "3", "name": "Celina"}]),
+        lambda: tracker.apply_event(PlayerLeft("3", "Celina", clock.now)),
+        lambda: tracker.add_player("4", "Darek", joined_now=True),
+        lambda: tracker.reset_join_counts(),
+        # Północ: gracze z wczoraj przestają być "nowi dzisiaj", sesje trwają dalej
+        lambda: clock.advance(4 * 3600),
+        lambda: tracker.apply_event(PlayerJoined("5", "Ewa", clock.now)),
+        lambda: tracker.update_online_status([{"unique_id": "5", "name": "Ewa"}, {"unique_id": "6", "name": "Filip"}]),
+        lambda: tracker.apply_event(PlayerLeft("1", "Anna", clock.now)),
+    ]
+    assert_stats_match(tracker, clock)
+    for step in steps:
+        step()
+        clock.advance(600)
+        assert_stats_match(tracker, clock)
+
+    stats = tracker.get_stats()
+    assert stats["players_online"] == 2  # update_online_status zastąpił listę online: zostali 5 i 6
+    assert stats["new_players_today"] == 2
+    assert tracker.verify_stats()
+
+
+def test_rollover_counts_only_players_first_seen_today(tracker, clock):
+    tracker.apply_event(PlayerJoined("1", "Anna", clock.now))
+    assert tracker.get_stats()["new_players_today"] == 1
+    clock.now = (datetime.fromtimestamp(clock.now) + timedelta(days=1)).timestamp()
+    assert tracker.get_stats()["new_players_today"] == 0
+    tracker.apply_event(PlayerJoined("2", "Bartek", clock.now))
+    assert_stats_match(tracker, clock)
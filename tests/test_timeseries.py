@@ -0,0 +1,66 @@
+from datetime import datetime
+
+from timeseries import HOUR, PlayerTimeSeries, RollupRing, local_to_utc, local_utc_offset
+
+
+def local(*args) -> float:
+    return datetime(*args).timestamp()
+
+
+def test_local_utc_offset_follows_dst(warsaw):
+    assert local_utc_offset(local(2026, 1, 15, 12)) == HOUR
+    assert local_utc_offset(local(2026, 7, 1, 12)) == 2 * HOUR
+
+
+def test_local_to_utc_finds_local_midnight(warsaw):
+    for day in (datetime(2026, 1, 15), datetime(2026, 3, 29), datetime(2026, 7, 1), datetime(2026, 10, 25)):
+        midnight = day.timestamp()
+        wall = midnight + local_utc_offset(midnight)
+        assert local_to_utc(wall) == midnight
+
+
+def test_day_buckets_start_at_local_midnight_in_summer_and_winter(warsaw):
+    series = PlayerTimeSeries(None)
+    for month in (1, 7):
+        for hour in (0, 12, 23):
+            series.add(10 * month, local(2026, month, 15, hour, 30))
+    series.add(0, local(2026, 7, 16, 0, 30))  # zwija ostatnią minutę
+    for month in (1, 7):
+        start = local(2026, month, 15)
+        points = series.query(start, start + HOUR, resolution="day")["points"]
+        assert points[0]["t"] == start
+        assert points[0]["avg"] == 10 * month
+
+
+def test_dst_switch_keeps_history_on_reload(warsaw, tmp_path):
+    path = str(tmp_path / "series.bin")
+    series = PlayerTimeSeries(path)
+    # Próbki po obu stronach zmiany czasu na letni (29.03.2026, 02:00 -> 03:00)
+    for timestamp in (local(2026, 3, 28, 20), local(2026, 3, 29, 12), local(2026, 3, 30, 9)):
+        series.add(5, timestamp)
+    series.add(0, local(2026, 3, 30, 10))
+    series.save()
+
+    reloaded = PlayerTimeSeries(path)
+    for name in ("minute", "hour", "day"):
+        assert reloaded.rings[name].utc_offset == series.rings[name].utc_offset
+    days = reloaded.query(local(2026, 3, 28), local(2026, 3, 30, 12), resolution="day")["points"]
+    assert [point["t"] for point in days] == [local(2026, 3, 28), local(2026, 3, 29), local(2026, 3, 30)]
+    assert all(point["avg"] is not None for point in days)
+    assert reloaded._open_minute == series._open_minute
+
+
+def test_fixed_offset_file_is_migrated_not_discarded(warsaw, tmp_path):
+    """Pliki zapisane ze stałym przesunięciem strefy (+1 h) są przepisywane do nowej siatki"""
+    path = str(tmp_path / "series.bin")
+    series = PlayerTimeSeries(path)
+    series.rings = {name: RollupRing(ring.resolution, ring.capacity, HOUR) for name, ring in series.rings.items()}
+    series.add(7, local(2026, 7, 1, 12))
+    series.add(0, local(2026, 7, 1, 13))
+    series.save()
+
+    reloaded = PlayerTimeSeries(path)
+    assert reloaded.rings["day"].utc_offset is None
+    hour = reloaded.query(local(2026, 7, 1, 12), local(2026, 7, 1, 12, 30), resolution="hour")["points"]
+    assert hour[0]["avg"] == 7
+    assert reloaded.rings["day"].bucket_start(reloaded.rings["day"].bucket_of(local(2026, 7, 1, 12))) == local(2026, 7, 1)
@@ -0,0 +1,42 @@
+import asyncio
+import threading
+
+import pytest
+
+import tracker_ipc
+from tracker_ipc import IpcError, TrackerClient, TrackerIpcServer
+
+
+@pytest.fixture
+def tcp_server(monkeypatch):
+    """Serwer IPC na porcie TCP (jak na Windows) we własnej pętli zdarzeń"""
+    monkeypatch.setattr(tracker_ipc, "_use_unix_socket", lambda: False)
+    config = {"TRACKER_IPC_PORT": 0, "TRACKER_IPC_TOKEN": "sekret"}
+    loop = asyncio.new_event_loop()
+    thread = threading.Thread(target=loop.run_forever, daemon=True)
+    thread.start()
+    server = TrackerIpcServer({"get_stats": lambda: {"total_players": 1}}, config)
+    asyncio.run_coroutine_threadsafe(server.start(), loop).result(5)
+    address = server._server.sockets[0].getsockname()[:2]
+    yield config, address
+    asyncio.run_coroutine_threadsafe(server.stop(), loop).result(5)
+    loop.call_soon_threadsafe(loop.stop)
+    thread.join(5)
+    loop.close()
+
+
+def client_for(config, address) -> TrackerClient:
+    client = TrackerClient(config)
+    client.address = address
+    return client
+
+
+def test_tcp_call_with_shared_token(tcp_server):
+    config, address = tcp_server
+    assert client_for(config, address).call("get_stats") == {"total_players": 1}
+
+
+def test_tcp_call_with_wrong_token_is_rejected(tcp_server):
+    config, address = tcp_server
+    with pytest.raises(IpcError, match="autoryzacji"):
+        client_for(dict(config, TRACKER_IPC_TOKEN="inny"), address).call("get_stats")
@@ -0,0 +1,353 @@
+import logging
+import math
+import os
+import struct
+import time
+from array import array
+from typing import Any, Dict, List, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+PROJECT_DIR = os.path.dirname(os.path.abspath(__file__))
+DEFAULT_TIMESERIES_FILE = os.path.join(PROJECT_DIR, "webpanel", "player_timeseries.bin")
+
+MINUTE = 60
+HOUR = 3600
+DAY = 86400
+
+# Domyślna retencja każdej rozdzielczości
+DEFAULT_MINUTE_RETENTION = 2 * 24 * 60  # minuty (2 dni)
+DEFAULT_HOUR_RETENTION = 90 * 24  # godziny (90 dni)
+DEFAULT_DAY_RETENTION = 2 * 365  # dni (2 lata)
+DEFAULT_SAVE_INTERVAL = 300  # sekundy
+DEFAULT_MAX_POINTS = 500
+
+RESOLUTIONS = {"minute": MINUTE, "hour": HOUR, "day": DAY}
+
+_FILE_MAGIC = b"MTTS"
+_FILE_VERSION = 1
+_RING_HEADER = struct.Struct("<III")  # rozdzielczość, pojemność, przesunięcie strefy czasowej
+_LOCAL_CALENDAR = 0xFFFFFFFF  # znacznik w nagłówku: kubełki według lokalnego kalendarza
+
+
+class RollupRing:
+    """
+    Bufor cykliczny kubełków o stałej rozdzielczości (minuta, godzina, dzień).
+
+    Każdy kubełek trzyma min, max, sumę i liczbę wartości, więc średnia jest
+    dokładna niezależnie od liczby próbek. Dane siedzą w zwartych tablicach
+    `array` - slot `i` zawiera kubełek o numerze `buckets[i]` (-1 = pusty),
+    dzięki czemu stare dane są nadpisywane bez przesuwania tablic.
+
+    Granice kubełków wyznacza stałe przesunięcie `utc_offset`, a przy
+    `utc_offset=None` - lokalny kalendarz: każdy znacznik jest liczony
+    z przesunięciem obowiązującym w jego chwili (czas letni i zimowy).
+    """
+
+    def __init__(self, resolution: int, capacity: int, utc_offset: Optional[int] = 0):
+        self.resolution = resolution
+        self.capacity = max(1, capacity)
+        self.utc_offset = utc_offset
+        self.buckets = array("q", [-1]) * self.capacity
+        self.mins = array("f", [0.0]) * self.capacity
+        self.maxs = array("f", [0.0]) * self.capacity
+        self.sums = array("d", [0.0]) * self.capacity
+        self.counts = array("I", [0]) * self.capacity
+
+    def bucket_of(self, timestamp: float) -> int:
+        offset = local_utc_offset(timestamp) if self.utc_offset is None else self.utc_offset
+        return int((timestamp + offset) // self.resolution)
+
+    def bucket_start(self, bucket: int) -> float:
+        if self.utc_offset is None:
+            return local_to_utc(bucket * self.resolution)
+        return bucket * self.resolution - self.utc_offset
+
+    def add(self, timestamp: float, low: float, high: float, total: float, count: int) -> None:
+        """Dokłada do kubełku wartości zagregowane (min, max, suma, liczba)"""
+        if count <= 0:
+            return
+        bucket = self.bucket_of(timestamp)
+        slot = bucket % self.capacity
+        current = self.buckets[slot]
+        if current > bucket:
+            return  # starsze niż retencja - slot zajęty przez nowszy kubełek
+        if current != bucket:
+            self.buckets[slot] = bucket
+            self.mins[slot] = low
+            self.maxs[slot] = high
+            self.sums[slot] = total
+            self.counts[slot] = count
+            return
+        self.mins[slot] = min(self.mins[slot], low)
+        self.maxs[slot] = max(self.maxs[slot], high)
+        self.sums[slot] += total
+        self.counts[slot] += count
+
+    def get(self, bucket: int) -> Optional[Tuple[float, float, float]]:
+        """(min, średnia, max) kubełka lub None, jeśli brak danych"""
+        slot = bucket % self.capacity
+        if self.buckets[slot] != bucket or not self.counts[slot]:
+            return None
+        return self.mins[slot], self.sums[slot] / self.counts[slot], self.maxs[slot]
+
+    def range(self, start: float, end: float) -> List[Dict[str, Any]]:
+        """Punkty z przedziału [start, end]; brak danych to min/avg/max = None"""
+        first = max(self.bucket_of(start), self.bucket_of(end) - self.capacity + 1)
+        last = self.bucket_of(end)
+        points = []
+        for bucket in range(first, last + 1):
+            values = self.get(bucket)
+            low, avg, high = values if values is not None else (None, None, None)
+            points.append({
+                "t": self.bucket_start(bucket),
+                "min": low,
+                "avg": round(avg, 2) if avg is not None else None,
+                "max": high,
+            })
+        return points
+
+    def write(self, f) -> None:
+        offset = _LOCAL_CALENDAR if self.utc_offset is None else self.utc_offset % DAY
+        f.write(_RING_HEADER.pack(self.resolution, self.capacity, offset))
+        for data in (self.buckets, self.mins, self.maxs, self.sums, self.counts):
+            data.tofile(f)
+
+    @classmethod
+    def read(cls, f) -> "RollupRing":
+        resolution, capacity, utc_offset = _RING_HEADER.unpack(f.read(_RING_HEADER.size))
+        if utc_offset == _LOCAL_CALENDAR:
+            utc_offset = None
+        elif utc_offset > DAY // 2:
+            utc_offset -= DAY
+        ring = cls(resolution, capacity, utc_offset)
+        for data in (ring.buckets, ring.mins, ring.maxs, ring.sums, ring.counts):
+            del data[:]
+            data.fromfile(f, capacity)
+        return ring
+
+    def copy_into(self, other: "RollupRing") -> None:
+        """Przenosi kubełki do pierścienia o innej pojemności (np. po zmianie retencji)"""
+        for slot in sorted(range(self.capacity), key=lambda i: self.buckets[i]):
+            bucket = self.buckets[slot]
+            if bucket < 0 or not self.counts[slot]:
+                continue
+            other.add(self.bucket_start(bucket), self.mins[slot], self.maxs[slot], self.sums[slot], self.counts[slot])
+
+
+def local_utc_offset(timestamp: Optional[float] = None) -> int:
+    """Przesunięcie lokalnej strefy czasowej względem UTC w sekundach, w chwili `timestamp` (z czasem letnim)"""
+    timestamp = time.time() if timestamp is None else timestamp
+    return time.localtime(timestamp).tm_gmtoff
+
+
+def local_to_utc(wall: float) -> float:
+    """Epoch chwili, w której lokalny zegar wskazuje `wall` (sekundy od epoki liczone w czasie lokalnym)"""
+    # Drugie przybliżenie trafia w przesunięcie obowiązujące w szukanej chwili
+    return wall - local_utc_offset(wall - local_utc_offset(wall))
+
+
+class PlayerTimeSeries:
+    """
+    Szereg czasowy liczby graczy w trzech rozdzielczościach.
+
+    Próbki trafiają do kubełków minutowych. Po zamknięciu minuty jej średnia
+    (oraz min i max) jest zwijana do kubełka godzinowego i dziennego - średnie
+    godzinowe i dzienne są więc ważone czasem, a nie liczbą próbek (poller
+    odpytuje z różną częstotliwością). Każda rozdzielczość ma własną retencję.
+
+    Dane są zapisywane do zwartego pliku binarnego co `save_interval` sekund
+    i przy zamknięciu; `query()` czyta wyłącznie z pamięci.
+    """
+
+    def __init__(self, path: Optional[str] = DEFAULT_TIMESERIES_FILE, minute_retention: int = DEFAULT_MINUTE_RETENTION,
+                 hour_retention: int = DEFAULT_HOUR_RETENTION, day_retention: int = DEFAULT_DAY_RETENTION,
+                 save_interval: float = DEFAULT_SAVE_INTERVAL):
+        self.path = path
+        self.save_interval = save_interval
+        # Minuty i godziny mają stałą siatkę - zmiana czasu przesuwa zegar o pełne
+        # godziny, więc reszta z dzielenia nie zależy od pory roku. Doby liczą się
+        # od lokalnej północy według przesunięcia z chwili każdej próbki.
+        utc_offset = local_utc_offset()
+        self.rings = {
+            "minute": RollupRing(MINUTE, minute_retention, utc_offset % MINUTE),
+            "hour": RollupRing(HOUR, hour_retention, utc_offset % HOUR),
+            "day": RollupRing(DAY, day_retention, None),
+        }
+        self.last_value: Optional[int] = None
+        self.last_sample_at: Optional[float] = None
+        self._open_minute: Optional[int] = None
+        self._saved_at = time.monotonic()
+        self._dirty = False
+        if path:
+            self.load()
+
+    @classmethod
+    def from_config(cls, config: Dict[str, Any], path: Optional[str] = DEFAULT_TIMESERIES_FILE) -> "PlayerTimeSeries":
+        return cls(
+            path,
+            minute_retention=int(config.get("TIMESERIES_MINUTE_RETENTION", DEFAULT_MINUTE_RETENTION)),
+            hour_retention=int(config.get("TIMESERIES_HOUR_RETENTION", DEFAULT_HOUR_RETENTION)),
+            day_retention=int(config.get("TIMESERIES_DAY_RETENTION", DEFAULT_DAY_RETENTION)),
+            save_interval=float(config.get("TIMESERIES_SAVE_INTERVAL", DEFAULT_SAVE_INTERVAL)),
+        )
+
+    def add(self, value: int, timestamp: Optional[float] = None) -> None:
+        """Dodaje próbkę liczby graczy"""
+        timestamp = time.time() if timestamp is None else timestamp
+        minutes = self.rings["minute"]
+        minute = minutes.bucket_of(timestamp)
+        if self._open_minute is not None and minute > self._open_minute:
+            self._roll_up(self._open_minute)
+        if self._open_minute is None or minute >= self._open_minute:
+            self._open_minute = minute
+        minutes.add(timestamp, value, value, value, 1)
+        self.last_value = value
+        self.last_sample_at = timestamp
+        self._dirty = True
+        if self.path and time.monotonic() - self._saved_at >= self.save_interval:
+            self.save()
+
+    def _roll_up(self, minute: int) -> None:
+        """Zwija zamkniętą minutę do kubełków godzinowych i dziennych"""
+        values = self.rings["minute"].get(minute)
+        if values is None:
+            return
+        low, avg, high = values
+        start = self.rings["minute"].bucket_start(minute)
+        self.rings["hour"].add(start, low, high, avg, 1)
+        self.rings["day"].add(start, low, high, avg, 1)
+
+    def query(self, start: float, end: Optional[float] = None, resolution: Optional[str] = None,
+              max_points: int = DEFAULT_MAX_POINTS) -> Dict[str, Any]:
+        """
+        Zwraca punkty (t, min, avg, max) z przedziału [start, end]. Bez podanej
+        rozdzielczości wybierana jest najdokładniejsza, która obejmuje cały
+        przedział w swojej retencji i mieści się w `max_points` punktach.
+        """
+        end = time.time() if end is None else end
+        if resolution is None:
+            resolution = self.pick_resolution(start, end, max_points)
+        if resolution not in self.rings:
+            raise ValueError(f"Nieznana rozdzielczość: {resolution}")
+        ring = self.rings[resolution]
+        points = ring.range(start, end)
+        if resolution != "minute":
+            self._merge_open_minute(ring, points)
+        return {
+            "resolution": resolution,
+            "step": ring.resolution,
+            "start": start,
+            "end": end,
+            "points": points,
+            "current": self.last_value,
+            "as_of": self.last_sample_at,
+        }
+
+    def window(self, start: Optional[float] = None, end: Optional[float] = None, resolution: Optional[str] = None,
+               max_points: int = DEFAULT_MAX_POINTS) -> Dict[str, Any]:
+        """`query()` z domyślnym zakresem (ostatnie 24 godziny) - dla IPC i panelu"""
+        end = time.time() if end is None else float(end)
+        start = end - DAY if start is None else float(start)
+        return self.query(start, end, resolution, int(max_points))
+
+    def _merge_open_minute(self, ring: RollupRing, points: List[Dict[str, Any]]) -> None:
+        """Dolicza bieżącą (jeszcze niezwiniętą) minutę do ostatniego punktu"""
+        if self._open_minute is None or not points:
+            return
+        values = self.rings["minute"].get(self._open_minute)
+        start = self.rings["minute"].bucket_start(self._open_minute)
+        if values is None or ring.bucket_of(start) != ring.bucket_of(points[-1]["t"]):
+            return
+        low, avg, high = values
+        bucket = ring.get(ring.bucket_of(start))
+        point = points[-1]
+        if bucket is None:
+            point.update({"min": low, "avg": round(avg, 2), "max": high})
+            return
+        slot = ring.bucket_of(start) % ring.capacity
+        count = ring.counts[slot]
+        point.update({
+            "min": min(point["min"], low),
+            "avg": round((ring.sums[slot] + avg) / (count + 1), 2),
+            "max": max(point["max"], high),
+        })
+
+    def pick_resolution(self, start: float, end: float, max_points: int = DEFAULT_MAX_POINTS) -> str:
+        span = max(0.0, end - start)
+        for name in ("minute", "hour"):
+            ring = self.rings[name]
+            if span <= ring.resolution * ring.capacity and span / ring.resolution <= max_points:
+                return name
+        return "day"
+
+    def hourly(self, hours: int = 24, end: Optional[float] = None) -> List[float]:
+        """Średnie godzinowe z ostatnich `hours` godzin (0 tam, gdzie brak danych) - dla prostych wykresów"""
+        end = time.time() if end is None else end
+        points = self.query(end - (hours - 1) * HOUR, end, resolution="hour")["points"]
+        return [point["avg"] or 0 for point in points[-hours:]]
+
+    def save(self) -> None:
+        """Zapis atomowy do pliku binarnego (plik tymczasowy + rename)"""
+        if not self.path:
+            return
+        self._saved_at = time.monotonic()
+        try:
+            os.makedirs(os.path.dirname(self.path), exist_ok=True)
+            tmp_path = f"{self.path}.tmp"
+            with open(tmp_path, "wb") as f:
+                f.write(_FILE_MAGIC)
+                f.write(struct.pack("<HB", _FILE_VERSION, len(self.rings)))
+                for name, ring in self.rings.items():
+                    encoded = name.encode()
+                    f.write(struct.pack("<B", len(encoded)) + encoded)
+                    ring.write(f)
+                state = struct.pack("<qdq", -1 if self._open_minute is None else self._open_minute,
+                                    math.nan if self.last_sample_at is None else self.last_sample_at,
+                                    -1 if self.last_value is None else self.last_value)
+                f.write(state)
+            os.replace(tmp_path, self.path)
+            self._dirty = False
+        except OSError as e:
+            logger.error(f"Błąd zapisu szeregu czasowego graczy: {e}")
+
+    def flush(self) -> None:
+        if self._dirty:
+            self.save()
+
+    def load(self) -> None:
+        """Wczytuje dane z pliku; przy zmienionej retencji przepisuje kubełki do nowych pierścieni"""
+        if not self.path or not os.path.exists(self.path):
+            return
+        stored_minutes: Optional[RollupRing] = None
+        try:
+            with open(self.path, "rb") as f:
+                if f.read(len(_FILE_MAGIC)) != _FILE_MAGIC:
+                    raise ValueError("nieprawidłowy nagłówek")
+                version, ring_count = struct.unpack("<HB", f.read(3))
+                if version != _FILE_VERSION:
+                    raise ValueError(f"nieobsługiwana wersja {version}")
+                for _ in range(ring_count):
+                    (length,) = struct.unpack("<B", f.read(1))
+                    name = f.read(length).decode()
+                    stored = RollupRing.read(f)
+                    ring = self.rings.get(name)
+                    if ring is None:
+                        continue
+                    if (stored.resolution, stored.capacity, stored.utc_offset) == (ring.resolution, ring.capacity, ring.utc_offset):
+                        self.rings[name] = stored
+                    else:
+                        # Inna retencja albo siatka (np. plik ze stałym przesunięciem strefy) - kubełki przechodzą przez znaczniki czasu
+                        stored.copy_into(ring)
+                    if name == "minute":
+                        stored_minutes = stored
+                open_minute, last_sample_at, last_value = struct.unpack("<qdq", f.read(struct.calcsize("<qdq")))
+        except (OSError, ValueError, EOFError, struct.error) as e:
+            logger.error(f"Nie można wczytać szeregu czasowego graczy z {self.path}: {e}")
+            return
+        if open_minute >= 0 and stored_minutes is not None:
+            # Numer minuty z siatki zapisanego pierścienia - przelicz na bieżącą
+            open_minute = self.rings["minute"].bucket_of(stored_minutes.bucket_start(open_minute))
+        self._open_minute = None if open_minute < 0 else open_minute
+        self.last_sample_at = None if math.isnan(last_sample_at) else last_sample_at
+        self.last_value = None if last_value < 0 else last_value
@@ -0,0 +1,274 @@
+import asyncio
+import hashlib
+import hmac
+import inspect
+import json
+import logging
+import os
+import socket
+import threading
+import time
+from typing import Any, Callable, Dict, Optional
+
+logger = logging.getLogger(__name__)
+
+PROJECT_DIR = os.path.dirname(os.path.abspath(__file__))
+DEFAULT_SOCKET_PATH = os.path.join(PROJECT_DIR, 'tracker.sock')
+DEFAULT_HOST = '127.0.0.1'
+DEFAULT_PORT = 8765
+DEFAULT_TIMEOUT = 3.0  # sekundy
+# Jak długo panel używa lokalnej kopii danych, gdy bot nie działa
+OFFLINE_TRACKER_TTL = 30.0  # sekundy
+
+# Metody, które panel może wywołać, gdy bot nie działa (tylko odczyt - zapis należy do bota)
+OFFLINE_METHODS = {'get_all_players', 'query_players', 'search_players', 'get_player', 'get_stats', 'get_banned_players'}
+
+
+class IpcError(Exception):
+    """Błąd komunikacji z procesem bota"""
+
+
+def _use_unix_socket() -> bool:
+    return hasattr(socket, 'AF_UNIX') and hasattr(asyncio, 'start_unix_server')
+
+
+def ipc_address(config: Dict[str, Any]):
+    """Zwraca adres IPC: ('unix', ścieżka) albo ('tcp', (host, port)) na systemach bez gniazd Unix"""
+    if _use_unix_socket():
+        return 'unix', config.get('TRACKER_IPC_SOCKET') or DEFAULT_SOCKET_PATH
+    return 'tcp', (DEFAULT_HOST, int(config.get('TRACKER_IPC_PORT', DEFAULT_PORT)))
+
+
+def ipc_token(config: Dict[str, Any]) -> str:
+    """
+    Wspólny sekret połączenia TCP bot-panel: TRACKER_IPC_TOKEN z konfiguracji
+    albo skrót klucza sekretnego panelu (config/secret_key). Gniazdo Unix
+    chronią uprawnienia pliku (0600), port TCP jest dostępny dla każdego
+    lokalnego użytkownika.
+    """
+    token = config.get('TRACKER_IPC_TOKEN')
+    if token:
+        return str(token)
+    from webpanel import load_or_create_secret_key
+    return hmac.new(load_or_create_secret_key(), b'tracker-ipc', hashlib.sha256).hexdigest()
+
+
+def refresh_timeout(config: Dict[str, Any]) -> float:
+    """
+    Limit czasu wywołania `refresh`: bot pyta /player/count, potem pobiera
+    listę graczy i banlistę (ROSTER_DEADLINE); DEFAULT_TIMEOUT to zapas na
+    publikację snapshotu i odpowiedź.
+    """
+    from game_api import DEFAULT_ENDPOINT_TIMEOUTS, DEFAULT_TIMEOUT as API_TIMEOUT
+    from snapshot import DEFAULT_ROSTER_DEADLINE
+    endpoint_timeouts = dict(DEFAULT_ENDPOINT_TIMEOUTS)
+    endpoint_timeouts.update(config.get('GAME_API_ENDPOINT_TIMEOUTS') or {})
+    count_timeout = float(endpoint_timeouts.get('/player/count', config.get('GAME_API_TIMEOUT', API_TIMEOUT)))
+    return count_timeout + float(config.get('ROSTER_DEADLINE', DEFAULT_ROSTER_DEADLINE)) + DEFAULT_TIMEOUT
+
+
+class TrackerIpcServer:
+    """
+    Lokalny serwer IPC działający w procesie bota.
+
+    Protokół to jedna linia JSON na zapytanie: {"method": ..., "params": {...}}
+    i jedna linia JSON na odpowiedź: {"ok": true, "result": ...} lub
+    {"ok": false, "error": ...}. Wywoływać można tylko zarejestrowane metody.
+    Przez TCP zapytanie musi też zawierać "token" równy `ipc_token(config)`.
+    """
+
+    def __init__(self, handlers: Dict[str, Callable[..., Any]], config: Dict[str, Any]):
+        self.handlers = handlers
+        self.kind, self.address = ipc_address(config)
+        self.token = ipc_token(config) if self.kind == 'tcp' else None
+        self._server: Optional[asyncio.AbstractServer] = None
+
+    async def start(self) -> None:
+        if self._server is not None:
+            return
+        if self.kind == 'unix':
+            if os.path.exists(self.address):
+                os.remove(self.address)
+            self._server = await asyncio.start_unix_server(self._handle, path=self.address)
+            os.chmod(self.address, 0o600)
+        else:
+            host, port = self.address
+            self._server = await asyncio.start_server(self._handle, host=host, port=port)
+        logger.info(f"Serwer IPC trackera nasłuchuje ({self.kind}: {self.address})")
+
+    async def stop(self) -> None:
+        if self._server is None:
+            return
+        self._server.close()
+        await self._server.wait_closed()
+        self._server = None
+        if self.kind == 'unix' and os.path.exists(self.address):
+            os.remove(self.address)
+
+    async def _handle(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter) -> None:
+        try:
+            while True:
+                line = await reader.readline()
+                if not line:
+                    break
+                response = await self._dispatch(line)
+                writer.write(json.dumps(response, ensure_ascii=False, default=str).encode('utf-8') + b"\n")
+                await writer.drain()
+        except (ConnectionError, asyncio.IncompleteReadError):
+            pass
+        finally:
+            writer.close()
+
+    async def _dispatch(self, line: bytes) -> Dict[str, Any]:
+        try:
+            request = json.loads(line)
+            if self.token is not None and not hmac.compare_digest(str(request.get('token', '')).encode('utf-8'), self.token.encode('utf-8')):
+                logger.warning(f"Odrzucono zapytanie IPC bez poprawnego tokenu: {request.get('method')}")
+                return {"ok": False, "error": "Brak autoryzacji IPC"}
+            handler = self.handlers.get(request.get('method'))
+            if handler is None:
+                return {"ok": False, "error": f"Nieznana metoda: {request.get('method')}"}
+            result = handler(**(request.get('params') or {}))
+            if inspect.isawaitable(result):
+                result = await result
+            return {"ok": True, "result": result}
+        except Exception as e:
+            logger.error(f"Błąd obsługi zapytania IPC: {e}")
+            return {"ok": False, "error": str(e)}
+
+
+class TrackerClient:
+    """
+    Synchroniczny klient IPC dla panelu webowego.
+
+    Udostępnia te same metody odczytu co PlayerTracker, ale dane pochodzą
+    z procesu bota - jedynego właściciela stanu graczy. Gdy bot nie działa,
+    odczyty są obsługiwane z lokalnej kopii wczytanej z magazynu.
+    """
+
+    def __init__(self, config: Dict[str, Any], timeout: float = DEFAULT_TIMEOUT):
+        self.kind, self.address = ipc_address(config)
+        self.token = ipc_token(config) if self.kind == 'tcp' else None
+        self.timeout = timeout
+        self.refresh_timeout = refresh_timeout(config)
+        self._local = None
+        self._local_loaded_at = 0.0
+        self._local_lock = threading.Lock()
+        self._local_series = None
+        self._local_series_mtime = None
+
+    def call(self, method: str, *, timeout: Optional[float] = None, **params) -> Any:
+        """Wywołuje metodę w procesie bota (IpcError, gdy bot jest niedostępny lub nie zdąży w `timeout` sekund)"""
+        family = socket.AF_UNIX if self.kind == 'unix' else socket.AF_INET
+        request = {"method": method, "params": params}
+        if self.token is not None:
+            request["token"] = self.token
+        try:
+            with socket.socket(family, socket.SOCK_STREAM) as sock:
+                sock.settimeout(self.timeout if timeout is None else timeout)
+                sock.connect(self.address)
+                sock.sendall(json.dumps(request).encode('utf-8') + b"\n")
+                with sock.makefile('rb') as stream:
+                    line = stream.readline()
+        except OSError as e:
+            raise IpcError(f"Bot jest niedostępny: {e}")
+        if not line:
+            raise IpcError("Bot zamknął połączenie")
+        response = json.loads(line)
+        if not response.get('ok'):
+            raise IpcError(response.get('error', 'Nieznany błąd'))
+        return response.get('result')
+
+    def _call_or_local(self, method: str, **params) -> Any:
+        try:
+            return self.call(method, **params)
+        except IpcError as e:
+            if method not in OFFLINE_METHODS:
+                raise
+            logger.debug(f"IPC niedostępne ({e}) - używam lokalnej kopii danych graczy")
+            return getattr(self._local_tracker(), method)(**params)
+
+    def _local_tracker(self):
+        """Kopia danych z magazynu tylko do odczytu, odświeżana co OFFLINE_TRACKER_TTL sekund"""
+        with self._local_lock:
+            if self._local is None or time.monotonic() - self._local_loaded_at > OFFLINE_TRACKER_TTL:
+                from webpanel.playerlist import PlayerTracker
+                if self._local is not None:
+                    self._local.close()
+                self._local = PlayerTracker(read_only=True)
+                self._local_loaded_at = time.monotonic()
+            return self._local
+
+    def _series_from_file(self):
+        """Szereg czasowy liczby graczy wczytany z pliku bota (ponownie tylko po jego zmianie)"""
+        from timeseries import DEFAULT_TIMESERIES_FILE, PlayerTimeSeries
+        try:
+            mtime = os.path.getmtime(DEFAULT_TIMESERIES_FILE)
+        except OSError:
+            mtime = None
+        with self._local_lock:
+            if self._local_series is None or mtime != self._local_series_mtime:
+                self._local_series = PlayerTimeSeries(DEFAULT_TIMESERIES_FILE)
+                self._local_series_mtime = mtime
+            return self._local_series
+
+    def get_all_players(self):
+        return self._call_or_local('get_all_players')
+
+    def query_players(self, **params):
+        return self._call_or_local('query_players', **params)
+
+    def search_players(self, query: str, limit: int = 10):
+        return self._call_or_local('search_players', query=query, limit=limit)
+
+    def get_player(self, unique_id: str):
+        return self._call_or_local('get_player', unique_id=str(unique_id))
+
+    def get_stats(self):
+        return self._call_or_local('get_stats')
+
+    def get_banned_players(self):
+        return self._call_or_local('get_banned_players')
+
+    def reset_join_counts(self):
+        return self._call_or_local('reset_join_counts')
+
+    def open_sessions(self):
+        """Trwające sesje graczy online [(unique_id, wejście)]; pusta lista, gdy bot nie działa"""
+        try:
+            return self.call('open_sessions')
+        except IpcError:
+            return []
+
+    def snapshot(self) -> Optional[Dict[str, Any]]:
+        """Ostatni snapshot serwera z pollera bota (None, gdy bot nie działa)"""
+        try:
+            return self.call('snapshot')
+        except IpcError:
+            return None
+
+    def poll_cadence(self) -> Optional[Dict[str, Any]]:
+        """Aktualny interwał odpytywania serwera przez bota (None, gdy bot nie działa)"""
+        try:
+            return self.call('poll_cadence')
+        except IpcError:
+            return None
+
+    def api_health(self) -> Optional[Dict[str, Any]]:
+        """Stan bezpiecznika API serwera gry w bocie (None, gdy bot nie działa)"""
+        try:
+            return self.call('api_health')
+        except IpcError:
+            return None
+
+    def player_history(self, **params) -> Dict[str, Any]:
+        """Liczba graczy w czasie (min/avg/max); gdy bot nie działa - z ostatniego zapisu pliku"""
+        try:
+            return self.call('player_history', **params)
+        except IpcError:
+            return self._series_from_file().window(**params)
+
+    def refresh(self) -> Optional[Dict[str, Any]]:
+        """Wymusza odpytanie serwera przez bota i zwraca nowy snapshot"""
+        # Odpytanie serwera gry trwa dłużej niż zwykłe zapytanie IPC
+        return self.call('refresh', timeout=self.refresh_timeout)
@@ -33,7 +33,13 @@ def load_or_create_secret_key():
         os.makedirs('config')
         
     secret_key = secrets.token_bytes(32)
-    with open(secret_key_file, 'wb') as f:
+    try:
+        fd = os.open(secret_key_file, os.O_WRONLY | os.O_CREAT | os.O_EXCL, 0o600)
+    except FileExistsError:
+        # Bot (token IPC) i panel mogą tworzyć klucz jednocześnie - obowiązuje pierwszy zapisany
+        with open(secret_key_file, 'rb') as f:
+            return f.read()
+    with os.fdopen(fd, 'wb') as f:
         f.write(secret_key)
     
     return secret_key
@@ -89,14 +95,6 @@ def create_app():
     from .routes import bp as routes_bp
     app.register_blueprint(routes_bp)
 
-    # Resetuj join_count wszystkich graczy przy starcie
-    try:
-        from .playerlist import PlayerTracker
-        tracker = PlayerTracker()
-        tracker.reset_join_counts()
-    except Exception as e:
-        app.logger.error(f'Błąd resetowania join_count: {e}')
-
     def format_datetime(value):
         if isinstance(value, str):
             try:
@@ -0,0 +1,167 @@
+import json
+import logging
+import queue
+import threading
+import time
+from typing import Any, Callable, Dict, Iterator, List, Optional
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_LOG_INTERVAL = 1.0  # sekundy między sprawdzeniami logu
+DEFAULT_STATS_INTERVAL = 5.0  # sekundy między odczytami statystyk
+DEFAULT_HEARTBEAT = 15.0  # komentarz SSE podtrzymujący połączenie
+DEFAULT_MAX_STREAM_AGE = 600.0  # po tylu sekundach strumień jest zamykany, przeglądarka łączy się ponownie
+DEFAULT_QUEUE_SIZE = 256
+RECONNECT_DELAY_MS = 5000
+
+
+def format_sse(event: str, data: Any, event_id: Optional[int] = None) -> str:
+    """Jedna wiadomość w formacie text/event-stream"""
+    message = f"event: {event}\n"
+    if event_id is not None:
+        message += f"id: {event_id}\n"
+    return message + f"data: {json.dumps(data, ensure_ascii=False)}\n\n"
+
+
+class Subscriber:
+    """Kolejka wiadomości jednej przeglądarki; przepełniona kolejka kończy strumień"""
+
+    def __init__(self, size: int):
+        self.queue: "queue.Queue[str]" = queue.Queue(maxsize=size)
+        self.overflowed = False
+
+    def put(self, message: str) -> None:
+        try:
+            self.queue.put_nowait(message)
+        except queue.Full:
+            self.overflowed = True
+
+
+class LiveFeed:
+    """
+    Źródło zdarzeń na żywo dla panelu (Server-Sent Events).
+
+    Jeden wątek-producent sprawdza przyrost logu bota (`LogTail.entries`
+    z własnym kursorem, niezależnym od innych czytelników tego samego logu)
+    i co `stats_interval` sekund odczytuje statystyki, a do subskrybentów
+    rozsyła tylko nowe linie logu i zmienione pola statystyk. Wątek działa
+    tylko wtedy, gdy ktoś słucha - bez otwartych kart panel nie wykonuje
+    żadnej pracy, a dziesięć kart kosztuje tyle samo odczytów co jedna.
+
+    Wolny klient, którego kolejka się zapełni, jest rozłączany - po ponownym
+    połączeniu dostaje pełny stan i brakujące logi (`Last-Event-ID`).
+    """
+
+    def __init__(self, log_tail, stats_source: Callable[[], Dict[str, Any]], log_interval: float = DEFAULT_LOG_INTERVAL,
+                 stats_interval: float = DEFAULT_STATS_INTERVAL, heartbeat: float = DEFAULT_HEARTBEAT,
+                 max_stream_age: float = DEFAULT_MAX_STREAM_AGE, queue_size: int = DEFAULT_QUEUE_SIZE):
+        self.log_tail = log_tail
+        self.stats_source = stats_source
+        self.log_interval = max(0.1, log_interval)
+        self.stats_interval = max(self.log_interval, stats_interval)
+        self.heartbeat = heartbeat
+        self.max_stream_age = max_stream_age
+        self.queue_size = queue_size
+        self._subscribers: List[Subscriber] = []
+        self._stats: Optional[Dict[str, Any]] = None
+        self._lock = threading.Lock()
+        self._wake = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+        # Ostatni wpis logu wysłany subskrybentom - kursor producenta, nie współdzielony z /api/logs
+        self._last_log_id = 0
+        self.published = 0
+
+    @classmethod
+    def from_config(cls, config, log_tail, stats_source) -> "LiveFeed":
+        return cls(
+            log_tail,
+            stats_source,
+            log_interval=float(config.get('LIVE_LOG_INTERVAL', DEFAULT_LOG_INTERVAL)),
+            stats_interval=float(config.get('LIVE_STATS_INTERVAL', DEFAULT_STATS_INTERVAL)),
+        )
+
+    @property
+    def subscribers(self) -> int:
+        return len(self._subscribers)
+
+    def subscribe(self) -> Subscriber:
+        subscriber = Subscriber(self.queue_size)
+        with self._lock:
+            self._subscribers.append(subscriber)
+            if self._thread is None or not self._thread.is_alive():
+                self._thread = threading.Thread(target=self._run, name="live-feed", daemon=True)
+                self._thread.start()
+        return subscriber
+
+    def unsubscribe(self, subscriber: Subscriber) -> None:
+        with self._lock:
+            if subscriber in self._subscribers:
+                self._subscribers.remove(subscriber)
+        self._wake.set()
+
+    def stats(self) -> Dict[str, Any]:
+        """Ostatnie statystyki producenta; odczytywane na żądanie, gdy producent jeszcze ich nie ma"""
+        stats = self._stats
+        return stats if stats is not None else self.stats_source()
+
+    def stream(self, last_log_id: Optional[int] = None) -> Iterator[str]:
+        """Generator odpowiedzi SSE: pełny stan na start, potem tylko zmiany"""
+        # Subskrypcja dopiero przy pierwszym odczycie - niewysłana odpowiedź nie zostawia subskrybenta
+        subscriber = self.subscribe()
+        started = time.monotonic()
+        try:
+            yield f"retry: {RECONNECT_DELAY_MS}\n\n"
+            yield format_sse('stats', self.stats())
+            if last_log_id is not None:
+                missed = self.log_tail.entries(after=last_log_id)
+                if missed:
+                    yield format_sse('log', missed, missed[-1]['id'])
+            while not subscriber.overflowed and time.monotonic() - started < self.max_stream_age:
+                try:
+                    yield subscriber.queue.get(timeout=self.heartbeat)
+                except queue.Empty:
+                    yield ": ping\n\n"
+        finally:
+            self.unsubscribe(subscriber)
+
+    def publish(self, event: str, data: Any, event_id: Optional[int] = None) -> None:
+        message = format_sse(event, data, event_id)
+        with self._lock:
+            subscribers = list(self._subscribers)
+        for subscriber in subscribers:
+            subscriber.put(message)
+            if subscriber.overflowed:
+                # Klient nie odbiera - zwolnij go, nawet jeśli jego generator już nie ruszy
+                self.unsubscribe(subscriber)
+        self.published += 1
+
+    def _run(self) -> None:
+        next_stats = 0.0
+        # Pomija logi sprzed startu producenta - nowy subskrybent ma je z renderu strony
+        self._last_log_id = self.log_tail.last_id()
+        while True:
+            with self._lock:
+                if not self._subscribers:
+                    self._thread = None
+                    self._stats = None
+                    return
+            try:
+                entries = self.log_tail.entries(after=self._last_log_id)
+                if entries:
+                    self._last_log_id = entries[-1]['id']
+                    self.publish('log', entries, self._last_log_id)
+                now = time.monotonic()
+                if now >= next_stats:
+                    next_stats = now + self.stats_interval
+                    self._publish_stats(self.stats_source())
+            except Exception as e:
+                logger.error(f"Błąd producenta zdarzeń na żywo: {e}")
+            self._wake.wait(self.log_interval)
+            self._wake.clear()
+
+    def _publish_stats(self, stats: Dict[str, Any]) -> None:
+        previous = self._stats or {}
+        changed = {key: value for key, value in stats.items() if previous.get(key) != value}
+        self._stats = stats
+        if changed:
+            self.publish('stats', changed)
@@ -0,0 +1,167 @@
+import os
+import re
+import threading
+from collections import deque
+from datetime import datetime
+from typing import Deque, Dict, List, Optional
+
+# Przykładowy format: 2024-06-08 12:34:56,789 [INFO] Wiadomość
+LOG_LINE_RE = re.compile(r'^(\d{4}-\d{2}-\d{2} \d{2}:\d{2}:\d{2},\d{3}) \[(\w+)\] (.*)$')
+LOG_TYPE_COLORS = {
+    'INFO': 'success',
+    'WARNING': 'warning',
+    'ERROR': 'danger',
+    'CRITICAL': 'danger',
+    'DEBUG': 'secondary'
+}
+# Linie oznaczające początek nowej sesji bota (uruchomienie)
+SESSION_MARKERS = ("Zalogowano jako", "Połączono z API", "Bot is ready")
+DEFAULT_BLOCK_SIZE = 64 * 1024
+
+
+def parse_log_line(line: str) -> Dict[str, str]:
+    """Zamienia linię logu na wpis {timestamp, type, type_color, message}"""
+    match = LOG_LINE_RE.match(line)
+    if match:
+        timestamp, log_type, message = match.groups()
+        return {
+            'timestamp': timestamp,
+            'type': log_type,
+            'type_color': LOG_TYPE_COLORS.get(log_type, 'info'),
+            'message': message.strip()
+        }
+    # Linie niestandardowe (np. traceback)
+    return {
+        'timestamp': datetime.now().strftime('%Y-%m-%d %H:%M:%S,%f')[:-3],
+        'type': 'INFO',
+        'type_color': 'info',
+        'message': line.strip()
+    }
+
+
+def is_session_start(line: str) -> bool:
+    return any(marker in line for marker in SESSION_MARKERS)
+
+
+class LogTail:
+    """
+    Przyrostowy czytnik końcówki logu bota.
+
+    Pierwszy odczyt cofa się od końca pliku blokami po `block_size` bajtów,
+    aż zbierze `max_lines` linii albo dojdzie do początku bieżącej sesji bota.
+    Kolejne odczyty czytają tylko bajty dopisane od zapamiętanego offsetu,
+    więc koszt zależy od przyrostu logu, a nie od rozmiaru pliku.
+
+    Rotacja (`RotatingFileHandler` podmienia plik - inny inode), obcięcie
+    pliku lub nadpisanie go od nowa są wykrywane i kończą się ponownym
+    odczytem od końca. Każdy wpis dostaje rosnący numer `id`, dzięki czemu
+    klient może pobrać tylko nowe wpisy (`entries(after=...)`).
+    """
+
+    def __init__(self, path: str, max_lines: int = 500, block_size: int = DEFAULT_BLOCK_SIZE):
+        self.path = path
+        self.max_lines = max(1, max_lines)
+        self.block_size = max(1024, block_size)
+        self._entries: Deque[Dict] = deque(maxlen=self.max_lines)
+        self._offset = 0
+        self._inode: Optional[int] = None
+        self._next_id = 1
+        self._lock = threading.Lock()
+
+    def reset(self) -> None:
+        """Zapomina stan - następny odczyt wczyta końcówkę pliku od nowa"""
+        with self._lock:
+            self._entries.clear()
+            self._offset = 0
+            self._inode = None
+
+    def entries(self, after: Optional[int] = None) -> List[Dict]:
+        """Wpisy bieżącej sesji (najwyżej `max_lines`); z `after` tylko nowsze niż podany `id`"""
+        with self._lock:
+            self._refresh()
+            if after is None:
+                return list(self._entries)
+            return [entry for entry in self._entries if entry['id'] > after]
+
+    def last_id(self) -> int:
+        """Numer ostatniego wpisu po doczytaniu dopisanych linii (0, gdy brak wpisów)"""
+        with self._lock:
+            self._refresh()
+            return self._entries[-1]['id'] if self._entries else 0
+
+    def _refresh(self) -> None:
+        try:
+            stat = os.stat(self.path)
+        except OSError:
+            self._entries.clear()
+            self._offset = 0
+            self._inode = None
+            return
+        with open(self.path, 'rb') as f:
+            if self._inode != stat.st_ino or stat.st_size < self._offset or not self._continues(f):
+                self._load_tail(f, stat.st_size)
+                self._inode = stat.st_ino
+            elif stat.st_size > self._offset:
+                self._read_appended(f, stat.st_size)
+
+    def _continues(self, f) -> bool:
+        """Czy plik nadal kończy linię tam, gdzie skończył się poprzedni odczyt (wykrywa nadpisanie)"""
+        if self._offset == 0:
+            return True
+        f.seek(self._offset - 1)
+        return f.read(1) == b'\n'
+
+    def _load_tail(self, f, size: int) -> None:
+        """Cofa się od końca pliku, aż zbierze max_lines linii lub znajdzie początek sesji"""
+        self._entries.clear()
+        lines: List[str] = []
+        buffer = b''
+        position = size
+        end = None  # offset tuż za ostatnią pełną linią
+        while position > 0:
+            start = max(0, position - self.block_size)
+            f.seek(start)
+            buffer = f.read(position - start) + buffer
+            position = start
+            if end is None:
+                # Niedokończona ostatnia linia zostanie doczytana, gdy pojawi się '\n'
+                cut = buffer.rfind(b'\n')
+                if cut < 0:
+                    continue
+                end = position + cut + 1
+                buffer = buffer[:cut]
+            parts = buffer.split(b'\n')
+            # Pierwszy fragment może być urwaną linią - zostaje doklejony do następnego bloku
+            buffer = parts[0] if position > 0 else b''
+            done = False
+            for raw in reversed(parts[1:] if position > 0 else parts):
+                line = raw.decode('utf-8', errors='replace')
+                lines.append(line)
+                if is_session_start(line) or len(lines) >= self.max_lines:
+                    done = True
+                    break
+            if done:
+                break
+        self._offset = end or 0
+        for line in reversed(lines):
+            self._append(line)
+
+    def _read_appended(self, f, size: int) -> None:
+        f.seek(self._offset)
+        data = f.read(size - self._offset)
+        complete = data.rfind(b'\n')
+        if complete < 0:
+            return
+        self._offset += complete + 1
+        for raw in data[:complete].split(b'\n'):
+            line = raw.decode('utf-8', errors='replace')
+            if is_session_start(line):
+                # Nowe uruchomienie bota - pokazuj logi od jego początku
+                self._entries.clear()
+            self._append(line)
+
+    def _append(self, line: str) -> None:
+        entry = parse_log_line(line)
+        entry['id'] = self._next_id
+        self._next_id += 1
+        self._entries.append(entry)
@@ -0,0 +1,241 @@
+import unicodedata
+from bisect import bisect_left, insort
+from typing import Any, Callable, Dict, Iterable, List, Optional, Set, Tuple
+
+from .storage import PlayerRecord
+
+# Pola, po których można sortować listę graczy
+SORT_FIELDS = ("last_seen", "total_time", "join_count", "name")
+# Domyślny kierunek sortowania dla każdego pola (True = malejąco)
+DEFAULT_DESCENDING = {
+    "last_seen": True,
+    "total_time": True,
+    "join_count": True,
+    "name": False,
+}
+
+
+class SortedIndex:
+    """
+    Posortowana lista par (klucz, unique_id) utrzymywana przyrostowo.
+
+    ID gracza w parze rozstrzyga remisy, więc kolejność jest stabilna
+    między stronami. Pobranie strony to zwykły wycinek listy - O(rozmiar strony).
+    """
+
+    def __init__(self, key: Callable[[str, PlayerRecord], Any]):
+        self.key = key
+        self._entries: List[Tuple[Any, str]] = []
+        self._keys: Dict[str, Any] = {}
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def rebuild(self, players: Dict[str, PlayerRecord]) -> None:
+        self._keys = {unique_id: self.key(unique_id, player) for unique_id, player in players.items()}
+        self._entries = sorted((key, unique_id) for unique_id, key in self._keys.items())
+
+    def update(self, unique_id: str, player: PlayerRecord) -> None:
+        key = self.key(unique_id, player)
+        old_key = self._keys.get(unique_id)
+        if old_key is not None:
+            if old_key == key:
+                return
+            self._remove_entry(old_key, unique_id)
+        self._keys[unique_id] = key
+        insort(self._entries, (key, unique_id))
+
+    def remove(self, unique_id: str) -> None:
+        old_key = self._keys.pop(unique_id, None)
+        if old_key is not None:
+            self._remove_entry(old_key, unique_id)
+
+    def _remove_entry(self, key: Any, unique_id: str) -> None:
+        position = bisect_left(self._entries, (key, unique_id))
+        if position < len(self._entries) and self._entries[position] == (key, unique_id):
+            del self._entries[position]
+
+    def key_of(self, unique_id: str) -> Any:
+        return self._keys.get(unique_id)
+
+    def page(self, offset: int, limit: int, descending: bool = False) -> List[str]:
+        """Zwraca ID graczy z zakresu [offset, offset + limit) w wybranym kierunku"""
+        if offset >= len(self._entries) or limit <= 0:
+            return []
+        if descending:
+            end = len(self._entries) - offset
+            start = max(0, end - limit)
+            return [unique_id for _, unique_id in reversed(self._entries[start:end])]
+        return [unique_id for _, unique_id in self._entries[offset:offset + limit]]
+
+    def order(self, unique_ids: Iterable[str], descending: bool = False) -> List[str]:
+        """Sortuje podzbiór graczy (np. tylko online) według kluczy indeksu"""
+        indexed = [unique_id for unique_id in unique_ids if unique_id in self._keys]
+        return sorted(indexed, key=lambda unique_id: (self._keys[unique_id], unique_id), reverse=descending)
+
+
+def build_indexes() -> Dict[str, SortedIndex]:
+    """Tworzy indeksy dla wszystkich pól z SORT_FIELDS"""
+    return {
+        # Gracze online są "widziani teraz", więc zawsze trafiają na początek listy malejącej
+        "last_seen": SortedIndex(lambda unique_id, p: float("inf") if p.is_online else p.last_seen),
+        # Zaliczony czas gry - bez trwającej sesji, która rośnie z każdą sekundą
+        "total_time": SortedIndex(lambda unique_id, p: p.total_time),
+        "join_count": SortedIndex(lambda unique_id, p: p.join_count),
+        "name": SortedIndex(lambda unique_id, p: p.name.casefold()),
+    }
+
+
+# Litery, których NFKD nie rozkłada na literę bazową + akcent
+_EXTRA_FOLDS = str.maketrans({"ł": "l", "đ": "d", "ø": "o", "ħ": "h", "ŧ": "t"})
+
+
+def normalize_name(name: str) -> str:
+    """Normalizuje nazwę do wyszukiwania: bez wielkości liter, akcentów i nadmiarowych spacji"""
+    decomposed = unicodedata.normalize("NFKD", str(name).casefold().translate(_EXTRA_FOLDS))
+    stripped = "".join(ch for ch in decomposed if not unicodedata.combining(ch))
+    return " ".join(stripped.split())
+
+
+def _trigrams(text: str) -> Set[str]:
+    padded = f"  {text} "
+    return {padded[i:i + 3] for i in range(len(padded) - 2)}
+
+
+class NameIndex:
+    """
+    Indeks nazw graczy: drzewo prefiksowe (trie) + indeks trigramów.
+
+    Trie odpowiada na zapytania prefiksowe - od początku nazwy lub od
+    początku dowolnego słowa w nazwie (np. "kowal" znajdzie "[PL] Kowalski").
+    Gdy prefiksów jest za mało, wynik uzupełnia dopasowanie rozmyte po
+    trigramach (literówki, fragmenty ze środka nazwy).
+    """
+
+    _IDS = "\0"  # klucz węzła trie przechowujący ID graczy kończących się w tym miejscu
+
+    def __init__(self):
+        self._root: Dict[str, Any] = {}
+        self._names: Dict[str, str] = {}  # unique_id -> znormalizowana nazwa
+        self._trigrams: Dict[str, Set[str]] = {}
+        self._gram_counts: Dict[str, int] = {}
+
+    def __len__(self) -> int:
+        return len(self._names)
+
+    def rebuild(self, names: Dict[str, str]) -> None:
+        self._root = {}
+        self._names = {}
+        self._trigrams = {}
+        self._gram_counts = {}
+        for unique_id, name in names.items():
+            self.add(unique_id, name)
+
+    @staticmethod
+    def _keys(normalized: str) -> Set[str]:
+        """Klucze trie: cała nazwa i każdy jej sufiks zaczynający się od słowa"""
+        keys = {normalized}
+        for position, ch in enumerate(normalized):
+            if position and not normalized[position - 1].isalnum() and ch.isalnum():
+                keys.add(normalized[position:])
+        return keys
+
+    def add(self, unique_id: str, name: str) -> None:
+        """Dodaje gracza lub aktualizuje jego nazwę (zmiana nazwy)"""
+        normalized = normalize_name(name)
+        old = self._names.get(unique_id)
+        if old == normalized:
+            return
+        if old is not None:
+            self.remove(unique_id)
+        self._names[unique_id] = normalized
+        for key in self._keys(normalized):
+            node = self._root
+            for ch in key:
+                node = node.setdefault(ch, {})
+            node.setdefault(self._IDS, set()).add(unique_id)
+        grams = _trigrams(normalized)
+        self._gram_counts[unique_id] = len(grams)
+        for gram in grams:
+            self._trigrams.setdefault(gram, set()).add(unique_id)
+
+    def remove(self, unique_id: str) -> None:
+        normalized = self._names.pop(unique_id, None)
+        if normalized is None:
+            return
+        self._gram_counts.pop(unique_id, None)
+        for key in self._keys(normalized):
+            path = [self._root]
+            for ch in key:
+                node = path[-1].get(ch)
+                if node is None:
+                    break
+                path.append(node)
+            else:
+                ids = path[-1].get(self._IDS)
+                if ids is not None:
+                    ids.discard(unique_id)
+                    if not ids:
+                        del path[-1][self._IDS]
+                # Usuń puste gałęzie
+                for depth in range(len(key), 0, -1):
+                    if path[depth]:
+                        break
+                    del path[depth - 1][key[depth - 1]]
+        for gram in _trigrams(normalized):
+            ids = self._trigrams.get(gram)
+            if ids is not None:
+                ids.discard(unique_id)
+                if not ids:
+                    del self._trigrams[gram]
+
+    def prefix(self, query: str, limit: int = 25) -> List[str]:
+        """ID graczy, których nazwa (lub słowo w nazwie) zaczyna się od `query`"""
+        node = self._root
+        for ch in normalize_name(query):
+            node = node.get(ch)
+            if node is None:
+                return []
+        found: List[str] = []
+        seen: Set[str] = set()
+        # Przeszukiwanie wszerz - krótsze (bliższe zapytaniu) nazwy najpierw
+        queue = [node]
+        while queue and len(found) < limit:
+            next_queue = []
+            for current in queue:
+                for unique_id in sorted(current.get(self._IDS, ())):
+                    if unique_id not in seen:
+                        seen.add(unique_id)
+                        found.append(unique_id)
+                        if len(found) >= limit:
+                            return found
+                next_queue.extend(child for ch, child in sorted(current.items()) if ch != self._IDS)
+            queue = next_queue
+        return found
+
+    def fuzzy(self, query: str, limit: int = 25, threshold: float = 0.3,
+              exclude: Optional[Set[str]] = None) -> List[str]:
+        """ID graczy o nazwach podobnych do `query` (współczynnik Dice'a na trigramach)"""
+        grams = _trigrams(normalize_name(query))
+        shared: Dict[str, int] = {}
+        for gram in grams:
+            for unique_id in self._trigrams.get(gram, ()):
+                shared[unique_id] = shared.get(unique_id, 0) + 1
+        scored = []
+        for unique_id, count in shared.items():
+            if exclude and unique_id in exclude:
+                continue
+            score = 2 * count / (len(grams) + self._gram_counts[unique_id])
+            if score >= threshold:
+                scored.append((-score, unique_id))
+        scored.sort()
+        return [unique_id for _, unique_id in scored[:limit]]
+
+    def search(self, query: str, limit: int = 25) -> List[str]:
+        """Najpierw dopasowania prefiksowe, potem rozmyte - bez duplikatów"""
+        if not normalize_name(query):
+            return []
+        found = self.prefix(query, limit)
+        if len(found) < limit:
+            found += self.fuzzy(query, limit - len(found), exclude=set(found))
+        return found
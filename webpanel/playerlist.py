@@ -1,71 +1,129 @@
-import json
-import os
-from datetime import datetime, timedelta
-from typing import Dict, List, Optional
+import atexit
+import logging
+import threading
+import time
+from datetime import datetime
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+from player_events import PlayerEvent, PlayerJoined, PlayerLeft, PlayerRenamed, diff_rosters, roster_from_players
+from .player_index import DEFAULT_DESCENDING, SORT_FIELDS, NameIndex, build_indexes
+from .storage import PlayerRecord, PlayerStorage, JsonPlayerStorage, create_storage, to_iso
+
+logger = logging.getLogger(__name__)
+
+# Domyślne parametry zapisu write-behind
+DEFAULT_FLUSH_INTERVAL = 5.0  # sekundy
+DEFAULT_FLUSH_THRESHOLD = 100  # liczba zmienionych graczy wymuszająca natychmiastowy zapis
+STATS_VERIFY_INTERVAL = 3600.0  # sekundy między sprawdzeniami liczników statystyk przy zapisie
+DEFAULT_PAGE_SIZE = 25
+MAX_PAGE_SIZE = 200
+
+
+def format_duration(seconds: float) -> str:
+    """Formatuje czas w sekundach jako 'Xd Xh Xm Xs'"""
+    days, remainder = divmod(int(seconds), 86400)
+    hours, remainder = divmod(remainder, 3600)
+    minutes, secs = divmod(remainder, 60)
+    return f"{days}d {hours}h {minutes}m {secs}s"
+
+
+def start_of_day(timestamp: float) -> float:
+    """Zwraca epoch północy (czas lokalny) dnia, w którym wypada `timestamp`"""
+    return datetime.fromtimestamp(timestamp).replace(hour=0, minute=0, second=0, microsecond=0).timestamp()
+
 
 class PlayerTracker:
-    def __init__(self, file_path: Optional[str] = None, banned_file_path: Optional[str] = None, online_file_path: Optional[str] = None):
-        if file_path is None:
-            file_path = os.path.join(os.path.dirname(__file__), "playerlist.json")
-        if banned_file_path is None:
-            banned_file_path = os.path.join(os.path.dirname(__file__), "banned_players.json")
-        if online_file_path is None:
-            online_file_path = os.path.join(os.path.dirname(__file__), "online_players.json")
-        self.file_path = file_path
-        self.banned_file_path = banned_file_path
-        self.online_file_path = online_file_path
-        self.players: Dict[str, Dict] = {}
+    """
+    Śledzi graczy, ich status online i czas gry.
+
+    Gracze są trzymani jako zwarte rekordy `PlayerRecord` ze znacznikami
+    czasu epoch - na słowniki z datami ISO zamieniane są dopiero w widokach
+    (`get_player`, `get_all_players`) i przy zapisie do magazynu.
+
+    Statystyki (`get_stats`) są liczone przyrostowo przy każdej zmianie
+    rekordu, więc odczyt nie przegląda wszystkich graczy. `recompute_stats()`
+    liczy je od zera; zgodność liczników sprawdza tests/test_playerlist_stats.py,
+    a `flush()` porównuje je z przeliczeniem (`verify_stats()`) tylko jako
+    zabezpieczenie, najwyżej raz na STATS_VERIFY_INTERVAL sekund.
+
+    `query_players()` zwraca jedną stronę graczy z posortowanych indeksów
+    (utrzymywanych przy każdej zmianie), bez budowania całej listy,
+    a `search_players()` szuka graczy po nazwie w indeksie `NameIndex`.
+
+    Zmiany są zapisywane w trybie write-behind: zmienione rekordy są oznaczane
+    jako brudne i zapisywane jednym `flush()` po `flush_interval` sekundach
+    lub po przekroczeniu `flush_threshold` zmian. Przy zamknięciu procesu
+    zaległe zmiany są zapisywane automatycznie.
+    """
+
+    def __init__(self, file_path: Optional[str] = None, banned_file_path: Optional[str] = None, online_file_path: Optional[str] = None, storage: Optional[PlayerStorage] = None,
+                 flush_interval: Optional[float] = None, flush_threshold: Optional[int] = None, session_log=None,
+                 read_only: bool = False):
+        if storage is None:
+            if file_path or banned_file_path or online_file_path:
+                storage = JsonPlayerStorage(file_path, banned_file_path, online_file_path)
+            else:
+                # Backend wybierany opcją PLAYER_STORAGE (domyślnie SQLite)
+                storage = create_storage()
+        self.storage = storage
+        # Kopia tylko do odczytu (panel bez bota) - zmiany nie są zapisywane do magazynu
+        self.read_only = read_only
+        # Opcjonalny dziennik zakończonych sesji (sessions.SessionLog) dla analityki
+        self.session_log = session_log
+        self.players: Dict[str, PlayerRecord] = {}
         self.banned_players: List[Dict] = []
-        self.online_players: Dict[str, datetime] = {}
+        # unique_id -> epoch, do którego czas gry został już zaliczony
+        self.online_players: Dict[str, float] = {}
         self.load_players()
         self.load_banned_players()
         self.load_online_players()
+        self._rebuild_aggregates()
+        self._indexes = build_indexes()
+        self._name_index = NameIndex()
+        self._rebuild_indexes()
+
+        if flush_interval is None or flush_threshold is None:
+            from config import CONFIG
+            if flush_interval is None:
+                flush_interval = float(CONFIG.get('PLAYER_FLUSH_INTERVAL', DEFAULT_FLUSH_INTERVAL))
+            if flush_threshold is None:
+                flush_threshold = int(CONFIG.get('PLAYER_FLUSH_THRESHOLD', DEFAULT_FLUSH_THRESHOLD))
+        self.flush_interval = flush_interval
+        self.flush_threshold = flush_threshold
+        self._lock = threading.RLock()
+        self._dirty_players = set()
+        self._online_dirty = False
+        self._banned_dirty = False
+        self._flush_timer: Optional[threading.Timer] = None
+        self._verified_at = time.monotonic()
+        if not read_only:
+            atexit.register(self.flush)
     
     def load_players(self) -> None:
-        """Ładuje listę graczy z pliku"""
-        if os.path.exists(self.file_path):
-            try:
-                with open(self.file_path, 'r', encoding='utf-8') as f:
-                    self.players = json.load(f)
-            except json.JSONDecodeError:
-                self.players = {}
-        else:
-            self.players = {}
+        """Ładuje listę graczy z magazynu"""
+        self.players = self.storage.load_players()
     
-    def save_players(self) -> None:
-        """Zapisuje listę graczy do pliku"""
-        with open(self.file_path, 'w', encoding='utf-8') as f:
-            json.dump(self.players, f, indent=4, ensure_ascii=False)
+    def save_players(self, changed: Optional[Iterable[str]] = None) -> None:
+        """Zapisuje graczy do magazynu (tylko `changed`, jeśli podano)"""
+        self.storage.save_players(self.players, changed)
     
     def load_banned_players(self) -> None:
-        if os.path.exists(self.banned_file_path):
-            try:
-                with open(self.banned_file_path, 'r', encoding='utf-8') as f:
-                    data = json.load(f)
-                    if isinstance(data, dict):
-                        self.banned_players = list(data.values())
-                    elif isinstance(data, list):
-                        self.banned_players = data
-                    else:
-                        self.banned_players = []
-            except json.JSONDecodeError:
-                self.banned_players = []
-        else:
-            self.banned_players = []
+        self.banned_players = self.storage.load_banned_players()
     
     def save_banned_players(self) -> None:
-        # Zawsze zapisuj jako listę
-        with open(self.banned_file_path, 'w', encoding='utf-8') as f:
-            json.dump(self.banned_players, f, indent=4, ensure_ascii=False)
+        self.storage.save_banned_players(self.banned_players)
     
     def update_banned_players(self, banned_players_data: List[Dict] | Dict) -> None:
         if isinstance(banned_players_data, dict):
-            self.banned_players = list(banned_players_data.values())
+            banned_players = list(banned_players_data.values())
         elif isinstance(banned_players_data, list):
-            self.banned_players = banned_players_data
+            banned_players = banned_players_data
         else:
-            self.banned_players = []
-        self.save_banned_players()
+            banned_players = []
+        with self._lock:
+            if banned_players == self.banned_players:
+                return
+            self.banned_players = banned_players
+            self._mark_dirty(banned=True)
     
     def get_banned_players(self) -> List[Dict]:
         # Zawsze zwracaj listę
@@ -74,134 +132,350 @@ class PlayerTracker:
         return self.banned_players
     
     def load_online_players(self) -> None:
-        if os.path.exists(self.online_file_path):
-            try:
-                with open(self.online_file_path, 'r', encoding='utf-8') as f:
-                    data = json.load(f)
-                    self.online_players = {k: datetime.fromisoformat(v) for k, v in data.items()}
-            except Exception:
-                self.online_players = {}
-        else:
+        try:
+            self.online_players = self.storage.load_online_players()
+        except Exception:
             self.online_players = {}
 
     def save_online_players(self) -> None:
-        with open(self.online_file_path, 'w', encoding='utf-8') as f:
-            json.dump({k: v.isoformat() for k, v in self.online_players.items()}, f, indent=4, ensure_ascii=False)
+        self.storage.save_online_players(self.online_players)
     
-    def update_online_status(self, online_players_data: List[Dict]) -> None:
-        """Aktualizuje status online graczy i ich czas gry"""
-        current_time = datetime.now()
-        current_online_ids = set()
-        # Zapamiętaj poprzednich online
-        previous_online = set(self.online_players.keys())
-        for player_data in online_players_data:
-            player_id = str(player_data.get('unique_id'))
-            if not player_id:
-                continue
-            current_online_ids.add(player_id)
-            player_name = player_data.get('name', 'Nieznany')
-            # Jeśli gracz nie był wcześniej online (czyli dołącza)
-            joined_now = player_id not in previous_online
-            if player_id not in self.online_players:
-                self.online_players[player_id] = current_time
-                self.add_player(player_id, player_name, joined_now=joined_now)
+    def _rebuild_aggregates(self, now: Optional[float] = None) -> None:
+        """Liczy liczniki statystyk od zera (po wczytaniu danych z magazynu)"""
+        now = time.time() if now is None else now
+        self._today = start_of_day(now)
+        self._total_joins = sum(p.join_count for p in self.players.values())
+        # Czas gry już zaliczony do total_time (bez trwających sesji)
+        self._credited_time = sum(p.total_time for p in self.players.values())
+        # Suma momentów, do których zaliczono czas graczy online - trwające
+        # sesje to len(online) * now - ta suma
+        self._online_credit_sum = sum(self.online_players.values())
+        self._new_today = sum(1 for p in self.players.values() if p.first_seen >= self._today)
+
+    def _rebuild_indexes(self) -> None:
+        for index in self._indexes.values():
+            index.rebuild(self.players)
+        self._name_index.rebuild({unique_id: player.name for unique_id, player in self.players.items()})
+
+    def _reindex(self, player_ids: Iterable[str]) -> None:
+        """Aktualizuje pozycje zmienionych graczy we wszystkich indeksach sortowania"""
+        for player_id in player_ids:
+            player = self.players.get(player_id)
+            for index in self._indexes.values():
+                if player is None:
+                    index.remove(player_id)
+                else:
+                    index.update(player_id, player)
+            if player is None:
+                self._name_index.remove(player_id)
             else:
-                time_diff = (current_time - self.online_players[player_id]).total_seconds()
-                if player_id in self.players:
-                    self.players[player_id]["total_time"] += time_diff
-                    self.players[player_id]["last_seen"] = current_time.isoformat()
-                    self.players[player_id]["is_online"] = True
-                self.online_players[player_id] = current_time
-        # Sprawdź graczy którzy wyszli z serwera
-        offline_players = set(self.online_players.keys()) - current_online_ids
-        for player_id in offline_players:
-            if player_id in self.players:
-                last_time = (current_time - self.online_players[player_id]).total_seconds()
-                self.players[player_id]["total_time"] += last_time
-                self.players[player_id]["is_online"] = False
-                self.players[player_id]["last_seen"] = current_time.isoformat()
-            del self.online_players[player_id]
-        self.save_players()
-        self.save_online_players()
-    
+                self._name_index.add(player_id, player.name)
+
+    def _roll_day(self, now: float) -> None:
+        """Przy zmianie doby przelicza licznik nowych graczy (raz na dobę)"""
+        today = start_of_day(now)
+        if today > self._today:
+            self._today = today
+            self._new_today = sum(1 for p in self.players.values() if p.first_seen >= today)
+
+    def _mark_dirty(self, player_ids: Iterable[str] = (), online: bool = False, banned: bool = False) -> None:
+        """Oznacza dane do zapisu i planuje zapis (debounce) lub zapisuje od razu po przekroczeniu progu"""
+        if self.read_only:
+            return
+        with self._lock:
+            self._dirty_players.update(player_ids)
+            self._online_dirty = self._online_dirty or online
+            self._banned_dirty = self._banned_dirty or banned
+            if self.flush_interval <= 0 or len(self._dirty_players) >= self.flush_threshold:
+                self.flush()
+            elif self._flush_timer is None:
+                self._flush_timer = threading.Timer(self.flush_interval, self.flush)
+                self._flush_timer.daemon = True
+                self._flush_timer.start()
+
+    @property
+    def dirty(self) -> bool:
+        return bool(self._dirty_players) or self._online_dirty or self._banned_dirty
+
+    def flush(self) -> None:
+        """Zapisuje wszystkie zaległe zmiany do magazynu w jednym kroku"""
+        with self._lock:
+            if self._flush_timer is not None:
+                self._flush_timer.cancel()
+                self._flush_timer = None
+            dirty_players, self._dirty_players = self._dirty_players, set()
+            online_dirty, self._online_dirty = self._online_dirty, False
+            banned_dirty, self._banned_dirty = self._banned_dirty, False
+            try:
+                if dirty_players:
+                    self.save_players(dirty_players)
+                if online_dirty:
+                    self.save_online_players()
+                if banned_dirty:
+                    self.save_banned_players()
+                if self.session_log is not None:
+                    self.session_log.flush()
+            except Exception as e:
+                # Nie gub zmian - spróbuj ponownie przy następnym zapisie
+                logger.error(f"Błąd zapisu danych graczy: {e}")
+                self._dirty_players |= dirty_players
+                self._online_dirty = self._online_dirty or online_dirty
+                self._banned_dirty = self._banned_dirty or banned_dirty
+            if time.monotonic() - self._verified_at >= STATS_VERIFY_INTERVAL:
+                # Pełne przeliczenie jest O(n) - rzadko, przy okazji zapisu
+                self._verified_at = time.monotonic()
+                self.verify_stats()
+
+    def close(self) -> None:
+        """Zapisuje zaległe zmiany i zamyka magazyn"""
+        if not self.read_only:
+            self.flush()
+            atexit.unregister(self.flush)
+        self.storage.close()
+
+    def online_roster(self) -> Dict[str, str]:
+        """Zwraca graczy uznanych za online jako {unique_id: nazwa}"""
+        roster = {}
+        for player_id in self.online_players:
+            player = self.players.get(player_id)
+            roster[player_id] = player.name if player else "Nieznany"
+        return roster
+
+    def update_online_status(self, online_players_data: List[Dict]) -> None:
+        """Aktualizuje status online graczy na podstawie pełnej listy z API (różnicowo)"""
+        current = roster_from_players(online_players_data)
+        self.apply_events(diff_rosters(self.online_roster(), current, time.time()))
+
+    def apply_event(self, event: PlayerEvent) -> None:
+        """Aplikuje pojedyncze zdarzenie dołączenia/wyjścia/zmiany nazwy"""
+        self.apply_events([event])
+
+    def apply_events(self, events: Iterable[PlayerEvent]) -> None:
+        """
+        Aplikuje zdarzenia graczy. Czas gry jest doliczany przy wyjściu -
+        `online_players` przechowuje moment, do którego czas został już zaliczony.
+        """
+        with self._lock:
+            changed = set()
+            for event in events:
+                if self._apply(event):
+                    changed.add(event.unique_id)
+            if changed:
+                self._reindex(changed)
+                self._mark_dirty(changed, online=True)
+
+    def _apply(self, event: PlayerEvent) -> bool:
+        at = event.at
+        player_id = event.unique_id
+        if isinstance(event, PlayerJoined):
+            if player_id in self.online_players:
+                return False
+            self.online_players[player_id] = at
+            self._online_credit_sum += at
+            self._upsert_player(player_id, event.name, at, joined_now=True)
+            return True
+        if isinstance(event, PlayerLeft):
+            credited_until = self.online_players.pop(player_id, None)
+            if credited_until is None:
+                return False
+            self._online_credit_sum -= credited_until
+            if self.session_log is not None:
+                self.session_log.append(player_id, credited_until, at)
+            player = self.players.get(player_id)
+            if player:
+                session = max(0.0, at - credited_until)
+                player.total_time += session
+                self._credited_time += session
+                player.is_online = False
+                player.last_seen = at
+            return True
+        if isinstance(event, PlayerRenamed):
+            player = self.players.get(player_id)
+            if not player or player.name == event.new_name:
+                return False
+            player.name = event.new_name
+            player.last_seen = at
+            return True
+        return False
+
+    def open_sessions(self) -> List[Tuple[str, float]]:
+        """Trwające sesje graczy online jako [(unique_id, czas wejścia)] - dla analityki"""
+        with self._lock:
+            return list(self.online_players.items())
+
+    def _session_time(self, unique_id: str, now: float) -> float:
+        """Czas bieżącej sesji, który nie został jeszcze doliczony do total_time"""
+        credited_until = self.online_players.get(unique_id)
+        if credited_until is None:
+            return 0.0
+        return max(0.0, now - credited_until)
+
+    def _upsert_player(self, unique_id: str, name: str, current_time: float, joined_now: bool = False) -> None:
+        unique_id = str(unique_id)
+        player = self.players.get(unique_id)
+        if joined_now:
+            self._total_joins += 1
+        if player is None:
+            self.players[unique_id] = PlayerRecord(
+                name=name,
+                first_seen=current_time,
+                last_seen=current_time,
+                join_count=1 if joined_now else 0,
+                is_online=True,
+            )
+            self._roll_day(current_time)
+            if current_time >= self._today:
+                self._new_today += 1
+            return
+        player.last_seen = current_time
+        if joined_now:
+            player.join_count += 1
+        player.is_online = True
+        player.name = name
+
     def add_player(self, unique_id: str, name: str, joined_now: bool = False) -> None:
         """Dodaje lub aktualizuje gracza w bazie"""
-        current_time = datetime.now()
-        if str(unique_id) not in self.players:
-            self.players[str(unique_id)] = {
-                "name": name,
-                "first_seen": current_time.isoformat(),
-                "last_seen": current_time.isoformat(),
-                "join_count": 1 if joined_now else 0,
-                "total_time": 0.0,  # Czas w sekundach
-                "is_online": True
-            }
-        else:
-            self.players[str(unique_id)]["last_seen"] = current_time.isoformat()
-            if joined_now:
-                self.players[str(unique_id)]["join_count"] += 1
-            self.players[str(unique_id)]["is_online"] = True
-            if self.players[str(unique_id)]["name"] != name:
-                self.players[str(unique_id)]["name"] = name
-        
-        self.save_players()
-    
+        with self._lock:
+            self._upsert_player(unique_id, name, time.time(), joined_now=joined_now)
+            self._reindex([str(unique_id)])
+            self._mark_dirty([str(unique_id)])
+
+    def _player_view(self, unique_id: str, player: PlayerRecord, now: float) -> Dict[str, Any]:
+        """Buduje słownik gracza dla panelu/Discorda (daty ISO, czas z bieżącą sesją)"""
+        is_online = unique_id in self.online_players
+        played = player.total_time + self._session_time(unique_id, now)
+        last_seen = now if is_online else player.last_seen
+        return {
+            "unique_id": unique_id,
+            "name": player.name,
+            "first_seen": to_iso(player.first_seen),
+            "last_seen": to_iso(last_seen),
+            "last_seen_ts": last_seen,
+            "join_count": player.join_count,
+            "total_time": played,
+            "formatted_time": format_duration(played),
+            "is_online": is_online
+        }
+
     def get_player(self, unique_id: str) -> Optional[Dict]:
         """Pobiera informacje o graczu"""
-        player = self.players.get(str(unique_id))
-        if player:
-            # Konwertuj czas na czytelny format
-            total_time = timedelta(seconds=int(player["total_time"]))
-            days = total_time.days
-            hours, remainder = divmod(total_time.seconds, 3600)
-            minutes, seconds = divmod(remainder, 60)
-            
-            player["formatted_time"] = f"{days}d {hours}h {minutes}m {seconds}s"
-            
-            # Dodaj informację czy jest online
-            player["is_online"] = str(unique_id) in self.online_players
-            
-        return player
-    
+        with self._lock:
+            player = self.players.get(str(unique_id))
+            if player is None:
+                return None
+            return self._player_view(str(unique_id), player, time.time())
+
     def get_all_players(self) -> List[Dict]:
         """Zwraca listę wszystkich graczy"""
-        players = []
-        for unique_id, player_data in self.players.items():
-            # Konwertuj czas na czytelny format
-            total_time = timedelta(seconds=int(player_data["total_time"]))
-            days = total_time.days
-            hours, remainder = divmod(total_time.seconds, 3600)
-            minutes, seconds = divmod(remainder, 60)
-            
-            players.append({
-                "unique_id": unique_id,
-                "name": player_data["name"],
-                "first_seen": player_data["first_seen"],
-                "last_seen": player_data["last_seen"],
-                "join_count": player_data["join_count"],
-                "total_time": player_data["total_time"],
-                "formatted_time": f"{days}d {hours}h {minutes}m {seconds}s",
-                "is_online": str(unique_id) in self.online_players
-            })
-        return players
-    
+        with self._lock:
+            now = time.time()
+            return [self._player_view(unique_id, player, now) for unique_id, player in self.players.items()]
+
+    def query_players(self, sort: str = "last_seen", descending: Optional[bool] = None, offset: int = 0,
+                      limit: int = DEFAULT_PAGE_SIZE, online_only: bool = False) -> Dict[str, Any]:
+        """
+        Zwraca jedną stronę graczy posortowaną po `sort` (last_seen, total_time,
+        join_count, name). Domyślnie pola liczbowe i daty są sortowane malejąco,
+        a nazwa rosnąco. `online_only` ogranicza wynik do graczy online.
+
+        Returns:
+            dict: {"players": [...], "total": liczba pasujących graczy, "offset",
+                   "limit", "sort", "descending", "online_only"}
+        """
+        if sort not in SORT_FIELDS:
+            raise ValueError(f"Nieznane pole sortowania: {sort}")
+        if descending is None:
+            descending = DEFAULT_DESCENDING[sort]
+        offset = max(0, int(offset))
+        limit = max(1, min(int(limit), MAX_PAGE_SIZE))
+        with self._lock:
+            index = self._indexes[sort]
+            if online_only:
+                # Graczy online jest niewielu - wystarczy posortować ich podzbiór
+                ordered = index.order(self.online_players, descending)
+                total = len(ordered)
+                page_ids = ordered[offset:offset + limit]
+            else:
+                total = len(index)
+                page_ids = index.page(offset, limit, descending)
+            now = time.time()
+            players = [self._player_view(unique_id, self.players[unique_id], now) for unique_id in page_ids]
+        return {
+            "players": players,
+            "total": total,
+            "offset": offset,
+            "limit": limit,
+            "sort": sort,
+            "descending": descending,
+            "online_only": online_only,
+        }
+
+    def search_players(self, query: str, limit: int = 10) -> List[Dict]:
+        """
+        Szuka graczy po nazwie (prefiks nazwy lub słowa, potem dopasowanie
+        rozmyte) albo po dokładnym ID. Zwraca widoki graczy w kolejności trafności.
+        """
+        query = str(query).strip()
+        limit = max(1, min(int(limit), MAX_PAGE_SIZE))
+        with self._lock:
+            ids = self._name_index.search(query, limit)
+            if query in self.players and query not in ids:
+                ids = [query] + ids[:limit - 1]
+            now = time.time()
+            return [self._player_view(unique_id, self.players[unique_id], now) for unique_id in ids if unique_id in self.players]
+
     def get_stats(self) -> Dict:
-        """Zwraca statystyki graczy"""
-        total_time = sum(p["total_time"] for p in self.players.values())
-        total_time_delta = timedelta(seconds=int(total_time))
-        days = total_time_delta.days
-        hours, remainder = divmod(total_time_delta.seconds, 3600)
-        minutes, seconds = divmod(remainder, 60)
-        
+        """Zwraca statystyki graczy (O(1) - z liczników przyrostowych)"""
+        with self._lock:
+            now = time.time()
+            self._roll_day(now)
+            total_time = self._credited_time + max(0.0, len(self.online_players) * now - self._online_credit_sum)
+            return self._stats_dict(len(self.players), self._total_joins, len(self.online_players), total_time, self._new_today)
+
+    def recompute_stats(self) -> Dict:
+        """Liczy statystyki pełnym przejściem po graczach (do weryfikacji liczników)"""
+        with self._lock:
+            now = time.time()
+            today = start_of_day(now)
+            total_time = sum(p.total_time for p in self.players.values())
+            total_time += sum(self._session_time(player_id, now) for player_id in self.online_players)
+            return self._stats_dict(
+                len(self.players),
+                sum(p.join_count for p in self.players.values()),
+                len(self.online_players),
+                total_time,
+                sum(1 for p in self.players.values() if p.first_seen >= today),
+            )
+
+    def verify_stats(self, tolerance: float = 1.0) -> bool:
+        """Porównuje liczniki z pełnym przeliczeniem; przy rozbieżności loguje ją i przebudowuje liczniki"""
+        with self._lock:
+            fast, full = self.get_stats(), self.recompute_stats()
+            ok = (
+                all(fast[key] == full[key] for key in ("total_players", "total_joins", "players_online", "new_players_today"))
+                and abs(fast["total_time"] - full["total_time"]) <= tolerance
+            )
+            if not ok:
+                logger.warning(f"Liczniki statystyk graczy rozjechały się z danymi: {fast} != {full}")
+                self._rebuild_aggregates()
+            return ok
+
+    @staticmethod
+    def _stats_dict(total_players: int, total_joins: int, players_online: int, total_time: float, new_today: int) -> Dict:
         return {
-            "total_players": len(self.players),
-            "total_joins": sum(p["join_count"] for p in self.players.values()),
-            "players_online": len(self.online_players),
+            "total_players": total_players,
+            "total_joins": total_joins,
+            "players_online": players_online,
+            "new_players_today": new_today,
             "total_time": total_time,
-            "formatted_total_time": f"{days}d {hours}h {minutes}m {seconds}s"
+            "formatted_total_time": format_duration(total_time)
         }
-    
+
     def reset_join_counts(self):
-        for player in self.players.values():
-            player['join_count'] = 0
-        self.save_players() 
\ No newline at end of file
+        with self._lock:
+            for player in self.players.values():
+                player.join_count = 0
+            self._total_joins = 0
+            self._indexes["join_count"].rebuild(self.players)
+            self._mark_dirty(self.players.keys())
+            self.flush() 
\ No newline at end of file
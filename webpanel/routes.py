@@ -1,4 +1,4 @@
-from flask import Blueprint, render_template, request, flash, redirect, url_for, jsonify, current_app, send_from_directory
+from flask import Blueprint, render_template, request, flash, redirect, url_for, jsonify, current_app, send_from_directory, Response
 from flask_login import login_required, current_user
 from flask_wtf import FlaskForm
 from wtforms import StringField, PasswordField, SelectField
@@ -15,27 +15,43 @@ from werkzeug.security import generate_password_hash
 import sys
 from urllib.parse import quote_plus
 import requests
-import re
 import uuid
 from functools import wraps
 sys.path.append(os.path.dirname(os.path.dirname(__file__)))
 from run_admin import start_bot as admin_start_bot, stop_bot as admin_stop_bot
 from .auth import admin_required
-from .playerlist import PlayerTracker
 import threading
-from . import report_critical_error
 from config import CONFIG
 from . import limiter
+from tracker_ipc import TrackerClient, IpcError
+from analytics import DEFAULT_ANALYTICS_DAYS, MAX_ANALYTICS_DAYS, SessionAnalytics
+from .player_index import SORT_FIELDS as PLAYER_SORT_FIELDS
+from .logtail import LogTail
+from .live import LiveFeed
 
 bp = Blueprint('routes', __name__)
 
 # Zmienne globalne
 START_TIME = datetime.now()
-PLAYERS_LOG_FILE = 'webpanel/playerslog.json'
 
-player_tracker = PlayerTracker()
+# Stan graczy należy do procesu bota - panel tylko go odczytuje przez IPC
+player_tracker = TrackerClient(CONFIG)
 
-REFRESH_INTERVAL = 60  # sekundy
+# Dziennik sesji jest tylko dopisywany przez bota - panel liczy analitykę z pliku
+session_analytics = SessionAnalytics()
+ANALYTICS_RANGES = (7, 30, 90, 365)
+
+PLAYERS_PER_PAGE = 50
+
+# Zakresy wykresu liczby graczy (w sekundach)
+PLAYER_HISTORY_RANGES = {
+    '6h': 6 * 3600,
+    '24h': 24 * 3600,
+    '7d': 7 * 86400,
+    '30d': 30 * 86400,
+    '365d': 365 * 86400,
+}
+DEFAULT_HISTORY_RANGE = '24h'
 
 def management_required(f):
     @wraps(f)
@@ -162,6 +178,10 @@ def get_uptime():
     minutes = (uptime.seconds % 3600) // 60
     return f"{days}d {hours}h {minutes}m"
 
+# Snapshot starszy niż max(DEFAULT_STALE_AFTER, 2 x interwał odpytywania + STALE_GRACE) jest nieaktualny
+DEFAULT_STALE_AFTER = 90  # sekundy
+STALE_GRACE = 10  # sekundy
+
 def get_server_url():
     """Tworzy URL do API serwera gry"""
     host = CONFIG.get('GAME_SERVER_HOST', '')
@@ -169,193 +189,99 @@ def get_server_url():
     password = quote_plus(CONFIG.get('GAME_SERVER_RCON_PASSWORD', ''))
     return f"http://{host}:{port}", password
 
-def get_player_data():
-    """Pobiera dane o graczach bezpośrednio z serwera gry"""
-    try:
-        base_url, password = get_server_url()
-        if not base_url or not password:
-            error_msg = "Brak konfiguracji serwera gry"
-            report_critical_error(error_msg)
-            return 0
-
-        # Najpierw sprawdź liczbę graczy
-        count_url = f"{base_url}/player/count?password={password}"
-        try:
-            count_response = requests.get(count_url, timeout=5)
-            count_response.raise_for_status()
-        except requests.RequestException as e:
-            error_msg = f"Błąd połączenia z serwerem gry: {str(e)}"
-            report_critical_error(error_msg)
-            return 0
-        
-        count_data = count_response.json()
-        if not count_data.get('succeeded', False):
-            error_msg = f"Błąd API serwera: {count_data.get('message', 'Unknown error')}"
-            report_critical_error(error_msg)
-            return 0
-
-        player_count = count_data.get('data', {}).get('num_players', 0)
-        if player_count > 0:
-            # Jeśli są gracze, pobierz pełną listę
-            list_url = f"{base_url}/player/list?password={password}"
-            try:
-                list_response = requests.get(list_url, timeout=5)
-                list_response.raise_for_status()
-                list_data = list_response.json()
-                
-                if not list_data.get('succeeded', False):
-                    error_msg = f"Błąd pobierania listy graczy: {list_data.get('message', 'Unknown error')}"
-                    report_critical_error(error_msg)
-                    return player_count
-                
-                players_raw = list_data.get('data', {})
-                if isinstance(players_raw, dict):
-                    return len(players_raw.values())
-                elif isinstance(players_raw, list):
-                    return len(players_raw)
-                
-            except requests.RequestException as e:
-                error_msg = f"Błąd pobierania listy graczy: {str(e)}"
-                report_critical_error(error_msg)
-                return player_count
-        
-        return player_count
-        
-    except Exception as e:
-        error_msg = f"Krytyczny błąd pobierania danych o graczach: {str(e)}"
-        report_critical_error(error_msg)
-        return 0
+def snapshot_staleness(snapshot, poll_cadence=None, now=None):
+    """Wiek snapshotu w sekundach i czy jest nieaktualny (bot nie odpytał serwera w oczekiwanym czasie)"""
+    if not snapshot or not snapshot.get('taken_at'):
+        return None, True
+    age = max(0.0, (now or time.time()) - snapshot['taken_at'])
+    interval = (poll_cadence or {}).get('interval') or DEFAULT_STALE_AFTER / 2
+    return age, age > max(DEFAULT_STALE_AFTER, 2 * interval + STALE_GRACE)
+
+def get_server_state():
+    """
+    Stan serwera z ostatniego snapshotu pollera bota (IPC) - bez zapytań
+    do serwera gry w wątku żądania, więc czas odpowiedzi panelu nie zależy
+    od kondycji serwera.
+    """
+    snapshot = player_tracker.snapshot()
+    poll_cadence = player_tracker.poll_cadence()
+    age, stale = snapshot_staleness(snapshot, poll_cadence)
+    snapshot = snapshot or {}
+    return {
+        'player_count': snapshot.get('player_count', 0),
+        'players': snapshot.get('players', []),
+        'server_online': snapshot.get('online'),
+        'latency_ms': snapshot.get('latency_ms'),
+        'snapshot_at': snapshot.get('taken_at'),
+        'as_of': snapshot.get('as_of'),
+        'snapshot_age': round(age, 1) if age is not None else None,
+        'stale': stale,
+        'poll_cadence': poll_cadence,
+    }
 
-def load_players_history():
-    """Ładuje historię graczy z pliku"""
+def get_player_series(range_key=DEFAULT_HISTORY_RANGE, resolution=None):
+    """Liczba graczy (min/avg/max) z wybranego zakresu - z pamięci bota lub z jego pliku"""
+    seconds = PLAYER_HISTORY_RANGES.get(range_key, PLAYER_HISTORY_RANGES[DEFAULT_HISTORY_RANGE])
+    end = time.time()
     try:
-        if os.path.exists(PLAYERS_LOG_FILE):
-            with open(PLAYERS_LOG_FILE, 'r') as f:
-                return json.load(f)
-        return {'history': [0] * 24, 'last_update': None}
+        return player_tracker.player_history(start=end - seconds, end=end, resolution=resolution)
     except Exception as e:
-        current_app.logger.error(f"Błąd wczytywania historii graczy: {e}")
-        return {'history': [0] * 24, 'last_update': None}
-
-def save_players_history(count):
-    """Zapisuje aktualną liczbę graczy do historii"""
-    try:
-        data = load_players_history()
-        current_hour = datetime.now().hour
-        history = data['history']
-        history[current_hour] = count
-        
-        with open(PLAYERS_LOG_FILE, 'w') as f:
-            json.dump({
-                'history': history,
-                'last_update': datetime.now().isoformat(),
-                'current': count
-            }, f, indent=2)
-    except Exception as e:
-        current_app.logger.error(f"Błąd zapisywania historii graczy: {e}")
-
-def get_player_count():
-    """Pobiera liczbę aktywnych graczy"""
-    count = get_player_data()
-    save_players_history(count)
-    return count
+        current_app.logger.error(f"Błąd pobierania historii graczy: {e}")
+        return {'resolution': resolution or 'hour', 'step': 3600, 'start': end - seconds, 'end': end, 'points': [], 'current': None, 'as_of': None}
 
 def get_player_history():
-    """Pobiera historię liczby graczy z ostatnich 24 godzin"""
-    data = load_players_history()
-    return data.get('history', [0] * 24)
-
-def read_bot_logs(log_path='bot.log', max_lines=500):
-    """Czyta logi bota z pliku, pokazując tylko logi z aktualnej sesji"""
-    logs = []
-    if not os.path.exists(log_path):
-        return logs
-        
+    """Średnia liczba graczy w każdej z ostatnich 24 godzin"""
+    points = get_player_series('24h', resolution='hour')['points'][-24:]
+    history = [point['avg'] or 0 for point in points]
+    return [0] * (24 - len(history)) + history
+
+# Czytniki logów trzymają offset między wywołaniami - kolejne odczyty kosztują tyle, ile dopisano
+_log_tails = {}
+_log_tails_lock = threading.Lock()
+
+def get_log_tail(log_path='bot.log', max_lines=500):
+    key = (os.path.abspath(log_path), max_lines)
+    with _log_tails_lock:
+        tail = _log_tails.get(key)
+        if tail is None:
+            tail = _log_tails[key] = LogTail(log_path, max_lines=max_lines)
+        return tail
+
+def read_bot_logs(log_path='bot.log', max_lines=500, after=None):
+    """Czyta logi bota z pliku, pokazując tylko logi z aktualnej sesji (z `after` - tylko nowe wpisy)"""
     try:
-        with open(log_path, 'r', encoding='utf-8') as f:
-            lines = f.readlines()
-            
-        # Znajdź początek ostatniej sesji (ostatnie uruchomienie bota)
-        session_start = -1
-        session_markers = ["Zalogowano jako", "Połączono z API", "Bot is ready"]
-        for i, line in enumerate(reversed(lines)):
-            if any(marker in line for marker in session_markers):
-                session_start = len(lines) - i - 1
-                break
-        
-        # Jeśli znaleziono początek sesji, weź tylko logi od tego momentu
-        if session_start >= 0:
-            lines = lines[session_start:]
-        
-        # Ogranicz do max_lines ostatnich linii
-        lines = lines[-max_lines:]
-            
-        for line in lines:
-            # Przykładowy format: 2024-06-08 12:34:56,789 [INFO] Wiadomość
-            match = re.match(r'^(\d{4}-\d{2}-\d{2} \d{2}:\d{2}:\d{2},\d{3}) \[(\w+)\] (.*)$', line)
-            if match:
-                timestamp, log_type, message = match.groups()
-                type_color = {
-                    'INFO': 'success',
-                    'WARNING': 'warning',
-                    'ERROR': 'danger',
-                    'CRITICAL': 'danger',
-                    'DEBUG': 'secondary'
-                }.get(log_type, 'info')
-                logs.append({
-                    'timestamp': timestamp,
-                    'type': log_type,
-                    'type_color': type_color,
-                    'message': message.strip()  # Remove any trailing whitespace
-                })
-            else:
-                # Handle non-standard log lines
-                logs.append({
-                    'timestamp': datetime.now().strftime('%Y-%m-%d %H:%M:%S,%f')[:-3],
-                    'type': 'INFO',
-                    'type_color': 'info',
-                    'message': line.strip()
-                })
+        return get_log_tail(log_path, max_lines).entries(after=after)
     except Exception as e:
-        logs.append({
+        return [{
             'timestamp': datetime.now().strftime('%Y-%m-%d %H:%M:%S,%f')[:-3],
             'type': 'ERROR',
             'type_color': 'danger',
             'message': f'Błąd czytania logów: {str(e)}'
-        })
-    return logs
+        }]
+
+def get_live_stats():
+    """Statystyki dashboardu (strumień na żywo i /api/stats) - tylko lokalne odczyty (proces panelu i IPC bota)"""
+    state = get_server_state()
+    return {
+        'bot_status': get_bot_status(),
+        'memory_usage': get_memory_usage(),
+        'uptime': get_uptime(),
+        'player_count': state['player_count'],
+        'server_online': state['server_online'],
+        'latency_ms': state['latency_ms'],
+        'snapshot_at': state['snapshot_at'],
+        'as_of': state['as_of'],
+        'stale': state['stale'],
+        'poll_cadence': state['poll_cadence'],
+        'api_health': player_tracker.api_health()
+    }
 
-def fetch_and_update_players():
-    try:
-        host = CONFIG.get('GAME_SERVER_HOST', '')
-        port = CONFIG.get('GAME_SERVER_PORT', '')
-        password = quote_plus(CONFIG.get('GAME_SERVER_RCON_PASSWORD', ''))
-        base_url = f"http://{host}:{port}"
-        # Pobierz graczy
-        list_url = f"{base_url}/player/list?password={password}"
-        banlist_url = f"{base_url}/player/banlist?password={password}"
-        players_response = requests.get(list_url, timeout=5)
-        banned_response = requests.get(banlist_url, timeout=5)
-        players = []
-        banned_players = []
-        if players_response.ok:
-            data = players_response.json().get('data', {})
-            if isinstance(data, dict):
-                players = list(data.values())
-            elif isinstance(data, list):
-                players = data
-        if banned_response.ok:
-            banned_players = banned_response.json().get('data', [])
-        player_tracker.update_online_status(players)
-        player_tracker.update_banned_players(banned_players)
-    except Exception as e:
-        print(f"Błąd pobierania danych graczy: {e}")
-    finally:
-        # Zaplanuj kolejne odświeżenie
-        threading.Timer(REFRESH_INTERVAL, fetch_and_update_players).start()
+# Jeden producent zdarzeń SSE współdzielony przez wszystkie otwarte karty panelu
+live_feed = LiveFeed.from_config(CONFIG, get_log_tail(), get_live_stats)
 
-# Start background taska przy starcie aplikacji
-fetch_and_update_players()
+def fetch_and_update_players():
+    """Wymusza natychmiastowe odświeżenie danych graczy przez bota"""
+    return player_tracker.refresh()
 
 @bp.route('/api/stats')
 @login_required
@@ -363,13 +289,10 @@ fetch_and_update_players()
 def get_stats():
     """Endpoint API zwracający aktualne statystyki"""
     try:
-        return jsonify({
-            'bot_status': get_bot_status(),
-            'memory_usage': get_memory_usage(),
-            'uptime': get_uptime(),
-            'player_count': get_player_count(),
-            'player_history': get_player_history()
-        })
+        stats = get_live_stats()
+        stats['snapshot_age'] = round(time.time() - stats['snapshot_at'], 1) if stats['snapshot_at'] else None
+        stats['player_history'] = get_player_history()
+        return jsonify(stats)
     except Exception as e:
         current_app.logger.error(f"Błąd podczas pobierania statystyk: {str(e)}")
         return jsonify({
@@ -378,9 +301,42 @@ def get_stats():
             'memory_usage': '0 MB',
             'uptime': '0d 0h 0m',
             'player_count': 0,
-            'player_history': [0] * 24
+            'player_history': [0] * 24,
+            'snapshot_at': None,
+            'as_of': None,
+            'snapshot_age': None,
+            'stale': True,
+            'poll_cadence': None,
+            'api_health': None
         }), 500
 
+@bp.route('/api/stream')
+@login_required
+@limiter.limit("300 per hour")
+def api_stream():
+    """Strumień SSE: zdarzenia `stats` (zmienione pola) i `log` (nowe linie logu bota)"""
+    last_log_id = request.headers.get('Last-Event-ID', type=int)
+    if last_log_id is None:
+        last_log_id = request.args.get('after', type=int)
+    return Response(
+        live_feed.stream(last_log_id),
+        mimetype='text/event-stream',
+        headers={'Cache-Control': 'no-cache', 'X-Accel-Buffering': 'no'}
+    )
+
+@bp.route('/api/player_history')
+@login_required
+@limiter.limit("300 per hour")
+def api_player_history():
+    """Liczba graczy w czasie dla wykresu: ?range=6h|24h|7d|30d|365d&resolution=minute|hour|day"""
+    range_key = request.args.get('range', DEFAULT_HISTORY_RANGE)
+    if range_key not in PLAYER_HISTORY_RANGES:
+        return jsonify({'error': f"Nieznany zakres: {range_key}"}), 400
+    resolution = request.args.get('resolution') or None
+    if resolution not in (None, 'minute', 'hour', 'day'):
+        return jsonify({'error': f"Nieznana rozdzielczość: {resolution}"}), 400
+    return jsonify(get_player_series(range_key, resolution))
+
 @bp.route('/')
 @login_required
 def index():
@@ -389,18 +345,22 @@ def index():
 @bp.route('/dashboard')
 @login_required
 def dashboard():
-    bot_status = get_bot_status()
-    memory_usage = get_memory_usage()
-    uptime = get_uptime()
-    player_count = get_player_count()
-    player_history = get_player_history()
+    # Wszystko z pamięci panelu i snapshotu bota - render nie czeka na serwer gry
+    stats = get_live_stats()
+    player_series = get_player_series(DEFAULT_HISTORY_RANGE)
     logs = read_bot_logs()
     return render_template('dashboard.html',
-                         bot_status=bot_status,
-                         memory_usage=memory_usage,
-                         uptime=uptime,
-                         player_count=player_count,
-                         player_history=player_history,
+                         poll_cadence=stats['poll_cadence'],
+                         api_health=stats['api_health'],
+                         bot_status=stats['bot_status'],
+                         memory_usage=stats['memory_usage'],
+                         uptime=stats['uptime'],
+                         player_count=stats['player_count'],
+                         snapshot_at=stats['snapshot_at'],
+                         stale=stats['stale'],
+                         player_series=player_series,
+                         history_ranges=list(PLAYER_HISTORY_RANGES),
+                         default_history_range=DEFAULT_HISTORY_RANGE,
                          logs=logs)
 
 @bp.route('/config', methods=['GET', 'POST'])
@@ -469,8 +429,8 @@ def api_bot_restart():
 @bp.route('/api/logs')
 @login_required
 def get_logs():
-    """Endpoint API zwracający logi bota"""
-    logs = read_bot_logs()
+    """Endpoint API zwracający logi bota (?after=<id> - tylko wpisy nowsze niż podany)"""
+    logs = read_bot_logs(after=request.args.get('after', type=int))
     return jsonify(logs)
 
 @bp.route('/api/logs/clear', methods=['POST'])
@@ -480,6 +440,9 @@ def clear_logs():
     try:
         with open(log_path, 'w', encoding='utf-8') as f:
             f.truncate(0)
+        for tail in list(_log_tails.values()):
+            if tail.path == log_path:
+                tail.reset()
         return jsonify({'success': True, 'message': 'Logi zostały wyczyszczone.'})
     except Exception as e:
         return jsonify({'success': False, 'message': f'Błąd czyszczenia logów: {str(e)}'}), 500
@@ -492,6 +455,8 @@ def refresh_players():
     try:
         fetch_and_update_players()
         return jsonify({'message': 'Odświeżono listę graczy'}), 200
+    except IpcError as e:
+        return jsonify({'error': f'Nie można odświeżyć listy graczy: {str(e)}'}), 503
     except Exception as e:
         return jsonify({'error': str(e)}), 500
 
@@ -502,21 +467,107 @@ def players():
         flash('Nie masz uprawnień do tej sekcji.', 'error')
         return redirect(url_for('routes.dashboard'))
     
-    players = player_tracker.get_all_players()
+    # Sortowanie i paginacja po stronie bota - pobierana jest tylko bieżąca strona
+    sort = request.args.get('sort', 'last_seen')
+    if sort not in PLAYER_SORT_FIELDS:
+        sort = 'last_seen'
+    order = request.args.get('order')
+    descending = None if order not in ('asc', 'desc') else order == 'desc'
+    online_only = request.args.get('online') == '1'
+    per_page = request.args.get('per_page', PLAYERS_PER_PAGE, type=int)
+    page = max(1, request.args.get('page', 1, type=int))
+    query = request.args.get('q', '').strip()
+
+    if query:
+        # Wyszukiwanie po nazwie/ID - wyniki w kolejności trafności, jedna strona
+        found = player_tracker.search_players(query, limit=per_page)
+        page = 1
+        result = {'players': found, 'total': len(found), 'limit': max(1, per_page), 'descending': True}
+    else:
+        result = player_tracker.query_players(
+            sort=sort,
+            descending=descending,
+            offset=(page - 1) * per_page,
+            limit=per_page,
+            online_only=online_only,
+        )
     stats = player_tracker.get_stats()
     banned_players = player_tracker.get_banned_players()
     banned_ids = {p.get('unique_id') for p in banned_players}
+    players = result['players']
     for p in players:
         p['is_banned'] = p['unique_id'] in banned_ids
-    players.sort(key=lambda x: (-x['is_online'], x['last_seen']))
     return render_template(
         'players.html',
         players=players,
         stats=stats,
         banned_players=banned_players,
+        page=page,
+        per_page=result['limit'],
+        total=result['total'],
+        pages=max(1, (result['total'] + result['limit'] - 1) // result['limit']),
+        sort=sort,
+        order='desc' if result['descending'] else 'asc',
+        online_only=online_only,
+        query=query,
         active_page='players'
     )
 
+def get_session_summary(days):
+    days = max(1, min(days, MAX_ANALYTICS_DAYS))
+    try:
+        return session_analytics.summary(days, player_tracker.open_sessions())
+    except Exception as e:
+        current_app.logger.error(f"Błąd liczenia analityki sesji: {e}")
+        return None
+
+@bp.route('/analytics')
+@login_required
+def analytics():
+    if not current_user.has_permission('players'):
+        flash('Nie masz uprawnień do tej sekcji.', 'error')
+        return redirect(url_for('routes.dashboard'))
+    days = request.args.get('days', DEFAULT_ANALYTICS_DAYS, type=int)
+    summary = get_session_summary(days)
+    return render_template(
+        'analytics.html',
+        summary=summary,
+        days=days,
+        ranges=ANALYTICS_RANGES,
+        active_page='analytics'
+    )
+
+@bp.route('/api/analytics')
+@login_required
+@limiter.limit("300 per hour")
+def api_analytics():
+    """Analityka sesji (heatmapa, DAU/WAU, nowi/powracający, długość sesji, retencja): ?days=30"""
+    if not current_user.has_permission('players'):
+        return jsonify({'error': 'Brak uprawnień'}), 403
+    summary = get_session_summary(request.args.get('days', DEFAULT_ANALYTICS_DAYS, type=int))
+    if summary is None:
+        return jsonify({'error': 'Nie udało się policzyć analityki'}), 500
+    return jsonify(summary)
+
+@bp.route('/players/search')
+@login_required
+@limiter.limit("600 per hour")  # Podpowiedzi przy pisaniu - więcej niż pozostałe endpointy JSON
+def search_players():
+    """Podpowiedzi graczy dla pola wyszukiwania (JSON)"""
+    if not current_user.has_permission('players'):
+        return jsonify({'error': 'Brak uprawnień'}), 403
+    query = request.args.get('q', '').strip()
+    if not query:
+        return jsonify([])
+    try:
+        players = player_tracker.search_players(query, limit=request.args.get('limit', 10, type=int))
+    except IpcError as e:
+        return jsonify({'error': str(e)}), 503
+    return jsonify([
+        {'unique_id': p['unique_id'], 'name': p['name'], 'is_online': p['is_online']}
+        for p in players
+    ])
+
 @bp.route('/management')
 @login_required
 @management_required
@@ -755,7 +806,10 @@ def remove_user_group(user_id):
 def reset_joins():
     if not (hasattr(current_user, 'group') and getattr(current_user.group, 'id', None) == 'admin'):
         return jsonify({'error': 'Brak uprawnień'}), 403
-    player_tracker.reset_join_counts()
+    try:
+        player_tracker.reset_join_counts()
+    except IpcError as e:
+        return jsonify({'error': f'Nie można zresetować licznika dołączeń: {str(e)}'}), 503
     return jsonify({'message': 'join_count wszystkich graczy został zresetowany!'}), 200
 
 @bp.route('/dc_status')
@@ -773,52 +827,43 @@ def dc_status():
     # Wczytaj aktualny embed z pliku konfiguracyjnego
     embed_path = os.path.join(os.path.dirname(__file__), 'dc_status.json')
     
-    # Pobierz dane o graczach
-    base_url, password = get_server_url()
-    count = get_player_count()
-    players = player_tracker.get_all_players()
-    online_players = [p for p in players if p['is_online']]
-    
-    # Sprawdź ping serwera
-    try:
-        start_time = time.time()
-        requests.get(f"{base_url}/player/count?password={password}", timeout=5)
-        ping = int((time.time() - start_time) * 1000)  # Konwersja na ms
-        ping_icon = "🟢" if ping < 100 else "🟡" if ping < 200 else "🔴"
-    except:
+    # Gracze i ping z ostatniego snapshotu bota - bez zapytań do serwera gry w wątku żądania
+    state = get_server_state()
+    online_players = state['players']
+    ping = state['latency_ms']
+    if ping is None or state['stale']:
         ping = 0
         ping_icon = "⚫"
+    else:
+        ping_icon = "🟢" if ping < 100 else "🟡" if ping < 200 else "🔴"
     
     # Generuj listę graczy
     if online_players:
-        player_list = "\n".join([f"• {p['name']}" for p in sorted(online_players, key=lambda x: x['name'])])
+        player_list = "\n".join([f"• {p.get('name', 'Nieznany gracz')}" for p in sorted(online_players, key=lambda x: x.get('name', ''))])
     else:
         player_list = "Brak aktywnych graczy"
     
+    as_of = datetime.fromtimestamp(state['snapshot_at']).strftime('%d.%m.%Y, %H:%M:%S') if state['snapshot_at'] else 'brak danych'
+    
     # Stwórz embed
     embed_data = {
         "title": "📊 Status Serwera",
         "description": f"**Gracze online ({len(online_players)}):**\n{player_list}\n\n**Ping:**\n{ping_icon} {ping}ms\n\n**Status:**\n✅ Online ({len(online_players)})",
         "color": "#5865F2",
-        "footer": f"Ostatnia aktualizacja • {datetime.now().strftime('%d.%m.%Y, %H:%M:%S')}"
+        "footer": f"Ostatnia aktualizacja • {as_of}"
     }
     
-    # Wczytaj poprzednie message_id jeśli istnieje
-    try:
-        with open(embed_path, 'r', encoding='utf-8') as f:
-            old_data = json.load(f)
-            embed_data['message_id'] = old_data.get('message_id')
-    except:
-        pass
-    
-    # Zapisz embed
-    with open(embed_path, 'w', encoding='utf-8') as f:
+    # Zapisz podgląd embeda (ID wiadomości statusu bot trzyma w osobnym pliku, dc_status_message.json)
+    tmp_path = f"{embed_path}.tmp"
+    with open(tmp_path, 'w', encoding='utf-8') as f:
         json.dump(embed_data, f, indent=2, ensure_ascii=False)
+    os.replace(tmp_path, embed_path)
     
     # Pobierz datę ostatniej aktualizacji
     last_update = datetime.fromtimestamp(os.path.getmtime(embed_path)).strftime('%d.%m.%Y, %H:%M:%S')
     
-    return render_template('dc_status.html', embed=embed_data, last_update=last_update, active_page='dc_status')
+    return render_template('dc_status.html', embed=embed_data, last_update=last_update, as_of=as_of,
+                           snapshot_age=state['snapshot_age'], stale=state['stale'], active_page='dc_status')
 
 @bp.route('/motortown.png')
 def serve_favicon():
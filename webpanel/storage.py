@@ -0,0 +1,333 @@
+import abc
+import json
+import logging
+import os
+import sqlite3
+import threading
+from dataclasses import dataclass
+from datetime import datetime
+from typing import Any, Dict, Iterable, List, Optional
+
+logger = logging.getLogger(__name__)
+
+DATA_DIR = os.path.dirname(__file__)
+DEFAULT_PLAYERS_FILE = os.path.join(DATA_DIR, "playerlist.json")
+DEFAULT_BANNED_FILE = os.path.join(DATA_DIR, "banned_players.json")
+DEFAULT_ONLINE_FILE = os.path.join(DATA_DIR, "online_players.json")
+DEFAULT_DB_FILE = os.path.join(DATA_DIR, "players.db")
+
+
+def to_epoch(value: Any) -> float:
+    """Zamienia znacznik czasu (epoch lub tekst ISO ze starszych plików) na epoch"""
+    if value is None or value == '':
+        return 0.0
+    if isinstance(value, (int, float)):
+        return float(value)
+    try:
+        return float(value)
+    except ValueError:
+        return datetime.fromisoformat(value).timestamp()
+
+
+def to_iso(timestamp: float) -> str:
+    return datetime.fromtimestamp(timestamp).isoformat()
+
+
+@dataclass(slots=True)
+class PlayerRecord:
+    """
+    Zwarty rekord gracza. Czasy są przechowywane jako epoch (float),
+    a na słownik z datami ISO zamieniane dopiero przy serializacji.
+    """
+    name: str
+    first_seen: float
+    last_seen: float
+    join_count: int = 0
+    total_time: float = 0.0  # Czas w sekundach
+    is_online: bool = False
+
+    @classmethod
+    def from_dict(cls, data: Dict[str, Any]) -> "PlayerRecord":
+        return cls(
+            name=data.get("name", "Nieznany"),
+            first_seen=to_epoch(data.get("first_seen")),
+            last_seen=to_epoch(data.get("last_seen")),
+            join_count=int(data.get("join_count", 0)),
+            total_time=float(data.get("total_time", 0.0)),
+            is_online=bool(data.get("is_online", False)),
+        )
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "name": self.name,
+            "first_seen": to_iso(self.first_seen),
+            "last_seen": to_iso(self.last_seen),
+            "join_count": self.join_count,
+            "total_time": self.total_time,
+            "is_online": self.is_online,
+        }
+
+
+class PlayerStorage(abc.ABC):
+    """
+    Interfejs magazynu danych PlayerTrackera.
+
+    Gracze są przekazywani jako {unique_id: PlayerRecord}, a gracze online
+    jako {unique_id: epoch, do którego czas gry jest już zaliczony}.
+    `save_players` przyjmuje opcjonalny zbiór zmienionych ID - backend może
+    zapisać tylko te wiersze.
+    """
+
+    @abc.abstractmethod
+    def load_players(self) -> Dict[str, PlayerRecord]:
+        ...
+
+    @abc.abstractmethod
+    def save_players(self, players: Dict[str, PlayerRecord], changed: Optional[Iterable[str]] = None) -> None:
+        ...
+
+    @abc.abstractmethod
+    def load_banned_players(self) -> List[Dict]:
+        ...
+
+    @abc.abstractmethod
+    def save_banned_players(self, banned_players: List[Dict]) -> None:
+        ...
+
+    @abc.abstractmethod
+    def load_online_players(self) -> Dict[str, float]:
+        ...
+
+    @abc.abstractmethod
+    def save_online_players(self, online_players: Dict[str, float]) -> None:
+        ...
+
+    def close(self) -> None:
+        pass
+
+
+class JsonPlayerStorage(PlayerStorage):
+    """Dotychczasowy format: trzy pliki JSON zapisywane w całości"""
+
+    def __init__(self, file_path: Optional[str] = None, banned_file_path: Optional[str] = None, online_file_path: Optional[str] = None):
+        self.file_path = file_path or DEFAULT_PLAYERS_FILE
+        self.banned_file_path = banned_file_path or DEFAULT_BANNED_FILE
+        self.online_file_path = online_file_path or DEFAULT_ONLINE_FILE
+
+    def _read(self, path: str):
+        if not os.path.exists(path):
+            return None
+        try:
+            with open(path, 'r', encoding='utf-8') as f:
+                return json.load(f)
+        except json.JSONDecodeError:
+            return None
+
+    def _write(self, path: str, data) -> None:
+        # Zapis atomowy: plik tymczasowy + rename, więc przerwany zapis nie psuje JSON-a
+        tmp_path = f"{path}.tmp"
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            json.dump(data, f, indent=4, ensure_ascii=False)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp_path, path)
+
+    def load_players(self) -> Dict[str, PlayerRecord]:
+        data = self._read(self.file_path)
+        if not isinstance(data, dict):
+            return {}
+        return {unique_id: PlayerRecord.from_dict(player) for unique_id, player in data.items()}
+
+    def save_players(self, players: Dict[str, PlayerRecord], changed: Optional[Iterable[str]] = None) -> None:
+        self._write(self.file_path, {unique_id: player.to_dict() for unique_id, player in players.items()})
+
+    def load_banned_players(self) -> List[Dict]:
+        data = self._read(self.banned_file_path)
+        if isinstance(data, dict):
+            return list(data.values())
+        if isinstance(data, list):
+            return data
+        return []
+
+    def save_banned_players(self, banned_players: List[Dict]) -> None:
+        # Zawsze zapisuj jako listę
+        self._write(self.banned_file_path, banned_players)
+
+    def load_online_players(self) -> Dict[str, float]:
+        data = self._read(self.online_file_path)
+        if not isinstance(data, dict):
+            return {}
+        return {unique_id: to_epoch(value) for unique_id, value in data.items()}
+
+    def save_online_players(self, online_players: Dict[str, float]) -> None:
+        self._write(self.online_file_path, {unique_id: to_iso(value) for unique_id, value in online_players.items()})
+
+
+class SqlitePlayerStorage(PlayerStorage):
+    """
+    Magazyn w SQLite (tryb WAL). Zapis graczy to upsert tylko zmienionych
+    wierszy, więc koszt jednego odpytania nie rośnie z liczbą wszystkich graczy.
+    """
+
+    SCHEMA = """
+        CREATE TABLE IF NOT EXISTS players (
+            unique_id TEXT PRIMARY KEY,
+            name TEXT NOT NULL,
+            first_seen REAL NOT NULL,
+            last_seen REAL NOT NULL,
+            join_count INTEGER NOT NULL DEFAULT 0,
+            total_time REAL NOT NULL DEFAULT 0,
+            is_online INTEGER NOT NULL DEFAULT 0
+        );
+        CREATE INDEX IF NOT EXISTS idx_players_last_seen ON players(last_seen);
+        CREATE INDEX IF NOT EXISTS idx_players_name ON players(name COLLATE NOCASE);
+        CREATE TABLE IF NOT EXISTS banned_players (
+            position INTEGER PRIMARY KEY,
+            unique_id TEXT,
+            data TEXT NOT NULL
+        );
+        CREATE TABLE IF NOT EXISTS online_players (
+            unique_id TEXT PRIMARY KEY,
+            credited_until REAL NOT NULL
+        );
+    """
+
+    def __init__(self, db_path: Optional[str] = None):
+        self.db_path = db_path or DEFAULT_DB_FILE
+        self._lock = threading.Lock()
+        # Połączenie współdzielone przez wątki panelu - dostęp chroniony blokadą
+        self._conn = sqlite3.connect(self.db_path, check_same_thread=False, timeout=10)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.execute("PRAGMA busy_timeout=10000")
+        self._conn.executescript(self.SCHEMA)
+        self._conn.commit()
+
+    def is_empty(self) -> bool:
+        with self._lock:
+            row = self._conn.execute("SELECT EXISTS(SELECT 1 FROM players)").fetchone()
+        return not row[0]
+
+    def load_players(self) -> Dict[str, PlayerRecord]:
+        with self._lock:
+            rows = self._conn.execute(
+                "SELECT unique_id, name, first_seen, last_seen, join_count, total_time, is_online FROM players"
+            ).fetchall()
+        return {
+            unique_id: PlayerRecord(
+                name=name,
+                first_seen=to_epoch(first_seen),
+                last_seen=to_epoch(last_seen),
+                join_count=join_count,
+                total_time=total_time,
+                is_online=bool(is_online),
+            )
+            for unique_id, name, first_seen, last_seen, join_count, total_time, is_online in rows
+        }
+
+    def save_players(self, players: Dict[str, PlayerRecord], changed: Optional[Iterable[str]] = None) -> None:
+        ids = players.keys() if changed is None else changed
+        rows = []
+        for unique_id in ids:
+            player = players.get(unique_id)
+            if player is None:
+                continue
+            rows.append((
+                str(unique_id),
+                player.name,
+                player.first_seen,
+                player.last_seen,
+                player.join_count,
+                player.total_time,
+                1 if player.is_online else 0,
+            ))
+        if not rows:
+            return
+        with self._lock, self._conn:
+            self._conn.executemany(
+                """
+                INSERT INTO players (unique_id, name, first_seen, last_seen, join_count, total_time, is_online)
+                VALUES (?, ?, ?, ?, ?, ?, ?)
+                ON CONFLICT(unique_id) DO UPDATE SET
+                    name = excluded.name,
+                    first_seen = excluded.first_seen,
+                    last_seen = excluded.last_seen,
+                    join_count = excluded.join_count,
+                    total_time = excluded.total_time,
+                    is_online = excluded.is_online
+                """,
+                rows,
+            )
+
+    def load_banned_players(self) -> List[Dict]:
+        with self._lock:
+            rows = self._conn.execute("SELECT data FROM banned_players ORDER BY position").fetchall()
+        return [json.loads(data) for (data,) in rows]
+
+    def save_banned_players(self, banned_players: List[Dict]) -> None:
+        rows = [
+            (position, str(player.get("unique_id", "")) if isinstance(player, dict) else "", json.dumps(player, ensure_ascii=False))
+            for position, player in enumerate(banned_players)
+        ]
+        with self._lock, self._conn:
+            self._conn.execute("DELETE FROM banned_players")
+            self._conn.executemany("INSERT INTO banned_players (position, unique_id, data) VALUES (?, ?, ?)", rows)
+
+    def load_online_players(self) -> Dict[str, float]:
+        with self._lock:
+            rows = self._conn.execute("SELECT unique_id, credited_until FROM online_players").fetchall()
+        return {unique_id: to_epoch(value) for unique_id, value in rows}
+
+    def save_online_players(self, online_players: Dict[str, float]) -> None:
+        with self._lock, self._conn:
+            self._conn.execute("DELETE FROM online_players")
+            self._conn.executemany(
+                "INSERT INTO online_players (unique_id, credited_until) VALUES (?, ?)",
+                list(online_players.items()),
+            )
+
+    def close(self) -> None:
+        with self._lock:
+            self._conn.close()
+
+
+def migrate_json_to_sqlite(source: JsonPlayerStorage, target: SqlitePlayerStorage) -> int:
+    """Jednorazowo przenosi dane z plików JSON do SQLite. Zwraca liczbę graczy."""
+    players = source.load_players()
+    target.save_players(players)
+    target.save_banned_players(source.load_banned_players())
+    target.save_online_players(source.load_online_players())
+    logger.info(f"Zmigrowano {len(players)} graczy z {source.file_path} do {target.db_path}")
+    return len(players)
+
+
+def create_storage(backend: Optional[str] = None) -> PlayerStorage:
+    """
+    Tworzy magazyn na podstawie opcji PLAYER_STORAGE ('sqlite' lub 'json').
+    Przy pierwszym uruchomieniu SQLite dane są automatycznie migrowane z JSON.
+    """
+    if backend is None:
+        from config import CONFIG
+        backend = CONFIG.get('PLAYER_STORAGE', 'sqlite')
+    backend = str(backend).lower()
+
+    if backend == 'json':
+        return JsonPlayerStorage()
+    if backend != 'sqlite':
+        raise ValueError(f"Nieznany magazyn graczy: {backend}")
+
+    storage = SqlitePlayerStorage()
+    json_storage = JsonPlayerStorage()
+    if storage.is_empty() and os.path.exists(json_storage.file_path):
+        migrate_json_to_sqlite(json_storage, storage)
+    return storage
+
+
+if __name__ == '__main__':
+    # Ręczna migracja: python -m webpanel.storage [plik.db]
+    import sys
+    logging.basicConfig(level=logging.INFO, format='%(asctime)s [%(levelname)s] %(message)s')
+    target = SqlitePlayerStorage(sys.argv[1] if len(sys.argv) > 1 else None)
+    count = migrate_json_to_sqlite(JsonPlayerStorage(), target)
+    target.close()
+    print(f"Zmigrowano {count} graczy")